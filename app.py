@@ -1,9 +1,24 @@
 # app.py
 
+import math
+from datetime import datetime
+
 import streamlit as st
-from bot.orders import OrderManager
+from bot.account_state import get_account_state
+
+# Views redraw from the shared in-memory state this often; no REST calls per rerun
+REDRAW_SECONDS = 2
+PAGE_SIZE = 100
+
 
-manager = OrderManager()
+@st.cache_resource
+def account_state():
+    # One client, manager and refresh thread per process, shared by every session
+    return get_account_state()
+
+
+state = account_state()
+manager = state.manager
 
 st.title("🚀 PrimeTradeAI Trading Dashboard")
 
@@ -12,20 +27,56 @@ menu = st.sidebar.selectbox(
     ["Trade", "Balance", "Positions", "History"]
 )
 
-if menu == "Balance":
-    data = manager.get_account_balance()
+
+def show_status(snapshot: dict):
+    if snapshot["error"]:
+        st.warning(f"Last refresh failed: {snapshot['error']}")
+    if snapshot["updated"]:
+        st.caption(f"Updated {datetime.fromtimestamp(snapshot['updated']):%H:%M:%S}")
+
+
+@st.fragment(run_every=REDRAW_SECONDS)
+def balance_view():
+    snapshot = state.snapshot()
     st.write("### Futures Balance")
-    st.write(data)
+    st.write(snapshot["balance"])
+    show_status(snapshot)
 
-elif menu == "Positions":
-    positions = manager.get_open_positions()
+
+@st.fragment(run_every=REDRAW_SECONDS)
+def positions_view():
+    snapshot = state.snapshot()
     st.write("### Open Positions")
-    st.write(positions)
+    st.dataframe(snapshot["positions"] or [], use_container_width=True)
+    show_status(snapshot)
+
+
+@st.fragment(run_every=REDRAW_SECONDS)
+def recent_trades_view():
+    snapshot = state.snapshot()
+    st.write("### Recent Trades")
+    st.dataframe(snapshot["trades"] or [], use_container_width=True)
+    show_status(snapshot)
+
+
+if menu == "Balance":
+    balance_view()
+
+elif menu == "Positions":
+    positions_view()
 
 elif menu == "History":
-    trades = manager.get_trade_history()
+    recent_trades_view()
+
     st.write("### Trade History")
-    st.write(trades)
+    symbol = st.text_input("Symbol filter", "").strip().upper() or None
+
+    total = state.trade_count(symbol)
+    pages = max(math.ceil(total / PAGE_SIZE), 1)
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1)
+
+    st.caption(f"{total} trades, newest first")
+    st.dataframe(state.trades_page(page, PAGE_SIZE, symbol), use_container_width=True)
 
 elif menu == "Trade":
     st.write("### Place Trade")
@@ -48,5 +99,6 @@ elif menu == "Trade":
             price=price,
             wait_for_fill=True
         )
+        state.request_refresh()
         st.success("Order Result")
-        st.write(result)
\ No newline at end of file
+        st.write(result)
@@ -0,0 +1,95 @@
+# benchmarks/bench_bulk_orders.py
+
+"""
+Bulk order-file submission throughput against the local simulator.
+
+Writes ``--orders`` LIMIT orders to a temporary CSV file and submits it
+with BulkOrderSubmitter (streamed, validated, batched, ``--concurrency``
+requests in flight on one client), next to the same orders placed one
+``place_order`` call at a time. Also reports how fast rows are read and
+validated without sending anything. Needs no API keys or network access.
+
+Run: python -m benchmarks.bench_bulk_orders --orders 1000
+"""
+
+import argparse
+import itertools
+import os
+import tempfile
+import time
+
+from bot.bulk_orders import BulkOrderSubmitter, parse_order, read_orders
+from bot.client import BinanceFuturesClient
+from bot.orders import OrderManager
+from bot.scheduler import RequestScheduler
+from simulator import SimulatedExchange, SimulatorServer
+
+SYMBOLS = ("ETHUSDT", "BNBUSDT", "SOLUSDT", "XRPUSDT", "ADAUSDT")
+
+
+def write_orders(path: str, orders: int):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("symbol,side,type,quantity,price\n")
+        for i in range(orders):
+            side = "BUY" if i % 2 else "SELL"
+            # Resting 20% away from the ~100 mark: acknowledged, never filled
+            price = 80 + i % 7 if side == "BUY" else 120 + i % 7
+            f.write(f"{SYMBOLS[i % len(SYMBOLS)]},{side},LIMIT,0.1,{price}\n")
+
+
+def run(orders: int = 1000, concurrency: int = 8, sequential: int = 100, latency_ms: float = 5.0) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "orders.csv")
+        write_orders(path, orders)
+
+        started = time.perf_counter()
+        for _, row in read_orders(path):
+            parse_order(row)
+        parse_s = time.perf_counter() - started
+
+        exchange = SimulatedExchange(initial_balance=10_000_000.0)
+        with SimulatorServer(exchange, port=0, latency_ms=latency_ms) as server:
+            client = BinanceFuturesClient(base_url=server.url, scheduler=RequestScheduler())
+            manager = OrderManager(client=client)
+            # exchangeInfo is loaded before timing starts
+            manager.exchange_info.table()
+
+            try:
+                stats = BulkOrderSubmitter(manager, concurrency=concurrency).run(
+                    path, os.path.join(directory, "results.jsonl")
+                )
+
+                started = time.perf_counter()
+                for _, row in itertools.islice(read_orders(path), sequential):
+                    order = parse_order(row)
+                    manager.place_order(
+                        order["symbol"], order["side"], order["order_type"], order["quantity"], order["price"],
+                        wait_for_fill=False,
+                    )
+                sequential_s = time.perf_counter() - started
+
+            finally:
+                manager.close()
+
+    return {
+        "bulk": {
+            "orders": orders,
+            "accepted": stats["accepted"],
+            "orders_per_s": stats["ordersPerS"],
+            "sequential_orders_per_s": sequential / sequential_s,
+            "parse_rows_per_s": orders / parse_s,
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, default=1000, help="stay under the 1200 orders per minute limit")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--sequential", type=int, default=100, help="orders placed one call at a time")
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    for name, stats in run(args.orders, args.concurrency, args.sequential, args.latency_ms).items():
+        for metric, value in stats.items():
+            print(f"{name:>6} {metric:>24}: {value:12.2f}")
@@ -0,0 +1,101 @@
+# benchmarks/bench_indicators.py
+
+"""
+Batch vs incremental indicator benchmark.
+
+Simulates a live feed: for each of the last ``--ticks`` bars it compares
+recomputing every indicator over the full history (batch path) with one
+O(1) update per indicator (incremental path), and checks both agree.
+
+Run: python -m benchmarks.bench_indicators --bars 100000 --ticks 200
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from bot import indicators
+
+
+def synthetic_bars(n: int, seed: int = 7) -> dict:
+    rng = np.random.default_rng(seed)
+    close = 60_000 + np.cumsum(rng.normal(0, 25, n))
+    spread = np.abs(rng.normal(0, 15, n))
+    return {
+        "high": close + spread,
+        "low": close - spread,
+        "close": close,
+        "volume": rng.uniform(1, 50, n),
+    }
+
+
+def batch_all(bars: dict) -> dict:
+    h, l, c, v = bars["high"], bars["low"], bars["close"], bars["volume"]
+    return {
+        "ema": indicators.ema(c, 21),
+        "rsi": indicators.rsi(c, 14),
+        "atr": indicators.atr(h, l, c, 14),
+        "bollinger": indicators.bollinger(c, 20)[1],
+        "vwap": indicators.vwap(h, l, c, v),
+    }
+
+
+def run(bars_count: int = 100_000, ticks: int = 200) -> dict:
+    bars = synthetic_bars(bars_count)
+    warm = bars_count - ticks
+
+    live = {
+        "ema": indicators.EMA(21),
+        "rsi": indicators.RSI(14),
+        "atr": indicators.ATR(14),
+        "bollinger": indicators.BollingerBands(20),
+        "vwap": indicators.VWAP(),
+    }
+
+    def update(i: int) -> dict:
+        h, l, c, v = bars["high"][i], bars["low"][i], bars["close"][i], bars["volume"][i]
+        return {
+            "ema": live["ema"].update(c),
+            "rsi": live["rsi"].update(c),
+            "atr": live["atr"].update(h, l, c),
+            "bollinger": live["bollinger"].update(c)[1],
+            "vwap": live["vwap"].update(h, l, c, v),
+        }
+
+    for i in range(warm):
+        update(i)
+
+    started = time.perf_counter()
+    for i in range(warm, bars_count):
+        incremental = update(i)
+    incremental_s = (time.perf_counter() - started) / ticks
+
+    started = time.perf_counter()
+    for i in range(warm, bars_count):
+        batch = batch_all({k: col[: i + 1] for k, col in bars.items()})
+    batch_s = (time.perf_counter() - started) / ticks
+
+    max_rel_error = max(
+        abs(incremental[name] - batch[name][-1]) / max(abs(batch[name][-1]), 1e-12)
+        for name in incremental
+    )
+
+    return {
+        "bars": bars_count,
+        "ticks": ticks,
+        "batch_us_per_tick": batch_s * 1e6,
+        "incremental_us_per_tick": incremental_s * 1e6,
+        "speedup": batch_s / incremental_s,
+        "max_rel_error": max_rel_error,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bars", type=int, default=100_000)
+    parser.add_argument("--ticks", type=int, default=200)
+    args = parser.parse_args()
+
+    for key, value in run(args.bars, args.ticks).items():
+        print(f"{key:>24}: {value:,.6g}" if isinstance(value, float) else f"{key:>24}: {value}")
@@ -0,0 +1,93 @@
+# benchmarks/bench_klines.py
+
+"""
+Kline DataFrame construction benchmark.
+
+Times the two ways get_futures_klines builds its DataFrame: decoding raw
+exchange rows (the download path) and a fully cached call served from
+the memory-mapped kline store. Results are normalised to one million rows.
+
+Run: python -m benchmarks.bench_klines --rows 200000
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from historical_data.fut_historical import get_futures_klines
+from historical_data.kline_store import KlineStore, raw_klines_to_frame, to_output_frame
+
+START_MS = 1_577_836_800_000  # 2020-01-01 UTC
+MINUTE_MS = 60_000
+
+
+def synthetic_klines(n: int, seed: int = 11) -> list:
+    """Raw 1m futures klines as the REST API returns them (decimal strings)."""
+    rng = np.random.default_rng(seed)
+    close = 60_000 + np.cumsum(rng.normal(0, 5, n))
+    opens = START_MS + np.arange(n, dtype=np.int64) * MINUTE_MS
+    tail = ["0", 100, "0", "0", "0"]
+
+    return [
+        [t, f"{c - 1:.1f}", f"{c + 3:.1f}", f"{c - 4:.1f}", f"{c:.1f}", f"{v:.3f}", t + MINUTE_MS - 1, *tail]
+        for t, c, v in zip(opens.tolist(), close.tolist(), rng.uniform(1, 50, n).tolist())
+    ]
+
+
+def _best_of(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _per_million(seconds: float, rows: int) -> dict:
+    return {"ms_per_million_rows": seconds * 1000 * 1_000_000 / rows, "rows_per_s": rows / seconds}
+
+
+def run(rows: int = 200_000, repeat: int = 3) -> dict:
+    # Keep get_futures_klines from configuring its file log during the run
+    root = logging.getLogger()
+    if not root.handlers:
+        root.addHandler(logging.NullHandler())
+
+    raw = synthetic_klines(rows)
+    decode_s = _best_of(lambda: to_output_frame(raw_klines_to_frame(raw)), repeat)
+
+    with tempfile.TemporaryDirectory() as root_dir:
+        store = KlineStore(root_dir)
+        frame = raw_klines_to_frame(raw)
+        end_ms = START_MS + rows * MINUTE_MS - 1
+        store.merge("BTCUSDT", "1m", frame, START_MS, end_ms)
+        del raw, frame
+
+        start_str = datetime.fromtimestamp(START_MS / 1000, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        end_str = datetime.fromtimestamp(end_ms / 1000, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+        def cached():
+            df = get_futures_klines("BTCUSDT", "1m", start_str, end_str, store=store)
+            assert df is not None and len(df) == rows
+
+        cached_s = _best_of(cached, repeat)
+
+    return {
+        "raw_decode": _per_million(decode_s, rows),
+        "cached_get_futures_klines": _per_million(cached_s, rows),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for name, stats in run(args.rows, args.repeat).items():
+        print(f"{name:>26}: {stats['ms_per_million_rows']:9.1f} ms / 1M rows  "
+              f"{stats['rows_per_s']:12,.0f} rows/s")
@@ -0,0 +1,94 @@
+# benchmarks/bench_logging.py
+
+"""
+Per-log-call cost on the order path.
+
+Times the two log lines BinanceFuturesClient.create_order writes per order
+(request params and exchange response) as seen by the calling thread,
+for the old synchronous handlers with eager f-strings, synchronous with
+lazy %-style args, the queue-based pipeline (text and JSON lines), and
+calls filtered out by the log level. Console output goes to /dev/null.
+
+Run: python -m benchmarks.bench_logging --calls 20000
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from bot.logging_config import setup_logging, stop_logging
+
+PARAMS = {"symbol": "BTCUSDT", "side": "BUY", "type": "LIMIT", "quantity": 0.01, "price": 60000.0, "timeInForce": "GTC"}
+RESPONSE = {
+    "orderId": 4075628129, "symbol": "BTCUSDT", "status": "NEW", "clientOrderId": "x-Cb7ytekJ8f2c3a",
+    "price": "60000.00", "avgPrice": "0.00", "origQty": "0.010", "executedQty": "0.000",
+    "cumQty": "0.000", "cumQuote": "0.00000", "timeInForce": "GTC", "type": "LIMIT",
+    "reduceOnly": False, "closePosition": False, "side": "BUY", "positionSide": "BOTH",
+    "stopPrice": "0.00", "workingType": "CONTRACT_PRICE", "priceProtect": False,
+    "origType": "LIMIT", "priceMatch": "NONE", "selfTradePreventionMode": "EXPIRE_MAKER",
+    "goodTillDate": 0, "updateTime": 1700000000000,
+}
+
+
+def eager(logger):
+    logger.info(f"Sending order request: {PARAMS}")
+    logger.info(f"Order response: {RESPONSE}")
+
+
+def lazy(logger):
+    logger.info("Sending order request: %s", PARAMS)
+    logger.info("Order response: %s", RESPONSE)
+
+
+def measure(calls: int, log_call, level: int = logging.INFO, **setup) -> dict:
+    with tempfile.TemporaryDirectory() as log_dir:
+        setup_logging(log_dir, **setup)
+        root = logging.getLogger()
+        root.setLevel(level)
+        logger = logging.getLogger("bot.client")
+
+        started = time.perf_counter()
+        for _ in range(calls):
+            log_call(logger)
+        elapsed = time.perf_counter() - started
+
+        # Queue mode: time for the listener to finish the backlog
+        started = time.perf_counter()
+        stop_logging()
+        drain = time.perf_counter() - started
+
+        for handler in list(root.handlers):
+            handler.close()
+            root.removeHandler(handler)
+
+    return {"us_per_order": elapsed / calls * 1e6, "drain_ms": drain * 1000}
+
+
+def run(calls: int = 20_000) -> dict:
+    stderr, sys.stderr = sys.stderr, open(os.devnull, "w")
+
+    try:
+        return {
+            "sync_fstring": measure(calls, eager, use_queue=False),
+            "sync_lazy": measure(calls, lazy, use_queue=False),
+            "queue_lazy": measure(calls, lazy),
+            "queue_json": measure(calls, lazy, json_lines=True),
+            "filtered_fstring": measure(calls, eager, level=logging.WARNING),
+            "filtered_lazy": measure(calls, lazy, level=logging.WARNING),
+        }
+    finally:
+        sys.stderr.close()
+        sys.stderr = stderr
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=20_000)
+    args = parser.parse_args()
+
+    for name, stats in run(args.calls).items():
+        print(f"{name:>18}: {stats['us_per_order']:8.2f} us per order on the calling thread  "
+              f"(listener drain {stats['drain_ms']:7.1f} ms)")
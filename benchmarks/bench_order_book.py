@@ -0,0 +1,103 @@
+# benchmarks/bench_order_book.py
+
+"""
+Order book query and update cost.
+
+Builds a ``--levels``-per-side OrderBook from a synthetic snapshot and
+times top of book, mid/spread, depth to a notional, MARKET fill
+estimates and applying diff-depth updates, next to a dict-of-levels
+book (sorted on every query) as the naive baseline.
+
+Run: python -m benchmarks.bench_order_book --levels 1000
+"""
+
+import argparse
+import random
+import time
+
+from bot.order_book import OrderBook
+
+
+def synthetic_snapshot(levels: int, mid: float = 60_000.0, tick: float = 0.1) -> dict:
+    rng = random.Random(7)
+    return {
+        "lastUpdateId": 1,
+        "bids": [[f"{mid - tick * i:.1f}", f"{rng.uniform(0.001, 5):.3f}"] for i in range(1, levels + 1)],
+        "asks": [[f"{mid + tick * i:.1f}", f"{rng.uniform(0.001, 5):.3f}"] for i in range(1, levels + 1)],
+    }
+
+
+def synthetic_diffs(count: int, size: int, mid: float = 60_000.0, tick: float = 0.1) -> list:
+    rng = random.Random(11)
+    diffs = []
+
+    for _ in range(count):
+        def side(sign):
+            return [
+                [f"{mid + sign * tick * rng.randint(1, 50):.1f}", f"{rng.choice([0, rng.uniform(0.001, 5)]):.3f}"]
+                for _ in range(size)
+            ]
+        diffs.append((side(-1), side(1)))
+
+    return diffs
+
+
+def timed(fn, calls: int) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def run(levels: int = 1000, calls: int = 20_000, diff_size: int = 10) -> dict:
+    snapshot = synthetic_snapshot(levels)
+    book = OrderBook.from_snapshot("BTCUSDT", snapshot)
+
+    naive = {
+        "bids": {float(p): float(q) for p, q in snapshot["bids"]},
+        "asks": {float(p): float(q) for p, q in snapshot["asks"]},
+    }
+
+    def naive_fill(quantity):
+        remaining, cost = quantity, 0.0
+        for price in sorted(naive["asks"]):
+            take = min(remaining, naive["asks"][price])
+            cost += take * price
+            remaining -= take
+            if remaining <= 0:
+                break
+        return cost / (quantity - remaining)
+
+    diffs = synthetic_diffs(calls, diff_size)
+    position = iter(range(calls))
+
+    def apply():
+        bids, asks = diffs[next(position)]
+        book.apply(bids, asks, 2)
+
+    return {
+        "book": {
+            "best_bid_us_per_call": timed(book.best_bid, calls),
+            "mid_us_per_call": timed(book.mid, calls),
+            "spread_bps_us_per_call": timed(book.spread_bps, calls),
+            "depth_us_per_call": timed(lambda: book.depth("BUY", 250_000), calls),
+            "estimate_fill_us_per_call": timed(lambda: book.estimate_fill("SELL", 5), calls),
+            "apply_diff_us_per_call": timed(apply, calls),
+        },
+        "naive_dict": {
+            "best_bid_us_per_call": timed(lambda: max(naive["bids"]), calls // 10),
+            "estimate_fill_us_per_call": timed(lambda: naive_fill(5), calls // 10),
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--levels", type=int, default=1000)
+    parser.add_argument("--calls", type=int, default=20_000)
+    parser.add_argument("--diff-size", type=int, default=10, help="levels per side in each diff")
+    args = parser.parse_args()
+
+    for name, stats in run(args.levels, args.calls, args.diff_size).items():
+        for metric, value in stats.items():
+            print(f"{name:>10} {metric.replace('_us_per_call', ''):>14}: {value:9.2f} us")
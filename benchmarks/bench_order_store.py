@@ -0,0 +1,85 @@
+# benchmarks/bench_order_store.py
+
+"""
+Order store write, lookup and recovery cost.
+
+Records ``--orders`` order lifecycles (intent, ack, stream fill) in an
+OrderStore backed by a temporary write-ahead log, then times lookups by
+orderId and clientOrderId, the open-order view, and rebuilding the whole
+store from the log as a restarted bot would.
+
+Run: python -m benchmarks.bench_order_store --orders 20000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from bot.order_store import OrderStore
+
+SYMBOLS = ("BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT", "XRPUSDT")
+
+
+def timed(fn, calls: int) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def run(orders: int = 20_000, open_every: int = 10, calls: int = 20_000) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "orders.wal")
+        store = OrderStore(path, retain_closed=orders)
+
+        started = time.perf_counter()
+        for i in range(orders):
+            client_order_id = f"bench-{i}"
+            symbol = SYMBOLS[i % len(SYMBOLS)]
+            store.record_submit({
+                "newClientOrderId": client_order_id, "symbol": symbol, "side": "BUY",
+                "type": "LIMIT", "quantity": "0.01", "price": "100", "timeInForce": "GTC",
+            })
+            store.record_order({
+                "clientOrderId": client_order_id, "orderId": i + 1, "symbol": symbol,
+                "status": "NEW", "executedQty": "0", "updateTime": i,
+            })
+            if i % open_every:
+                store.record_event({
+                    "c": client_order_id, "i": i + 1, "s": symbol, "X": "FILLED",
+                    "z": "0.01", "ap": "100.5", "T": i + 1,
+                })
+        record_us = (time.perf_counter() - started) / (orders * 3) * 1e6
+        store.close()
+
+        started = time.perf_counter()
+        recovered = OrderStore(path, retain_closed=orders)
+        reload_ms = (time.perf_counter() - started) * 1000
+
+        try:
+            return {
+                "store": {
+                    "orders": orders,
+                    "open_orders": len(recovered.open_orders()),
+                    "record_us_per_call": record_us,
+                    "get_by_order_id_us_per_call": timed(lambda: recovered.get(orders // 2), calls),
+                    "get_by_client_id_us_per_call": timed(lambda: recovered.get(client_order_id="bench-7"), calls),
+                    "open_orders_symbol_us_per_call": timed(lambda: recovered.open_orders("ETHUSDT"), calls // 100),
+                    "reload_ms": reload_ms,
+                },
+            }
+        finally:
+            recovered.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, default=20_000)
+    parser.add_argument("--open-every", type=int, default=10, help="every Nth order stays open")
+    parser.add_argument("--calls", type=int, default=20_000)
+    args = parser.parse_args()
+
+    for name, stats in run(args.orders, args.open_every, args.calls).items():
+        for metric, value in stats.items():
+            print(f"{name:>6} {metric:>32}: {value:12.2f}")
@@ -0,0 +1,98 @@
+# benchmarks/bench_orders.py
+
+"""
+Order placement load test against the local simulated exchange.
+
+Starts an in-process simulator, then places MARKET orders through
+OrderManager with REST polling, with the user-data stream, and through
+the batch endpoint, reporting latency percentiles and throughput. Needs
+no API keys or network access.
+
+Run: python -m benchmarks.bench_orders --orders 40 --threads 8 --latency-ms 20
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from bot.client import BinanceFuturesClient
+from bot.orders import OrderManager
+from bot.scheduler import RequestScheduler
+from simulator import SimulatedExchange, SimulatorServer
+
+
+def _order(i: int) -> dict:
+    return {"symbol": "BTCUSDT", "side": "BUY" if i % 2 else "SELL", "order_type": "MARKET", "quantity": 0.001}
+
+
+def _summary(latencies: list, elapsed: float, results: list) -> dict:
+    latencies = np.array(latencies) * 1000
+    return {
+        "orders": len(results),
+        "filled": sum(result["status"] == "FILLED" for result in results),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "orders_per_s": len(results) / elapsed,
+    }
+
+
+def place_concurrently(manager: OrderManager, orders: int, threads: int) -> dict:
+    latencies = []
+
+    def place(i):
+        started = time.perf_counter()
+        spec = _order(i)
+        result = manager.place_order(spec["symbol"], spec["side"], spec["order_type"], spec["quantity"])
+        latencies.append(time.perf_counter() - started)
+        return result
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(place, range(orders)))
+
+    return _summary(latencies, time.perf_counter() - started, results)
+
+
+def place_batched(manager: OrderManager, orders: int, threads: int) -> dict:
+    started = time.perf_counter()
+    results = manager.place_orders([_order(i) for i in range(orders)], wait_for_fill=True, max_workers=threads)
+    elapsed = time.perf_counter() - started
+
+    return _summary([elapsed], elapsed, results)
+
+
+def run(orders: int = 40, threads: int = 8, latency_ms: float = 20.0, fill_delay: float = 0.05) -> dict:
+    exchange = SimulatedExchange(fill_delay=fill_delay)
+
+    with SimulatorServer(exchange, port=0, latency_ms=latency_ms) as server:
+        client = BinanceFuturesClient(base_url=server.url, scheduler=RequestScheduler())
+
+        polling = OrderManager(client=client)
+        streaming = OrderManager(client=client, use_user_stream=True)
+
+        try:
+            return {
+                "rest_polling": place_concurrently(polling, orders, threads),
+                "user_stream": place_concurrently(streaming, orders, threads),
+                "batch_stream": place_batched(streaming, orders, threads),
+            }
+        finally:
+            streaming.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, default=40)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--fill-delay", type=float, default=0.05)
+    args = parser.parse_args()
+
+    for name, stats in run(args.orders, args.threads, args.latency_ms, args.fill_delay).items():
+        print(
+            f"{name:>14}: {stats['filled']}/{stats['orders']} filled  "
+            f"p50 {stats['p50_ms']:8.1f} ms  p95 {stats['p95_ms']:8.1f} ms  "
+            f"{stats['orders_per_s']:7.1f} orders/s"
+        )
@@ -0,0 +1,134 @@
+# benchmarks/bench_records.py
+
+"""
+Trade / position formatting micro-benchmark.
+
+Compares the original per-row dict formatting with the slotted record
+classes and the bulk NumPy structured-array path in bot/records.py on a
+synthetic futures userTrades payload and a positionRisk payload, and
+times get_trade_history's local ledger query over the same trades.
+
+Run: python -m benchmarks.bench_records --trades 100000
+"""
+
+import argparse
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from bot.records import position_records, positions_to_array, trades_to_array, trades_to_records
+from bot.trade_store import TradeStore
+
+
+def synthetic_trades(n: int, seed: int = 3) -> list:
+    rng = np.random.default_rng(seed)
+    prices = 60_000 + rng.normal(0, 500, n)
+    return [
+        {
+            "symbol": "BTCUSDT",
+            "id": i,
+            "orderId": i,
+            "side": "BUY" if i % 2 else "SELL",
+            "price": f"{prices[i]:.1f}",
+            "qty": "0.010",
+            "realizedPnl": f"{rng.normal():.8f}",
+            "commission": "0.024",
+            "commissionAsset": "USDT",
+            "time": 1_700_000_000_000 + i * 1000,
+            "positionSide": "BOTH",
+            "maker": False,
+            "buyer": bool(i % 2),
+        }
+        for i in range(n)
+    ]
+
+
+def synthetic_positions(n: int, open_count: int = 10) -> list:
+    return [
+        {
+            "symbol": f"SYM{i}USDT",
+            "positionAmt": "0.500" if i < open_count else "0.000",
+            "entryPrice": "123.4",
+            "unRealizedProfit": "1.25",
+            "leverage": "20",
+            "markPrice": "125.0",
+        }
+        for i in range(n)
+    ]
+
+
+def legacy_trades(trades: list) -> list:
+    return [
+        {
+            "symbol": trade.get("symbol"),
+            "side": trade.get("side"),
+            "quantity": float(trade.get("qty", 0)),
+            "price": float(trade.get("price", 0)),
+            "realizedPnl": float(trade.get("realizedPnl", 0)),
+            "time": datetime.fromtimestamp(trade.get("time") / 1000),
+        }
+        for trade in trades
+    ]
+
+
+def legacy_positions(positions: list) -> list:
+    return [
+        {
+            "symbol": pos.get("symbol"),
+            "positionAmt": float(pos.get("positionAmt", 0)),
+            "entryPrice": float(pos.get("entryPrice", 0)),
+            "unrealizedProfit": float(pos.get("unRealizedProfit", 0)),
+            "leverage": pos.get("leverage", "N/A"),
+        }
+        for pos in positions
+        if float(pos.get("positionAmt", 0)) != 0
+    ]
+
+
+def measure(func, payload, repeat: int = 3) -> dict:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(payload)
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    result = func(payload)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    return {"ms": best * 1000, "mb": retained / 1e6}
+
+
+def run(trades: int = 100_000, positions: int = 500) -> dict:
+    trade_payload = synthetic_trades(trades)
+    position_payload = synthetic_positions(positions)
+
+    store = TradeStore(client=None, db_path=":memory:")
+    store._store(trade_payload)
+
+    results = {
+        "trades.legacy_dicts": measure(legacy_trades, trade_payload),
+        "trades.records": measure(trades_to_records, trade_payload),
+        "trades.array": measure(trades_to_array, trade_payload),
+        "positions.legacy_dicts": measure(legacy_positions, position_payload, repeat=50),
+        "positions.records": measure(lambda p: position_records(positions_to_array(p)), position_payload, repeat=50),
+        "positions.array": measure(positions_to_array, position_payload, repeat=50),
+        "trades.store_query": measure(lambda symbol: store.query(symbol), "BTCUSDT"),
+    }
+
+    store.close()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--trades", type=int, default=100_000)
+    parser.add_argument("--positions", type=int, default=500)
+    args = parser.parse_args()
+
+    for name, stats in run(args.trades, args.positions).items():
+        print(f"{name:>24}: {stats['ms']:9.2f} ms  {stats['mb']:8.2f} MB retained")
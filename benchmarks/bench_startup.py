@@ -0,0 +1,81 @@
+# benchmarks/bench_startup.py
+
+"""
+CLI cold-start benchmark.
+
+Times fresh interpreter runs of the startup paths that never reach the
+exchange: importing main.py, ``main.py --help`` and a ``trade`` command
+that fails validation. Also reports the slowest imports of ``main``.
+
+Run: python -m benchmarks.bench_startup --runs 10
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COMMANDS = {
+    "python_baseline": [sys.executable, "-c", "pass"],
+    "import_main": [sys.executable, "-c", "import main"],
+    "help": [sys.executable, "main.py", "--help"],
+    "trade_invalid": [
+        sys.executable, "main.py", "trade",
+        "--symbol", "BTCUSD", "--side", "BUY", "--type", "MARKET", "--quantity", "1",
+    ],
+}
+
+
+def time_command(command: list, runs: int) -> dict:
+    samples = []
+    env = dict(os.environ, BINANCE_API_KEY="bench", BINANCE_SECRET_KEY="bench")
+
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=REPO_ROOT, env=env, capture_output=True, check=False)
+        samples.append((time.perf_counter() - started) * 1000)
+
+    return {
+        "median_ms": statistics.median(samples),
+        "min_ms": min(samples),
+        "max_ms": max(samples),
+    }
+
+
+def slowest_imports(module: str = "main", top: int = 8) -> list:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=False,
+    )
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            rows.append((int(cumulative) / 1000, name.strip()))
+
+    return sorted(rows, reverse=True)[:top]
+
+
+def run(runs: int = 10) -> dict:
+    return {name: time_command(command, runs) for name, command in COMMANDS.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    for name, stats in run(args.runs).items():
+        print(f"{name:>16}: median {stats['median_ms']:.1f} ms "
+              f"(min {stats['min_ms']:.1f}, max {stats['max_ms']:.1f})")
+
+    print("\nSlowest imports of main (cumulative ms):")
+    for ms, name in slowest_imports():
+        print(f"  {ms:8.1f}  {name}")
@@ -0,0 +1,142 @@
+# benchmarks/bench_strategies.py
+
+"""
+Strategy runner dispatch cost and decision-to-ack latency.
+
+Runs ``--strategies`` moving-average strategies spread over
+``--symbols`` symbols in one StrategyRunner against the in-process
+simulator. Closed 1m klines are fed through a shared MarketDataService;
+every strategy reads its window from the feed on each bar and places a
+MARKET order every ``--order-every`` bars. Reports bars dispatched per
+second, per-callback CPU time and the decision-to-ack latency of the
+orders. Needs no API keys or network access.
+
+Run: python -m benchmarks.bench_strategies --strategies 60 --bars 200
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from bot.client import BinanceFuturesClient
+from bot.market_data import MarketDataService
+from bot.metrics import Histogram
+from bot.orders import OrderManager
+from bot.scheduler import RequestScheduler
+from bot.strategy import Strategy, StrategyRunner
+from simulator import SimulatedExchange, SimulatorServer
+
+SYMBOLS = ("BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT", "XRPUSDT")
+
+
+class MovingAverageStrategy(Strategy):
+    window = 20
+
+    def __init__(self, name: str, symbol: str, order_every: int):
+        super().__init__(name, [(symbol, "1m")])
+        self.symbol = symbol
+        self.order_every = order_every
+        self.seen = 0
+
+    def on_bar(self, ctx, symbol, interval, bar):
+        self.seen += 1
+        closes = ctx.latest(symbol, interval, self.window)["close"]
+
+        if self.order_every and self.seen % self.order_every == 0:
+            side = "BUY" if bar[4] >= closes.mean() else "SELL"
+            ctx.submit(symbol, side, "MARKET", 0.1)
+
+
+def kline_message(symbol: str, open_time: int, price: float) -> str:
+    return json.dumps({
+        "stream": f"{symbol.lower()}@kline_1m",
+        "data": {
+            "e": "kline",
+            "s": symbol,
+            "k": {
+                "t": open_time, "T": open_time + 59_999, "i": "1m", "x": True,
+                "o": price, "h": price * 1.001, "l": price * 0.999, "c": price, "v": 10.0,
+            },
+        },
+    })
+
+
+def run(strategies: int = 60, symbols: int = 5, bars: int = 200, order_every: int = 50,
+        latency_ms: float = 5.0) -> dict:
+    symbols = SYMBOLS[:max(1, min(symbols, len(SYMBOLS)))]
+
+    with SimulatorServer(SimulatedExchange(), port=0, latency_ms=latency_ms) as server:
+        client = BinanceFuturesClient(base_url=server.url, scheduler=RequestScheduler())
+        manager = OrderManager(client=client, use_user_stream=True)
+
+        # Bars are fed by hand, so the feed is not connected to a socket
+        feed = MarketDataService([(symbol, "1m") for symbol in symbols], capacity=500, use_store=False)
+        instances = [
+            MovingAverageStrategy(f"ma{i}", symbols[i % len(symbols)], order_every) for i in range(strategies)
+        ]
+        runner = StrategyRunner(instances, manager=manager, market_data=feed)
+
+        try:
+            runner.start()
+
+            messages = [
+                kline_message(symbol, i * 60_000, 100.0 + np.sin(i / 10))
+                for i in range(bars) for symbol in symbols
+            ]
+
+            started = time.perf_counter()
+            for message in messages:
+                feed.handle_message(message)
+
+            contexts = runner.contexts
+            orders = strategies * (bars // order_every) if order_every else 0
+            deadline = time.monotonic() + 30
+
+            while sum(ctx.bars for ctx in contexts) < strategies * bars and time.monotonic() < deadline:
+                time.sleep(0.001)
+            elapsed = time.perf_counter() - started
+
+            while sum(ctx.decision_latency.count for ctx in contexts) < orders and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        finally:
+            runner.stop()
+            manager.close()
+
+    cpu = np.array([ctx.cpu_time / ctx.calls for ctx in contexts if ctx.calls]) * 1e6
+    latency = Histogram()
+    for ctx in contexts:
+        latency.counts = [a + b for a, b in zip(latency.counts, ctx.decision_latency.counts)]
+        latency.count += ctx.decision_latency.count
+        latency.sum += ctx.decision_latency.sum
+
+    return {
+        "runner": {
+            "strategies": strategies,
+            "bars_dispatched": sum(ctx.bars for ctx in contexts),
+            "bars_per_s": sum(ctx.bars for ctx in contexts) / elapsed,
+            "callback_cpu_us_per_call": float(cpu.mean()) if len(cpu) else 0.0,
+            "max_callback_cpu_us_per_call": float(cpu.max()) if len(cpu) else 0.0,
+            "orders_acked": latency.count,
+            "decision_to_ack_avg_ms": latency.sum / latency.count * 1000 if latency.count else 0.0,
+            # Bucket upper bound, too coarse to gate on
+            "decision_to_ack_p99_le": latency.quantile(0.99),
+            "errors": sum(ctx.errors for ctx in contexts),
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--strategies", type=int, default=60)
+    parser.add_argument("--symbols", type=int, default=5)
+    parser.add_argument("--bars", type=int, default=200)
+    parser.add_argument("--order-every", type=int, default=50, help="bars between orders per strategy (0: none)")
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    for name, stats in run(args.strategies, args.symbols, args.bars, args.order_every, args.latency_ms).items():
+        for metric, value in stats.items():
+            print(f"{name:>8} {metric:>30}: {value:12.2f}")
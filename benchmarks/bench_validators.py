@@ -0,0 +1,109 @@
+# benchmarks/bench_validators.py
+
+"""
+Pre-trade filter validation cost, one order at a time vs vectorized.
+
+Quantizes ``--orders`` synthetic LIMIT and MARKET orders over several
+symbols to their exchange filters (tick size, step size, min notional)
+with validate_order_filters in a loop and with one validate_orders_batch
+call, and checks that both agree.
+
+Run: python -m benchmarks.bench_validators --orders 10000
+"""
+
+import argparse
+import random
+import time
+
+from bot.exchange_info import SymbolFilters
+from bot.validators import validate_order_filters, validate_orders_batch
+
+# symbol -> (price, tick size)
+SYMBOLS = {
+    "BTCUSDT": (65_000.0, 0.1),
+    "ETHUSDT": (3_200.0, 0.01),
+    "SOLUSDT": (150.0, 0.01),
+    "XRPUSDT": (0.6, 0.0001),
+    "DOGEUSDT": (0.15, 0.00001),
+}
+
+
+def make_orders(count: int, seed: int = 7) -> tuple:
+    rng = random.Random(seed)
+    names = list(SYMBOLS)
+    symbols, sides, types, quantities, prices, references = [], [], [], [], [], []
+
+    for i in range(count):
+        symbol = names[i % len(names)]
+        mark = SYMBOLS[symbol][0]
+        order_type = "MARKET" if i % 3 == 0 else "LIMIT"
+        symbols.append(symbol)
+        sides.append("BUY" if i % 2 else "SELL")
+        types.append(order_type)
+        # A few percent of orders land below the 5 USDT min notional
+        quantities.append(rng.uniform(0.1, 500) / mark)
+        prices.append(None if order_type == "MARKET" else mark * rng.uniform(0.99, 1.01))
+        references.append(mark)
+
+    return symbols, sides, types, quantities, prices, references
+
+
+def run(orders: int = 10_000, repeat: int = 5) -> dict:
+    filters = {
+        symbol: SymbolFilters(symbol, tick_size=tick, min_price=tick, step_size=0.001 if price > 1 else 1.0,
+                              min_qty=0.001 if price > 1 else 1.0, min_notional=5.0)
+        for symbol, (price, tick) in SYMBOLS.items()
+    }
+    symbols, sides, types, quantities, prices, references = make_orders(orders)
+
+    def scalar():
+        out = []
+        for i in range(orders):
+            try:
+                out.append(validate_order_filters(
+                    filters[symbols[i]], sides[i], types[i], quantities[i], prices[i], references[i]
+                ))
+            except ValueError:
+                out.append(None)
+        return out
+
+    def batch():
+        return validate_orders_batch(filters, symbols, sides, types, quantities, prices, references)
+
+    timings = {}
+    for name, fn in (("scalar", scalar), ("batch", batch)):
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = fn()
+            best = min(best, time.perf_counter() - started)
+        timings[name] = (best, result)
+
+    one_by_one, vectorized = timings["scalar"][1], timings["batch"][1]
+    mismatches = sum(
+        (expected is None) == bool(vectorized["valid"][i])
+        or (expected is not None and expected[0] != vectorized["quantity"][i])
+        for i, expected in enumerate(one_by_one)
+    )
+
+    return {
+        "filters": {
+            "orders": orders,
+            "rejected": int((~vectorized["valid"]).sum()),
+            "mismatches": mismatches,
+            "scalar_us_per_call": timings["scalar"][0] / orders * 1e6,
+            "batch_us_per_call": timings["batch"][0] / orders * 1e6,
+            "batch_orders_per_s": orders / timings["batch"][0],
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, stats in run(args.orders, args.repeat).items():
+        for metric, value in stats.items():
+            print(f"{name:>8} {metric:>20}: {value:14.2f}")
@@ -0,0 +1,233 @@
+# benchmarks/suite.py
+
+"""
+Run every benchmark and record the results as a machine-readable baseline.
+
+Each run is written to benchmarks/results/<commit>.json. ``--save``
+also stores it as a named baseline (benchmarks/baselines/<name>.json)
+and ``--compare`` diffs the run against one, flagging metrics that got
+worse by more than ``--threshold``; ``--check`` makes regressions fail
+the process, for CI.
+
+Run: python -m benchmarks.suite --quick --compare baseline --check
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from benchmarks import (
+    bench_bulk_orders,
+    bench_execution,
+    bench_indicators,
+    bench_klines,
+    bench_logging,
+    bench_order_book,
+    bench_order_store,
+    bench_orders,
+    bench_records,
+    bench_startup,
+    bench_strategies,
+    bench_validators,
+)
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_DIR = os.path.join(BENCH_DIR, "baselines")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+DEFAULT_THRESHOLD = 0.25
+
+# name -> (run function, full parameters, --quick parameters)
+SUITE = {
+    "startup": (bench_startup.run, {"runs": 10}, {"runs": 3}),
+    "orders": (
+        bench_orders.run,
+        {"orders": 40, "threads": 8, "latency_ms": 20.0},
+        {"orders": 16, "threads": 8, "latency_ms": 20.0},
+    ),
+    "records": (
+        bench_records.run,
+        {"trades": 100_000, "positions": 500},
+        {"trades": 20_000, "positions": 500},
+    ),
+    "logging": (bench_logging.run, {"calls": 20_000}, {"calls": 5_000}),
+    "klines": (bench_klines.run, {"rows": 200_000}, {"rows": 50_000, "repeat": 2}),
+    "indicators": (
+        bench_indicators.run,
+        {"bars_count": 100_000, "ticks": 200},
+        {"bars_count": 20_000, "ticks": 50},
+    ),
+    "order_book": (bench_order_book.run, {"levels": 1000, "calls": 20_000}, {"levels": 1000, "calls": 5_000}),
+    "strategies": (
+        bench_strategies.run,
+        {"strategies": 60, "bars": 200},
+        {"strategies": 60, "bars": 50, "order_every": 25},
+    ),
+    "execution": (bench_execution.run, {"parents": 100}, {"parents": 40}),
+    "order_store": (bench_order_store.run, {"orders": 20_000}, {"orders": 5_000, "calls": 5_000}),
+    "validators": (bench_validators.run, {"orders": 10_000}, {"orders": 2_000}),
+    "bulk_orders": (bench_bulk_orders.run, {"orders": 1000}, {"orders": 500, "sequential": 50}),
+}
+
+# Metric-name suffixes and which way is better
+LOWER_IS_BETTER = ("ms", "mb", "_us_per_tick", "_us_per_call", "_per_order", "_per_million_rows")
+HIGHER_IS_BETTER = ("_per_s", "speedup")
+
+
+def direction(metric: str) -> int:
+    """-1 if lower is better, 1 if higher is better, 0 if not a performance metric."""
+    name = metric.rsplit(".", 1)[-1]
+
+    if name.startswith("max_"):
+        # Single worst samples are too noisy to gate on
+        return 0
+    if name.endswith(HIGHER_IS_BETTER):
+        return 1
+    if name.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def flatten(results: dict, prefix: str = "") -> dict:
+    flat = {}
+
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+
+    return flat
+
+
+def git_commit() -> str:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCH_DIR, capture_output=True, text=True, check=True,
+        )
+        commit = result.stdout.strip()
+
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=BENCH_DIR, capture_output=True, text=True, check=True,
+        )
+        return f"{commit}-dirty" if dirty.stdout.strip() else commit
+
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(only: list = None, quick: bool = False) -> dict:
+    benches = {}
+
+    for name, (func, params, quick_params) in SUITE.items():
+        if only and name not in only:
+            continue
+
+        params = quick_params if quick else params
+        print(f"Running {name} {params} ...", file=sys.stderr)
+
+        started = time.perf_counter()
+        results = func(**params)
+        benches[name] = {
+            "params": params,
+            "elapsed_s": time.perf_counter() - started,
+            "metrics": flatten(results),
+        }
+
+    return {
+        "commit": git_commit(),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "quick": quick,
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "benchmarks": benches,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """
+    Return one row per comparable metric: (metric, baseline, current, change, regressed).
+
+    ``change`` is the relative change in the "worse" direction, so a
+    positive value is always a slowdown. Benchmarks whose parameters
+    differ from the baseline's are skipped.
+    """
+    rows = []
+
+    for name, bench in current["benchmarks"].items():
+        base = baseline["benchmarks"].get(name)
+        if base is None or base["params"] != bench["params"]:
+            continue
+
+        for metric, value in bench["metrics"].items():
+            sign = direction(metric)
+            old = base["metrics"].get(metric)
+            if not sign or not old:
+                continue
+
+            change = (old - value) / old if sign > 0 else (value - old) / old
+            rows.append((f"{name}.{metric}", old, value, change, change > threshold))
+
+    return rows
+
+
+def _load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write(path: str, data: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--only", help=f"comma-separated subset of: {', '.join(SUITE)}")
+    parser.add_argument("--quick", action="store_true", help="smaller inputs, for CI")
+    parser.add_argument("--save", metavar="NAME", help="store this run as baselines/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="diff against baselines/NAME.json (or a path)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed relative slowdown")
+    parser.add_argument("--check", action="store_true", help="exit 1 if any metric regressed")
+    args = parser.parse_args()
+
+    current = run(args.only.split(",") if args.only else None, args.quick)
+
+    results_path = os.path.join(RESULTS_DIR, f"{current['commit']}.json")
+    _write(results_path, current)
+    print(f"Results written to {results_path}")
+
+    if args.save:
+        baseline_path = os.path.join(BASELINE_DIR, f"{args.save}.json")
+        _write(baseline_path, current)
+        print(f"Baseline saved to {baseline_path}")
+
+    if args.compare:
+        path = args.compare if args.compare.endswith(".json") else os.path.join(BASELINE_DIR, f"{args.compare}.json")
+        baseline = _load(path)
+        rows = compare(current, baseline, args.threshold)
+        regressions = [row for row in rows if row[4]]
+
+        print(f"\nCompared with {baseline['commit']} ({baseline['created']}):")
+        for metric, old, new, change, regressed in rows:
+            flag = "REGRESSION" if regressed else ""
+            print(f"  {metric:<58} {old:12.4g} -> {new:12.4g}  {change:+7.1%}  {flag}")
+
+        print(f"\n{len(regressions)} of {len(rows)} metrics regressed by more than {args.threshold:.0%}")
+
+        if args.check and regressions:
+            sys.exit(1)
@@ -0,0 +1,186 @@
+# bot/account_state.py
+
+import logging
+import threading
+import time
+
+REFRESH_INTERVAL = 5.0
+RECENT_TRADES = 50
+
+SECTIONS = ("balance", "positions", "trades")
+
+_shared_state = None
+_shared_state_lock = threading.Lock()
+
+
+def get_account_state() -> "AccountState":
+    """Process-wide AccountState (with its own OrderManager), started on first call."""
+    global _shared_state
+
+    if _shared_state is None:
+        with _shared_state_lock:
+            if _shared_state is None:
+                _shared_state = AccountState().start()
+
+    return _shared_state
+
+
+class AccountState:
+    """
+    Balance, positions and recent trades kept fresh by one background thread.
+
+    Readers (dashboard sessions) take ``snapshot()`` from memory and never
+    call the exchange, so any number of them costs the same API weight as
+    one. The thread refreshes every ``refresh_interval`` seconds, and at
+    once when the user-data stream reports a fill or balance change or
+    ``request_refresh()`` is called. Each section carries a version that
+    only moves when its content changes, and ``wait_for_change`` blocks
+    until one does, so views can redraw only what changed.
+    """
+
+    def __init__(self, manager=None, refresh_interval: float = REFRESH_INTERVAL,
+                 recent_trades: int = RECENT_TRADES, use_user_stream: bool = True):
+        self.logger = logging.getLogger(__name__)
+
+        if manager is None:
+            from bot.client import get_client
+            from bot.order_store import OrderStore
+            from bot.orders import OrderManager
+
+            client = get_client()
+            # Read-only: the dashboard runs for hours and must not lock CLI commands out of the log
+            manager = OrderManager(
+                use_user_stream=use_user_stream, client=client,
+                order_store=OrderStore(base_url=client.base_url, read_only=True),
+            )
+
+        self.manager = manager
+        self.refresh_interval = refresh_interval
+        self.recent_trades = recent_trades
+
+        self._data = {section: None for section in SECTIONS}
+        self._versions = {section: 0 for section in SECTIONS}
+        self._updated = None
+        self._error = None
+        self._changed = threading.Condition()
+
+        # Symbols with fills reported by the stream, synced past the ledger's rate limit
+        self._filled_symbols = set()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+        self.refreshes = 0
+
+        if manager.user_stream is not None:
+            manager.user_stream.add_callback(self._on_stream_event)
+
+    # -------------------------------
+    # LIFECYCLE
+    # -------------------------------
+    def start(self) -> "AccountState":
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="account-state", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping.set()
+        self._wake.set()
+
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+
+    def request_refresh(self):
+        """Refresh now instead of at the next interval (e.g. after placing an order)."""
+        self._wake.set()
+
+    def _on_stream_event(self, event: dict):
+        if event.get("e") == "ORDER_TRADE_UPDATE" and event["o"].get("x") == "TRADE":
+            self._filled_symbols.add(event["o"]["s"])
+
+        if event.get("e") in ("ACCOUNT_UPDATE", "ORDER_TRADE_UPDATE"):
+            self._wake.set()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.clear()
+            self.refresh()
+            self._wake.wait(self.refresh_interval)
+
+    # -------------------------------
+    # REFRESH
+    # -------------------------------
+    def refresh(self):
+        """Fetch every section once and publish the ones that changed."""
+        manager = self.manager
+        fresh = {}
+
+        try:
+            fresh["balance"] = manager.get_account_balance()
+            fresh["positions"] = [position.to_dict() for position in manager.get_open_positions()]
+
+            filled, self._filled_symbols = self._filled_symbols, set()
+            try:
+                manager.trade_store.sync()
+                if filled:
+                    manager.trade_store.sync(sorted(filled), force=True)
+            except Exception:
+                # Kept for the next refresh, together with any filled since
+                self._filled_symbols |= filled
+                raise
+            fresh["trades"] = [
+                trade.to_dict() for trade in reversed(manager.trade_store.query(limit=self.recent_trades))
+            ]
+            error = None
+
+        except Exception as e:
+            self.logger.warning(f"Account state refresh failed: {e}")
+            error = str(e)
+
+        with self._changed:
+            for section, value in fresh.items():
+                if value != self._data[section]:
+                    self._data[section] = value
+                    self._versions[section] += 1
+
+            self._error = error
+            if error is None:
+                self._updated = time.time()
+
+            self.refreshes += 1
+            self._changed.notify_all()
+
+    # -------------------------------
+    # READS
+    # -------------------------------
+    def snapshot(self) -> dict:
+        """The latest state; section values are shared, treat them as read-only."""
+        with self._changed:
+            return {
+                **self._data,
+                "versions": dict(self._versions),
+                "updated": self._updated,
+                "error": self._error,
+            }
+
+    def version(self) -> tuple:
+        with self._changed:
+            return tuple(self._versions[section] for section in SECTIONS)
+
+    def wait_for_change(self, version: tuple, timeout: float = None) -> bool:
+        """Block until any section's version differs from ``version``; False on timeout."""
+        with self._changed:
+            return self._changed.wait_for(
+                lambda: tuple(self._versions[section] for section in SECTIONS) != version, timeout
+            )
+
+    def trade_count(self, symbol: str = None) -> int:
+        return self.manager.trade_store.count(symbol)
+
+    def trades_page(self, page: int = 1, page_size: int = 100, symbol: str = None) -> list:
+        """One page of the trade ledger, newest first, read from the locally synced ledger only."""
+        trades = self.manager.trade_store.query(symbol, limit=page_size, offset=(page - 1) * page_size)
+        return [trade.to_dict() for trade in reversed(trades)]
@@ -0,0 +1,155 @@
+# bot/backtest.py
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_FEE_RATE = 0.0004
+DEFAULT_FUNDING_RATE = 0.0001
+FUNDING_INTERVAL_MS = 8 * 60 * 60 * 1000
+
+
+def _epoch_ms(values) -> np.ndarray:
+    values = np.asarray(values)
+
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype("datetime64[ms]").astype("int64")
+
+    return values.astype("int64")
+
+
+class BacktestResult:
+    def __init__(self, symbol, open_time, position, equity, trades, fees, funding, initial_balance):
+        self.symbol = symbol
+        self.open_time = open_time
+        self.position = position
+        self.equity = equity
+        self.trades = trades
+        self.fees = fees
+        self.funding = funding
+        self.initial_balance = initial_balance
+
+    def equity_curve(self) -> pd.Series:
+        return pd.Series(self.equity, index=pd.to_datetime(self.open_time, unit="ms"), name="equity")
+
+    def trade_records(self) -> list:
+        """Trades in the OrderManager.get_trade_history record format."""
+        records = self.trades.to_dict("records")
+        for record in records:
+            record["time"] = record["time"].to_pydatetime()
+        return records
+
+    def summary(self) -> dict:
+        equity = self.equity
+        peak = np.maximum.accumulate(equity) if len(equity) else equity
+        drawdown = (equity - peak) / peak if len(equity) else equity
+
+        return {
+            "symbol": self.symbol,
+            "bars": int(len(equity)),
+            "trades": int(len(self.trades)),
+            "finalEquity": float(equity[-1]) if len(equity) else self.initial_balance,
+            "totalReturn": float(equity[-1] / self.initial_balance - 1) if len(equity) else 0.0,
+            "maxDrawdown": float(drawdown.min()) if len(equity) else 0.0,
+            "realizedPnl": float(self.trades["realizedPnl"].sum()),
+            "fees": float(self.fees.sum()),
+            "funding": float(self.funding.sum()),
+        }
+
+
+def run_backtest(
+    klines,
+    signals,
+    symbol: str = "BTCUSDT",
+    quantity: float = 1.0,
+    initial_balance: float = 10_000.0,
+    fee_rate: float = DEFAULT_FEE_RATE,
+    slippage_bps: float = 0.0,
+    funding_rate: float = DEFAULT_FUNDING_RATE,
+) -> BacktestResult:
+    """
+    Vectorized backtest of target-position signals over OHLCV bars.
+
+    ``klines`` is a get_futures_klines DataFrame or a KlineFile / column
+    dict. ``signals[i]`` is the target position (in units of
+    ``quantity``, e.g. -1, 0, 1) decided at the close of bar i; it is
+    filled at the open of bar i + 1. Funding is approximated as
+    ``position * close * funding_rate`` for every 8h funding time a bar
+    spans (longs pay a positive rate).
+    """
+    open_time = _epoch_ms(klines["open_time"])
+    close_time = _epoch_ms(klines["close_time"])
+    open_ = np.asarray(klines["open"], dtype="float64")
+    close = np.asarray(klines["close"], dtype="float64")
+    signals = np.asarray(signals, dtype="float64")
+
+    if len(signals) != len(open_):
+        raise ValueError("signals must have one value per bar")
+
+    n = len(open_)
+
+    # Position held through bar i is the signal from bar i - 1
+    position = np.zeros(n)
+    position[1:] = np.nan_to_num(signals[:-1]) * quantity
+
+    previous = np.zeros(n)
+    previous[1:] = position[:-1]
+    delta = position - previous
+
+    slippage = slippage_bps / 10_000
+    fill_price = open_ * (1 + slippage * np.sign(delta))
+    fees = np.abs(delta) * fill_price * fee_rate
+
+    funding_times = close_time // FUNDING_INTERVAL_MS - (open_time - 1) // FUNDING_INTERVAL_MS
+    funding = position * close * funding_rate * funding_times
+
+    cash = initial_balance - np.cumsum(delta * fill_price + fees + funding)
+    equity = cash + position * close
+
+    trades = _trade_records(symbol, open_time, previous, position, delta, fill_price)
+
+    return BacktestResult(symbol, open_time, position, equity, trades, fees, funding, initial_balance)
+
+
+def _trade_records(symbol, open_time, previous, position, delta, fill_price) -> pd.DataFrame:
+    """
+    Realized PnL per trade on an average-cost basis, without a Python loop.
+
+    The cost basis C of the open position follows an affine recurrence:
+    reset to |pos| * price when a position opens or flips, C + qty * price
+    when it grows, C * |pos| / |prev| when it shrinks. Within each
+    segment between resets this is solved with grouped cumprod/cumsum.
+    """
+    idx = np.flatnonzero(delta)
+    prev, cur, price = previous[idx], position[idx], fill_price[idx]
+    prev_abs, cur_abs = np.abs(prev), np.abs(cur)
+
+    reset = (prev == 0) | (np.sign(prev) != np.sign(cur))
+    grow = ~reset & (cur_abs > prev_abs)
+    shrink = ~reset & (cur_abs < prev_abs)
+
+    factor = np.ones(len(idx))
+    factor[shrink] = cur_abs[shrink] / prev_abs[shrink]
+
+    addend = np.zeros(len(idx))
+    addend[reset] = cur_abs[reset] * price[reset]
+    addend[grow] = (cur_abs[grow] - prev_abs[grow]) * price[grow]
+
+    segment = np.cumsum(reset)
+    scale = pd.Series(factor).groupby(segment).cumprod().to_numpy()
+    cost = scale * pd.Series(addend / scale).groupby(segment).cumsum().to_numpy()
+
+    prev_cost = np.zeros(len(idx))
+    prev_cost[1:] = cost[:-1]
+
+    closed = np.where(reset, prev_abs, np.where(shrink, prev_abs - cur_abs, 0.0))
+    avg_entry = np.divide(prev_cost, prev_abs, out=np.zeros(len(idx)), where=prev_abs > 0)
+    realized = closed * (price - avg_entry) * np.sign(prev)
+
+    return pd.DataFrame({
+        "symbol": symbol,
+        "side": np.where(delta[idx] > 0, "BUY", "SELL"),
+        "quantity": np.abs(delta[idx]),
+        "price": price,
+        "realizedPnl": realized,
+        "time": pd.to_datetime(open_time[idx], unit="ms"),
+    })
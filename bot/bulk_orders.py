@@ -0,0 +1,277 @@
+# bot/bulk_orders.py
+
+import csv
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bot.orders import MAX_BATCH_SIZE
+from bot.validators import (
+    validate_order_type,
+    validate_price,
+    validate_quantity,
+    validate_side,
+    validate_symbol,
+)
+
+DEFAULT_CONCURRENCY = 8
+# Batches queued or in flight per worker; bounds memory however long the file is
+QUEUED_BATCHES_PER_WORKER = 2
+PROGRESS_INTERVAL = 1.0
+
+# Column / key names accepted for each place_order argument
+FIELD_ALIASES = {
+    "symbol": ("symbol",),
+    "side": ("side",),
+    "order_type": ("type", "order_type", "orderType"),
+    "quantity": ("quantity", "qty"),
+    "price": ("price",),
+    "time_in_force": ("time_in_force", "timeInForce"),
+    "client_order_id": ("client_order_id", "clientOrderId", "newClientOrderId"),
+}
+
+RESULT_FIELDS = (
+    "line", "symbol", "side", "type", "quantity", "price",
+    "clientOrderId", "orderId", "status", "executedQty", "avgPrice", "error",
+)
+
+
+# -------------------------------
+# INPUT
+# -------------------------------
+def read_orders(path: str):
+    """
+    Yield (line number, row dict) from a CSV (with a header row) or JSONL file.
+
+    The file is read one line at a time. A JSONL line that is not valid
+    JSON is yielded as (line, None).
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+            return
+
+        for line, text in enumerate(f, start=1):
+            if not text.strip():
+                continue
+            try:
+                row = json.loads(text)
+            except ValueError:
+                row = None
+            yield line, row if isinstance(row, dict) else None
+
+
+def _field(row: dict, name: str):
+    for key in FIELD_ALIASES[name]:
+        value = row.get(key)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _number(row: dict, name: str):
+    value = _field(row, name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {name} {value!r}") from None
+
+
+def parse_order(row: dict) -> dict:
+    """Turn an input row into ``place_order`` arguments, through the CLI validators."""
+    if row is None:
+        raise ValueError("Malformed line")
+
+    order_type = validate_order_type(_field(row, "order_type") or "")
+    quantity = _number(row, "quantity")
+    if quantity is None:
+        raise ValueError("Quantity is required")
+
+    order = {
+        "symbol": validate_symbol((_field(row, "symbol") or "").upper()),
+        "side": validate_side(_field(row, "side") or ""),
+        "order_type": order_type,
+        "quantity": validate_quantity(quantity),
+        "price": validate_price(_number(row, "price"), order_type) if order_type == "LIMIT" else None,
+    }
+
+    for name in ("time_in_force", "client_order_id"):
+        value = _field(row, name)
+        if value is not None:
+            order[name] = str(value)
+
+    return order
+
+
+# -------------------------------
+# OUTPUT
+# -------------------------------
+class ResultWriter:
+    """Thread-safe per-order result sink: JSON lines, or CSV for a .csv path."""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._csv = None
+        if path.lower().endswith(".csv"):
+            self._csv = csv.DictWriter(self._file, fieldnames=RESULT_FIELDS, extrasaction="ignore")
+            self._csv.writeheader()
+        self._lock = threading.Lock()
+
+    def write(self, results: list):
+        with self._lock:
+            for result in results:
+                if self._csv is not None:
+                    self._csv.writerow(result)
+                else:
+                    self._file.write(json.dumps(result) + "\n")
+            # Flushed per batch, so the file can be tailed while orders go out
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def _result(line: int, order: dict, outcome: dict) -> dict:
+    return {
+        "line": line,
+        "symbol": order.get("symbol"),
+        "side": order.get("side"),
+        "type": order.get("order_type"),
+        # As sent, after the symbol filters, when the manager echoes them
+        "quantity": outcome.get("quantity", order.get("quantity")),
+        "price": outcome.get("price", order.get("price")),
+        "clientOrderId": outcome.get("clientOrderId") or order.get("client_order_id"),
+        "orderId": outcome.get("orderId"),
+        "status": outcome["status"],
+        "executedQty": outcome.get("executedQty", 0),
+        "avgPrice": outcome.get("avgPrice", 0),
+        "error": outcome.get("error"),
+    }
+
+
+# -------------------------------
+# SUBMISSION
+# -------------------------------
+class BulkOrderSubmitter:
+    """
+    Streams orders from a file to the exchange through one OrderManager.
+
+    Rows are read and validated one at a time; rows that fail validation
+    are written out as INVALID without being sent. Valid orders are grouped
+    into batchOrders requests (MAX_BATCH_SIZE each), where the symbol
+    filters are applied, and at most ``concurrency`` requests are in
+    flight. Only a few batches per worker are ever queued, so memory stays
+    flat for any file size. Results are written as each batch completes,
+    so they come out in completion order; ``line`` points back at the input.
+    """
+
+    def __init__(self, manager=None, concurrency: int = DEFAULT_CONCURRENCY,
+                 progress_interval: float = PROGRESS_INTERVAL, on_progress=None):
+        self.logger = logging.getLogger(__name__)
+
+        if manager is None:
+            from bot.orders import OrderManager
+
+            manager = OrderManager()
+
+        self.manager = manager
+        self.concurrency = max(1, concurrency)
+        self.progress_interval = progress_interval
+        self.on_progress = on_progress
+
+        self._lock = threading.Lock()
+        self._counts = {"rows": 0, "invalid": 0, "submitted": 0, "accepted": 0, "failed": 0}
+        self._started = None
+
+    def run(self, path: str, output: str) -> dict:
+        """Submit every order in ``path``, writing one result per row to ``output``."""
+        writer = ResultWriter(output)
+        slots = threading.BoundedSemaphore(self.concurrency * QUEUED_BATCHES_PER_WORKER)
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="bulk-orders")
+
+        self._started = time.perf_counter()
+        last_progress = self._started
+        batch = []
+
+        def send(batch):
+            slots.acquire()
+            future = executor.submit(self._submit, batch, writer)
+            future.add_done_callback(lambda _: slots.release())
+
+        try:
+            for line, row in read_orders(path):
+                try:
+                    order = parse_order(row)
+                except ValueError as e:
+                    self._count(rows=1, invalid=1)
+                    raw = {name: _field(row, name) for name in FIELD_ALIASES} if row else {}
+                    writer.write([_result(line, raw, {"status": "INVALID", "error": str(e)})])
+                    continue
+
+                self._count(rows=1)
+                batch.append((line, order))
+
+                if len(batch) == MAX_BATCH_SIZE:
+                    send(batch)
+                    batch = []
+
+                    if self.on_progress and time.perf_counter() - last_progress >= self.progress_interval:
+                        last_progress = time.perf_counter()
+                        self.on_progress(self.stats())
+
+            if batch:
+                send(batch)
+
+        finally:
+            executor.shutdown(wait=True)
+            writer.close()
+
+        stats = self.stats()
+        self.logger.info(
+            f"Bulk submission of {path}: {stats['rows']} rows, {stats['accepted']} accepted, "
+            f"{stats['failed']} failed, {stats['invalid']} invalid in {stats['elapsedS']:.1f}s "
+            f"({stats['ordersPerS']:.1f} orders/s)"
+        )
+        return stats
+
+    def _submit(self, batch: list, writer: ResultWriter):
+        orders = [order for _, order in batch]
+
+        try:
+            outcomes = self.manager.place_orders(orders, max_workers=1)
+        except Exception as e:
+            self.logger.exception("Bulk batch submission failed")
+            outcomes = [{"orderId": None, "status": "ERROR", "error": str(e)}] * len(orders)
+
+        results = [_result(line, order, outcome) for (line, order), outcome in zip(batch, outcomes)]
+        accepted = sum(result["orderId"] is not None for result in results)
+
+        self._count(submitted=len(results), accepted=accepted, failed=len(results) - accepted)
+        writer.write(results)
+
+    def _count(self, **deltas):
+        with self._lock:
+            for key, value in deltas.items():
+                self._counts[key] += value
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+        done = counts["submitted"] + counts["invalid"]
+        counts["elapsedS"] = elapsed
+        counts["ordersPerS"] = done / elapsed if elapsed else 0.0
+        return counts
@@ -0,0 +1,110 @@
+# bot/cache.py
+
+import threading
+import time
+
+
+class TTLCache:
+    """
+    Per-endpoint TTL cache with request coalescing.
+
+    Keys are tuples whose first item is the endpoint name, which selects
+    the TTL. Concurrent misses on the same key share one in-flight fetch:
+    the first caller fetches, the others wait for its result (or error).
+    """
+
+    def __init__(self, ttls: dict = None, default_ttl: float = 0.0):
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._inflight = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get_or_fetch(self, key: tuple, fetch):
+        ttl = self.ttls.get(key[0], self.default_ttl)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+
+            call = self._inflight.get(key)
+            if call is None:
+                call = self._inflight[key] = _InflightCall()
+                leader = True
+                self.misses += 1
+            else:
+                leader = False
+                self.coalesced += 1
+
+        if not leader:
+            return call.wait()
+
+        try:
+            value = fetch()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.fail(e)
+            raise
+
+        with self._lock:
+            self._inflight.pop(key, None)
+            # Skip storing if invalidated while the request was in flight
+            if ttl > 0 and not call.invalidated:
+                self._entries[key] = (time.monotonic() + ttl, value)
+
+        call.resolve(value)
+        return value
+
+    def invalidate(self, *endpoints: str):
+        """Drop cached entries for the given endpoint names (all if none given)."""
+        with self._lock:
+            for key in list(self._entries):
+                if not endpoints or key[0] in endpoints:
+                    del self._entries[key]
+
+            for key, call in self._inflight.items():
+                if not endpoints or key[0] in endpoints:
+                    call.invalidated = True
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hitRate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+            }
+
+
+class _InflightCall:
+    __slots__ = ("event", "value", "error", "invalidated")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+        self.invalidated = False
+
+    def resolve(self, value):
+        self.value = value
+        self.event.set()
+
+    def fail(self, error):
+        self.error = error
+        self.event.set()
+
+    def wait(self):
+        self.event.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
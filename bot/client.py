@@ -2,30 +2,260 @@
 
 import os
 import logging
+import threading
+import time
+from urllib.parse import urlsplit
 from dotenv import load_dotenv
-from binance.client import Client
-from binance.exceptions import BinanceAPIException, BinanceRequestException
+from bot.cache import TTLCache
+from bot.metrics import get_metrics
+from bot.scheduler import ACCOUNT, ORDER, get_scheduler
 
 load_dotenv()
 
+# Seconds each account read is served from cache; orders invalidate them
+DEFAULT_CACHE_TTLS = {
+    "balance": 2.0,
+    "positions": 2.0,
+    "trade_history": 5.0,
+}
+ACCOUNT_ENDPOINTS = tuple(DEFAULT_CACHE_TTLS)
+
+# Base URL of a local simulated exchange (python -m simulator); when set,
+# every REST and user-data stream request goes there instead of the testnet
+SIMULATOR_URL_ENV = "BINANCE_SIMULATOR_URL"
+# The simulator's streams listen on the next port: ws://host:<port + 1>/ws/<listenKey>;
+# market streams share it as /ws/<stream> and /stream?streams=<a>/<b>
+STREAM_PORT_OFFSET = 1
+TESTNET_MARKET_STREAM_URL = "wss://stream.binancefuture.com"
+# REST base URL of the venue behind each public market-stream URL
+MARKET_STREAM_VENUES = {
+    TESTNET_MARKET_STREAM_URL: "https://testnet.binancefuture.com",
+    "wss://fstream.binance.com": "https://fapi.binance.com",
+}
+
+# Request weights of the USD-M futures endpoints used here
+REQUEST_WEIGHTS = {
+    "balance": 5,
+    "positions": 5,
+    "trades": 5,
+    "income": 30,
+    "order": 1,
+    "batch_order": 5,
+    "get_order": 1,
+    "cancel_order": 1,
+    # Open orders of every symbol; 1 for a single symbol
+    "open_orders": 40,
+    "listen_key": 1,
+    "exchange_info": 1,
+    # Depth snapshots at the default limit of 1000 levels, see DEPTH_WEIGHTS
+    "depth": 20,
+}
+
+# (max limit, weight) for depth snapshots
+DEPTH_WEIGHTS = ((50, 2), (100, 5), (500, 10), (1000, 20))
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def stream_url_for(rest_url: str) -> str:
+    """The simulator's user-data stream base URL for its REST base URL."""
+    parts = urlsplit(rest_url)
+    scheme = "wss" if parts.scheme == "https" else "ws"
+    return f"{scheme}://{parts.hostname}:{(parts.port or 80) + STREAM_PORT_OFFSET}/ws"
+
+
+def base_url_path(path: str, base_url: str = None) -> str:
+    """
+    ``path`` for the testnet; for any other base URL, a sibling named after
+    it (``orders.127.0.0.1_8900.wal``), so local state never mixes exchanges.
+    """
+    base_url = (base_url or "").rstrip("/")
+    if not base_url:
+        return path
+
+    key = "".join(c if c.isalnum() or c in ".-" else "_" for c in base_url.split("://", 1)[-1])
+    root, ext = os.path.splitext(path)
+    return f"{root}.{key}{ext}"
+
+
+def market_stream_url() -> str:
+    """Market-stream base URL: the simulator's when one is configured, else the testnet's."""
+    simulator_url = os.getenv(SIMULATOR_URL_ENV)
+    if simulator_url:
+        return stream_url_for(simulator_url).rsplit("/ws", 1)[0]
+
+    return TESTNET_MARKET_STREAM_URL
+
+
+def market_rest_url(stream_url: str = None) -> str:
+    """
+    REST base URL of the venue serving a market-stream URL (``market_stream_url()``
+    by default), so backfills come from the same exchange; None when unknown.
+    """
+    stream_url = (stream_url or market_stream_url()).rstrip("/")
+    simulator_url = os.getenv(SIMULATOR_URL_ENV)
+    if simulator_url and stream_url == market_stream_url():
+        return simulator_url.rstrip("/")
+
+    return MARKET_STREAM_VENUES.get(stream_url)
+
+
+def get_client() -> "BinanceFuturesClient":
+    """Process-wide BinanceFuturesClient, created on first call."""
+    global _shared_client
+
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = BinanceFuturesClient()
+
+    return _shared_client
+
 
 class BinanceFuturesClient:
-    def __init__(self):
+    def __init__(self, cache_ttls: dict = None, scheduler=None, base_url: str = None, metrics=None):
         self.logger = logging.getLogger(__name__)
+        self.cache = TTLCache(DEFAULT_CACHE_TTLS if cache_ttls is None else cache_ttls)
+        self.metrics = metrics or get_metrics()
+        self._local = threading.local()
+        self.base_url = (base_url or os.getenv(SIMULATOR_URL_ENV) or "").rstrip("/") or None
+        self.scheduler = scheduler or get_scheduler(self.base_url)
 
         api_key = os.getenv("BINANCE_API_KEY")
         secret_key = os.getenv("BINANCE_SECRET_KEY")
 
+        if self.base_url:
+            # The simulator does not check signatures
+            api_key = api_key or "simulator"
+            secret_key = secret_key or "simulator"
+
         if not api_key or not secret_key:
             raise ValueError("API keys not found in .env file")
 
-        self.client = Client(api_key, secret_key, testnet=True)
-        self.logger.info("Binance Futures Testnet client initialized")
+        self._api_key = api_key
+        self._secret_key = secret_key
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        """
+        The underlying python-binance Client, built on first use.
+
+        python-binance is slow to import, so neither the import nor the
+        client construction happens until a request is actually made.
+        """
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from binance.client import Client
+
+                    # The constructor's ping hits the spot API; futures calls don't need it
+                    client = Client(self._api_key, self._secret_key, testnet=True, ping=False)
+                    client.session.hooks["response"].append(self._on_response)
+
+                    if self.base_url:
+                        client.FUTURES_URL = client.FUTURES_TESTNET_URL = f"{self.base_url}/fapi"
+                        self.logger.info(f"Binance Futures client pointed at simulator {self.base_url}")
+                    else:
+                        self.logger.info("Binance Futures Testnet client initialized")
+
+                    self._client = client
+
+        return self._client
+
+    @property
+    def stream_url(self):
+        """User-data stream base URL of the simulator, or None for the testnet default."""
+        if not self.base_url:
+            return None
 
+        return stream_url_for(self.base_url)
+
+    def _on_response(self, response, *args, **kwargs):
+        # Feed the futures rate-limit headers back into the scheduler
+        if "/fapi/" in response.url:
+            self.scheduler.observe_headers(response.headers)
+
+        # Send -> response headers, as measured by requests: the exchange's share of a call
+        self._local.exchange_s = response.elapsed.total_seconds()
+
+    def _call(self, endpoint: str, fn, lane: int = ACCOUNT, orders: int = 0, weight: int = None):
+        weight = weight or REQUEST_WEIGHTS[endpoint]
+        metrics = self.metrics
+
+        if not metrics.enabled:
+            return self.scheduler.call(fn, weight, lane, orders)
+
+        local = self._local
+        local.exchange_s = None
+        sent = []
+
+        def timed():
+            sent.append(time.perf_counter())
+            return fn()
+
+        started = time.perf_counter()
+        try:
+            return self.scheduler.call(timed, weight, lane, orders)
+
+        except Exception as e:
+            metrics.inc(
+                "bot_request_errors_total",
+                endpoint=endpoint,
+                code=getattr(e, "code", None) or type(e).__name__,
+            )
+            raise
+
+        finally:
+            done = time.perf_counter()
+            metrics.observe("bot_request_seconds", done - started, endpoint=endpoint)
+
+            if sent:
+                # Queue = waiting for the scheduler; overhead = our side of the last attempt
+                metrics.observe("bot_request_queue_seconds", sent[0] - started, endpoint=endpoint)
+
+                if local.exchange_s is not None:
+                    metrics.observe("bot_request_exchange_seconds", local.exchange_s, endpoint=endpoint)
+                    metrics.observe(
+                        "bot_request_overhead_seconds",
+                        max(done - sent[-1] - local.exchange_s, 0.0),
+                        endpoint=endpoint,
+                    )
+
+    def scheduler_stats(self) -> dict:
+        return self.scheduler.stats()
+
+    def _log_request_error(self, error: Exception, action: str):
+        from binance.exceptions import BinanceAPIException, BinanceRequestException
+
+        if isinstance(error, BinanceAPIException):
+            self.logger.error(f"Binance API Error: {error.message}")
+        elif isinstance(error, BinanceRequestException):
+            self.logger.error(f"Network Error: {str(error)}")
+        else:
+            self.logger.exception(f"Unexpected error during {action}")
+
+    # -------------------------------
+    # CACHE
+    # -------------------------------
+    def invalidate_cache(self, *endpoints: str):
+        self.cache.invalidate(*endpoints)
+
+    def cache_stats(self) -> dict:
+        return self.cache.stats()
+
+    # -------------------------------
+    # ACCOUNT
+    # -------------------------------
     def get_balance(self) -> list:
+        return self.cache.get_or_fetch(("balance",), self._fetch_balance)
+
+    def _fetch_balance(self) -> list:
         try:
             self.logger.info("Fetching Futures account balance")
-            response = self.client.futures_account_balance()
+            response = self._call("balance", self.client.futures_account_balance)
             return response
 
         except Exception:
@@ -33,9 +263,12 @@ class BinanceFuturesClient:
             raise
 
     def get_positions(self) -> list:
+        return self.cache.get_or_fetch(("positions",), self._fetch_positions)
+
+    def _fetch_positions(self) -> list:
         try:
             self.logger.info("Fetching Futures positions")
-            response = self.client.futures_position_information()
+            response = self._call("positions", self.client.futures_position_information)
             return response
 
         except Exception:
@@ -44,28 +277,48 @@ class BinanceFuturesClient:
 
     def create_order(self, params: dict) -> dict:
         try:
-            self.logger.info(f"Sending order request: {params}")
-            response = self.client.futures_create_order(**params)
-            self.logger.info(f"Order response: {response}")
+            # %-style args: rendered by the log listener, and only if INFO is enabled
+            self.logger.info("Sending order request: %s", params)
+            response = self._call(
+                "order", lambda: self.client.futures_create_order(**params), lane=ORDER, orders=1
+            )
+            self.logger.info("Order response: %s", response)
             return response
 
-        except BinanceAPIException as e:
-            self.logger.error(f"Binance API Error: {e.message}")
+        except Exception as e:
+            self._log_request_error(e, "order placement")
             raise
 
-        except BinanceRequestException as e:
-            self.logger.error(f"Network Error: {str(e)}")
-            raise
+        finally:
+            # Even a failed request may have reached the exchange
+            self.cache.invalidate(*ACCOUNT_ENDPOINTS)
 
-        except Exception:
-            self.logger.exception("Unexpected error during order placement")
+    def create_batch_orders(self, batch: list) -> list:
+        try:
+            self.logger.info("Sending batch order request: %d orders", len(batch))
+            response = self._call(
+                "batch_order",
+                lambda: self.client.futures_place_batch_order(batchOrders=batch),
+                lane=ORDER,
+                orders=len(batch),
+            )
+            self.logger.info("Batch order response: %s", response)
+            return response
+
+        except Exception as e:
+            self._log_request_error(e, "batch order placement")
             raise
 
-    def get_order(self, symbol: str, order_id: int) -> dict:
+        finally:
+            self.cache.invalidate(*ACCOUNT_ENDPOINTS)
+
+    def get_order(self, symbol: str, order_id: int = None, client_order_id: str = None) -> dict:
         try:
-            response = self.client.futures_get_order(
-                symbol=symbol,
-                orderId=order_id
+            params = {"orderId": order_id} if order_id is not None else {"origClientOrderId": client_order_id}
+            response = self._call(
+                "get_order",
+                lambda: self.client.futures_get_order(symbol=symbol, **params),
+                lane=ORDER,
             )
             return response
 
@@ -73,17 +326,135 @@ class BinanceFuturesClient:
             self.logger.exception("Error fetching order status")
             raise
     
+    def get_open_orders(self, symbol: str = None) -> list:
+        try:
+            params = {"symbol": symbol} if symbol else {}
+            return self._call(
+                "open_orders",
+                lambda: self.client.futures_get_open_orders(**params),
+                lane=ORDER,
+                weight=1 if symbol else None,
+            )
+
+        except Exception:
+            self.logger.exception("Error fetching open orders")
+            raise
+
+    def cancel_order(self, symbol: str, order_id: int) -> dict:
+        try:
+            self.logger.info("Cancelling order %s %s", symbol, order_id)
+            return self._call(
+                "cancel_order",
+                lambda: self.client.futures_cancel_order(symbol=symbol, orderId=order_id),
+                lane=ORDER,
+            )
+
+        except Exception as e:
+            self._log_request_error(e, "order cancellation")
+            raise
+
+        finally:
+            # Releases the margin held by the order
+            self.cache.invalidate(*ACCOUNT_ENDPOINTS)
+
     def get_trade_history(self, symbol: str = None):
+        return self.cache.get_or_fetch(
+            ("trade_history", symbol), lambda: self._fetch_trade_history(symbol)
+        )
+
+    def _fetch_trade_history(self, symbol: str = None):
         try:
             self.logger.info("Fetching trade history")
 
             if symbol:
-                response = self.client.futures_account_trades(symbol=symbol)
+                response = self._call(
+                    "trades", lambda: self.client.futures_account_trades(symbol=symbol)
+                )
             else:
-                response = self.client.futures_account_trades()
+                response = self._call("trades", self.client.futures_account_trades)
 
             return response
 
         except Exception:
             self.logger.exception("Error fetching trade history")
-            raise
\ No newline at end of file
+            raise
+
+    def get_trades_since(self, symbol: str, from_id: int, limit: int = 1000) -> list:
+        try:
+            self.logger.info(f"Fetching {symbol} trades from id {from_id}")
+            return self._call(
+                "trades",
+                lambda: self.client.futures_account_trades(symbol=symbol, fromId=from_id, limit=limit),
+            )
+
+        except Exception:
+            self.logger.exception("Error fetching trade history page")
+            raise
+
+    def get_income_history(self, start_time: int = None, limit: int = 1000) -> list:
+        try:
+            self.logger.info(f"Fetching income history from {start_time}")
+            params = {"limit": limit}
+            if start_time is not None:
+                params["startTime"] = start_time
+            return self._call("income", lambda: self.client.futures_income_history(**params))
+
+        except Exception:
+            self.logger.exception("Error fetching income history")
+            raise
+
+    # -------------------------------
+    # MARKET DATA
+    # -------------------------------
+    def get_order_book(self, symbol: str, limit: int = 1000) -> dict:
+        try:
+            self.logger.info(f"Fetching {symbol} order book snapshot ({limit} levels)")
+            weight = next((w for max_limit, w in DEPTH_WEIGHTS if limit <= max_limit), REQUEST_WEIGHTS["depth"])
+            return self._call(
+                "depth", lambda: self.client.futures_order_book(symbol=symbol, limit=limit), weight=weight
+            )
+
+        except Exception:
+            self.logger.exception("Error fetching order book")
+            raise
+
+    def get_exchange_info(self) -> dict:
+        try:
+            self.logger.info("Fetching futures exchangeInfo")
+            return self._call("exchange_info", self.client.futures_exchange_info)
+
+        except Exception:
+            self.logger.exception("Error fetching exchangeInfo")
+            raise
+
+    # -------------------------------
+    # USER DATA STREAM
+    # -------------------------------
+    def start_user_stream(self) -> str:
+        try:
+            self.logger.info("Requesting user data stream listen key")
+            return self._call("listen_key", self.client.futures_stream_get_listen_key, lane=ORDER)
+
+        except Exception:
+            self.logger.exception("Error requesting listen key")
+            raise
+
+    def keepalive_user_stream(self, listen_key: str):
+        try:
+            return self._call(
+                "listen_key", lambda: self.client.futures_stream_keepalive(listenKey=listen_key), lane=ORDER
+            )
+
+        except Exception:
+            self.logger.exception("Error refreshing listen key")
+            raise
+
+    def close_user_stream(self, listen_key: str):
+        try:
+            return self._call(
+                "listen_key", lambda: self.client.futures_stream_close(listenKey=listen_key)
+            )
+
+        except Exception:
+            self.logger.exception("Error closing listen key")
+            raise
@@ -0,0 +1,199 @@
+# bot/exchange_info.py
+
+import json
+import logging
+import os
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_PATH = os.path.join(BASE_DIR, "data", "exchange_info.json")
+
+# Filters rarely change; reload them from the exchange this often (seconds)
+REFRESH_INTERVAL = 6 * 60 * 60
+# Wait before retrying after a failed load
+RETRY_INTERVAL = 60
+
+
+# -------------------------------
+# SYMBOL FILTERS
+# -------------------------------
+class SymbolFilters:
+    """The trading rules of one symbol, from its exchangeInfo filters."""
+
+    __slots__ = (
+        "symbol", "status", "tick_size", "min_price", "max_price",
+        "step_size", "min_qty", "max_qty",
+        "market_step_size", "market_min_qty", "market_max_qty", "min_notional",
+    )
+
+    def __init__(self, symbol: str, status: str = "TRADING", tick_size: float = 0.01, min_price: float = 0.0,
+                 max_price: float = 0.0, step_size: float = 0.001, min_qty: float = 0.001, max_qty: float = 0.0,
+                 market_step_size: float = None, market_min_qty: float = None, market_max_qty: float = None,
+                 min_notional: float = 0.0):
+        self.symbol = symbol
+        self.status = status
+        self.tick_size = tick_size
+        self.min_price = min_price
+        # 0 = no limit
+        self.max_price = max_price
+        self.step_size = step_size
+        self.min_qty = min_qty
+        self.max_qty = max_qty
+        self.market_step_size = market_step_size or step_size
+        self.market_min_qty = min_qty if market_min_qty is None else market_min_qty
+        self.market_max_qty = max_qty if market_max_qty is None else market_max_qty
+        self.min_notional = min_notional
+
+    @classmethod
+    def from_exchange_info(cls, entry: dict) -> "SymbolFilters":
+        """Parse one element of exchangeInfo's ``symbols`` list."""
+        filters = {f["filterType"]: f for f in entry.get("filters", ())}
+        price = filters.get("PRICE_FILTER", {})
+        lot = filters.get("LOT_SIZE", {})
+        market_lot = filters.get("MARKET_LOT_SIZE", lot)
+        notional = filters.get("MIN_NOTIONAL", {})
+
+        return cls(
+            entry["symbol"],
+            status=entry.get("status", "TRADING"),
+            tick_size=float(price.get("tickSize", 0.01)),
+            min_price=float(price.get("minPrice", 0)),
+            max_price=float(price.get("maxPrice", 0)),
+            step_size=float(lot.get("stepSize", 0.001)),
+            min_qty=float(lot.get("minQty", 0.001)),
+            max_qty=float(lot.get("maxQty", 0)),
+            market_step_size=float(market_lot.get("stepSize", lot.get("stepSize", 0.001))),
+            market_min_qty=float(market_lot.get("minQty", lot.get("minQty", 0.001))),
+            market_max_qty=float(market_lot.get("maxQty", lot.get("maxQty", 0))),
+            # Futures call it "notional", spot "minNotional"
+            min_notional=float(notional.get("notional", notional.get("minNotional", 0))),
+        )
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __repr__(self):
+        return f"SymbolFilters({self.symbol}, tick={self.tick_size:g}, step={self.step_size:g}, minNotional={self.min_notional:g})"
+
+
+# -------------------------------
+# CACHE
+# -------------------------------
+class ExchangeInfoCache:
+    """
+    Symbol filters for pre-trade validation, loaded from exchangeInfo.
+
+    The filters are fetched once (one request, weight 1) and saved to
+    ``path`` with the time and base URL they came from, so a restart within
+    ``refresh_interval`` reads them from disk instead. Lookups are a dict
+    read; the first one after the refresh interval reloads from the
+    exchange, and a failed reload keeps serving the filters already held.
+    """
+
+    def __init__(self, client=None, path: str = DEFAULT_CACHE_PATH, refresh_interval: float = REFRESH_INTERVAL):
+        self.logger = logging.getLogger(__name__)
+        self._client = client
+        self.path = path
+        self.refresh_interval = refresh_interval
+
+        self._lock = threading.Lock()
+        self._filters = None
+        self.fetched = None
+        self._next_load = 0.0
+
+    @property
+    def client(self):
+        if self._client is None:
+            from bot.client import get_client
+
+            self._client = get_client()
+        return self._client
+
+    def filters(self, symbol: str):
+        """
+        The symbol's SymbolFilters, or None while no exchangeInfo could be loaded.
+
+        Raises ValueError for a symbol the exchange does not list or trade.
+        """
+        table = self.table()
+        if table is None:
+            return None
+
+        filters = table.get(symbol.upper())
+        if filters is None:
+            raise ValueError(f"Unknown symbol {symbol}")
+        if filters.status != "TRADING":
+            raise ValueError(f"{symbol} is not trading (status {filters.status})")
+        return filters
+
+    def table(self):
+        """symbol -> SymbolFilters for every listed symbol, or None if unavailable."""
+        if self._filters is None or time.time() >= self._next_load:
+            with self._lock:
+                if self._filters is None or time.time() >= self._next_load:
+                    self._load()
+
+        return self._filters
+
+    def refresh(self):
+        """Reload from the exchange now, ignoring the disk copy."""
+        with self._lock:
+            self._load(use_disk=False)
+
+    def _load(self, use_disk: bool = True):
+        base_url = getattr(self.client, "base_url", None)
+
+        if use_disk and self._filters is None and self._load_disk(base_url):
+            return
+
+        try:
+            info = self.client.get_exchange_info()
+        except Exception as e:
+            self._next_load = time.time() + RETRY_INTERVAL
+            self.logger.warning(
+                f"exchangeInfo unavailable ({e}); "
+                + ("keeping the filters loaded earlier" if self._filters else "orders are not checked locally")
+            )
+            return
+
+        self._filters = {
+            entry["symbol"]: SymbolFilters.from_exchange_info(entry) for entry in info.get("symbols", ())
+        }
+        self.fetched = time.time()
+        self._next_load = self.fetched + self.refresh_interval
+        self.logger.info(f"Loaded filters of {len(self._filters)} symbols from exchangeInfo")
+        self._save(base_url)
+
+    def _load_disk(self, base_url) -> bool:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        age = time.time() - saved.get("fetched", 0)
+        if saved.get("baseUrl") != base_url or age >= self.refresh_interval:
+            return False
+
+        self._filters = {entry["symbol"]: SymbolFilters(**entry) for entry in saved["symbols"]}
+        self.fetched = saved["fetched"]
+        self._next_load = self.fetched + self.refresh_interval
+        self.logger.info(f"Loaded filters of {len(self._filters)} symbols from {self.path} ({age / 60:.0f} min old)")
+        return True
+
+    def _save(self, base_url):
+        temp_path = f"{self.path}.tmp"
+
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "baseUrl": base_url,
+                    "fetched": self.fetched,
+                    "symbols": [filters.to_dict() for filters in self._filters.values()],
+                }, f)
+            os.replace(temp_path, self.path)
+
+        except OSError as e:
+            self.logger.warning(f"Could not save exchangeInfo cache: {e}")
@@ -0,0 +1,755 @@
+# bot/execution.py
+
+import asyncio
+import functools
+import itertools
+import logging
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bot.user_stream import FINAL_STATUSES
+from bot.validators import round_step, validate_quantity, validate_side, validate_symbol
+
+DEFAULT_ORDER_WORKERS = 8
+# REST checks of working children, only while the user-data stream is down
+POLL_INTERVAL = 5.0
+# REST top-of-book quotes are shared by every parent on a symbol for this long
+QUOTE_TTL = 0.5
+# Quantity step for symbols without exchange filters
+QUANTITY_STEP = 0.001
+# A parent gives up after this many child orders in a row are rejected
+MAX_CHILD_ERRORS = 5
+# "Post Only order will be rejected": the touch moved through the price, not an error
+POST_ONLY_REJECTED = -5022
+
+PARENT_FINAL_STATUSES = ("FILLED", "INCOMPLETE", "CANCELED", "FAILED")
+
+
+class ChildOrder:
+    __slots__ = (
+        "client_order_id", "parent", "order_type", "price", "quantity", "time_in_force",
+        "order_id", "status", "executed", "avg_price", "sent", "cancel_requested", "error",
+    )
+
+    def __init__(self, client_order_id, parent, order_type, quantity, price=None, time_in_force="GTC"):
+        self.client_order_id = client_order_id
+        self.parent = parent
+        self.order_type = order_type
+        self.price = price
+        self.quantity = quantity
+        self.time_in_force = time_in_force
+        self.order_id = None
+        # PENDING until the exchange acknowledges the order
+        self.status = "PENDING"
+        self.executed = 0.0
+        self.avg_price = 0.0
+        self.sent = time.monotonic()
+        self.cancel_requested = False
+        self.error = None
+
+    @property
+    def open_quantity(self) -> float:
+        return self.quantity - self.executed
+
+    def to_dict(self) -> dict:
+        return {
+            "clientOrderId": self.client_order_id,
+            "orderId": self.order_id,
+            "type": self.order_type,
+            "price": self.price,
+            "quantity": self.quantity,
+            "status": self.status,
+            "executedQty": self.executed,
+            "avgPrice": self.avg_price,
+            "error": self.error,
+        }
+
+
+class ParentOrder:
+    """A large order worked by an ExecutionAlgo as a series of child orders."""
+
+    def __init__(self, parent_id: str, symbol: str, side: str, quantity: float, algo, arrival_price, step: float):
+        self.parent_id = parent_id
+        self.symbol = symbol
+        self.side = side
+        self.quantity = quantity
+        self.algo = algo
+        self.arrival_price = arrival_price
+        self.step = step
+
+        self.status = "WORKING"
+        self.filled = 0.0
+        self.notional = 0.0
+        self.children = []
+        self.working = {}
+        self.child_errors = 0
+        self.cancelling = False
+        self.error = None
+        self.started = time.time()
+        self.finished = None
+
+        # Latest top of book (bid, ask), refreshed before each algo decision
+        self.bid = None
+        self.ask = None
+
+        self._seq = itertools.count(1)
+        self._lock = None
+        self._done = threading.Event()
+
+    @property
+    def remaining(self) -> float:
+        return max(self.quantity - self.filled, 0.0)
+
+    @property
+    def unallocated(self) -> float:
+        """Quantity neither filled nor resting in a working child."""
+        open_quantity = sum(child.open_quantity for child in self.working.values())
+        return round_step(max(self.quantity - self.filled - open_quantity, 0.0), self.step)
+
+    @property
+    def avg_price(self) -> float:
+        return self.notional / self.filled if self.filled else 0.0
+
+    @property
+    def slippage_bps(self):
+        """Average fill vs the arrival price; positive is worse."""
+        if not self.filled or not self.arrival_price:
+            return None
+        sign = 1 if self.side == "BUY" else -1
+        return sign * (self.avg_price - self.arrival_price) / self.arrival_price * 10_000
+
+    @property
+    def done(self) -> bool:
+        return self.status in PARENT_FINAL_STATUSES
+
+    def wait(self, timeout: float = None) -> bool:
+        return self._done.wait(timeout)
+
+    def to_dict(self, children: bool = False) -> dict:
+        result = {
+            "parentId": self.parent_id,
+            "algo": self.algo.name,
+            "symbol": self.symbol,
+            "side": self.side,
+            "quantity": self.quantity,
+            "status": self.status,
+            "filledQty": self.filled,
+            "progress": self.filled / self.quantity,
+            "avgPrice": self.avg_price,
+            "arrivalPrice": self.arrival_price,
+            "slippageBps": self.slippage_bps,
+            "childOrders": len(self.children),
+            "workingChildren": len(self.working),
+            "elapsedS": (self.finished or time.time()) - self.started,
+            "error": self.error,
+        }
+
+        if children:
+            result["children"] = [child.to_dict() for child in list(self.children)]
+
+        return result
+
+
+# -------------------------------
+# ALGORITHMS
+# -------------------------------
+class ExecutionAlgo:
+    """
+    Decides when, how much and at what price a parent's children are sent.
+
+    Hooks run on the engine's event loop with ``parent.bid`` / ``parent.ask``
+    freshly quoted, and must not block: they call ``engine.send_child`` and
+    ``engine.cancel_child``, which return at once.
+    """
+
+    name = None
+    # Seconds between on_timer calls, None for no timer
+    timer_interval = None
+
+    def on_start(self, engine, parent):
+        pass
+
+    def on_timer(self, engine, parent):
+        pass
+
+    def on_child_done(self, engine, parent, child):
+        pass
+
+    def exhausted(self, parent) -> bool:
+        """True once the algo will send nothing more (the parent then ends INCOMPLETE)."""
+        return False
+
+
+class TWAP(ExecutionAlgo):
+    """``slices`` MARKET children evenly spaced over ``duration`` seconds.
+
+    Quantity not filled by a slice is carried into the next one. With a
+    ``limit_price`` a slice is skipped (and carried) while the market is
+    worse than it.
+    """
+
+    name = "TWAP"
+
+    def __init__(self, duration: float, slices: int, limit_price: float = None):
+        if duration <= 0 or slices < 1:
+            raise ValueError("TWAP needs a positive duration and at least one slice")
+
+        self.duration = duration
+        self.slices = slices
+        self.limit_price = limit_price
+        self.timer_interval = duration / slices
+        self.sent_slices = 0
+
+    def on_start(self, engine, parent):
+        self._slice(engine, parent)
+
+    def on_timer(self, engine, parent):
+        if self.sent_slices < self.slices:
+            self._slice(engine, parent)
+
+    def _slice(self, engine, parent):
+        self.sent_slices += 1
+        left = self.slices - self.sent_slices + 1
+
+        market = parent.ask if parent.side == "BUY" else parent.bid
+        if self.limit_price and market and (
+            market > self.limit_price if parent.side == "BUY" else market < self.limit_price
+        ):
+            return
+
+        quantity = parent.unallocated if left == 1 else round_step(parent.unallocated / left, parent.step)
+        if quantity > 0:
+            engine.send_child(parent, "MARKET", quantity)
+
+    def exhausted(self, parent) -> bool:
+        return self.sent_slices >= self.slices
+
+
+class Iceberg(ExecutionAlgo):
+    """One resting LIMIT child of at most ``display_quantity`` at ``price``, refilled as it fills."""
+
+    name = "ICEBERG"
+
+    def __init__(self, price: float, display_quantity: float):
+        if price <= 0 or display_quantity <= 0:
+            raise ValueError("Iceberg needs a positive price and display quantity")
+
+        self.price = price
+        self.display_quantity = display_quantity
+
+    def on_start(self, engine, parent):
+        self._refill(engine, parent)
+
+    def on_child_done(self, engine, parent, child):
+        if not parent.working:
+            self._refill(engine, parent)
+
+    def _refill(self, engine, parent):
+        quantity = min(self.display_quantity, parent.unallocated)
+        if quantity > 0:
+            engine.send_child(parent, "LIMIT", quantity, self.price)
+
+
+class PostOnlyChase(ExecutionAlgo):
+    """
+    A post-only (GTX) LIMIT child pegged to the near touch.
+
+    Every ``reprice_interval`` seconds the child is cancelled and re-posted
+    if the best bid (BUY) / ask (SELL) moved away from it. After
+    ``max_duration`` seconds the remainder is sent as a MARKET order.
+    """
+
+    name = "CHASE"
+
+    def __init__(self, display_quantity: float = None, reprice_interval: float = 1.0, max_duration: float = None):
+        self.display_quantity = display_quantity
+        self.timer_interval = reprice_interval
+        self.max_duration = max_duration
+        self.crossing = False
+
+    def on_start(self, engine, parent):
+        self._post(engine, parent)
+
+    def on_timer(self, engine, parent):
+        if self.crossing:
+            return
+
+        if self.max_duration is not None and time.time() - parent.started >= self.max_duration:
+            self.crossing = True
+            for child in list(parent.working.values()):
+                engine.cancel_child(child)
+            if not parent.working:
+                self._cross(engine, parent)
+            return
+
+        if not parent.working:
+            self._post(engine, parent)
+            return
+
+        touch = self._touch(parent)
+        for child in list(parent.working.values()):
+            if touch is not None and child.price != touch:
+                engine.cancel_child(child)
+
+    def on_child_done(self, engine, parent, child):
+        if parent.working:
+            return
+        if self.crossing:
+            self._cross(engine, parent)
+        elif child.status != "REJECTED":
+            # A rejected post waits for the next timer and a fresh quote
+            self._post(engine, parent)
+
+    def exhausted(self, parent) -> bool:
+        # Once the MARKET remainder has ended
+        return self.crossing and any(child.order_type == "MARKET" for child in parent.children)
+
+    @staticmethod
+    def _touch(parent):
+        return parent.bid if parent.side == "BUY" else parent.ask
+
+    def _post(self, engine, parent):
+        price = self._touch(parent)
+        quantity = parent.unallocated
+        if self.display_quantity:
+            quantity = min(quantity, self.display_quantity)
+
+        if price and quantity > 0:
+            engine.send_child(parent, "LIMIT", quantity, price, time_in_force="GTX")
+
+    def _cross(self, engine, parent):
+        if parent.unallocated > 0 and not any(child.order_type == "MARKET" for child in parent.children):
+            engine.send_child(parent, "MARKET", parent.unallocated)
+
+
+# -------------------------------
+# ENGINE
+# -------------------------------
+class ExecutionEngine:
+    """
+    Works parent orders with execution algorithms on one event loop.
+
+    Child orders go through ``OrderManager.place_order`` on a small
+    thread pool without waiting for fills; their fills and cancels come
+    back from the user-data stream (by client order id), so hundreds of
+    working children cost no threads and no polling. Algo timers are
+    ``call_later`` callbacks on the same loop. While the stream is down,
+    working children are checked over REST every ``poll_interval``
+    seconds in one sweep.
+    """
+
+    def __init__(self, manager=None, order_workers: int = DEFAULT_ORDER_WORKERS,
+                 poll_interval: float = POLL_INTERVAL, quantity_step: float = None):
+        self.logger = logging.getLogger(__name__)
+
+        if manager is None:
+            from bot.orders import OrderManager
+
+            manager = OrderManager(use_user_stream=True)
+
+        self.manager = manager
+        self.metrics = manager.metrics
+        self.poll_interval = poll_interval
+        # None: each symbol's LOT_SIZE step from the manager's exchange filters
+        self.quantity_step = quantity_step
+
+        self._parents = {}
+        # client order id -> working ChildOrder
+        self._children = {}
+        self._quotes = {}
+        self._prefix = f"x{secrets.token_hex(3)}"
+        self._seq = itertools.count(1)
+
+        self._executor = ThreadPoolExecutor(max_workers=order_workers, thread_name_prefix="execution-orders")
+        self._loop = None
+        self._stop_event = None
+        self._started = threading.Event()
+        self._thread = None
+
+        if manager.user_stream is not None:
+            manager.user_stream.add_callback(self._on_stream_event)
+
+    # -------------------------------
+    # LIFECYCLE
+    # -------------------------------
+    def start(self, wait: float = 5.0) -> "ExecutionEngine":
+        if self._thread is None or not self._thread.is_alive():
+            self._started.clear()
+            self._thread = threading.Thread(target=self._run_loop, name="execution", daemon=True)
+            self._thread.start()
+            self._started.wait(wait)
+        return self
+
+    def stop(self, cancel: bool = True, timeout: float = 10.0):
+        """Stop the engine, first cancelling every working parent unless ``cancel`` is False."""
+        if cancel:
+            working = [parent for parent in self._parents.values() if not parent.done]
+            for parent in working:
+                self.cancel(parent.parent_id)
+
+            deadline = time.monotonic() + timeout
+            for parent in working:
+                parent.wait(max(deadline - time.monotonic(), 0))
+
+        loop, stop_event = self._loop, self._stop_event
+        if loop is not None and stop_event is not None:
+            loop.call_soon_threadsafe(stop_event.set)
+
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+
+        self._executor.shutdown(wait=False)
+
+    def _run_loop(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+        try:
+            loop.run_until_complete(self._run())
+        finally:
+            loop.close()
+
+    async def _run(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        polling = asyncio.ensure_future(self._poll_periodically())
+        self._started.set()
+
+        try:
+            await self._stop_event.wait()
+        finally:
+            polling.cancel()
+            self._loop = None
+            self._stop_event = None
+
+    # -------------------------------
+    # PARENT ORDERS
+    # -------------------------------
+    def twap(self, symbol: str, side: str, quantity: float, duration: float, slices: int,
+             limit_price: float = None) -> ParentOrder:
+        return self.submit(symbol, side, quantity, TWAP(duration, slices, limit_price))
+
+    def iceberg(self, symbol: str, side: str, quantity: float, price: float,
+                display_quantity: float) -> ParentOrder:
+        return self.submit(symbol, side, quantity, Iceberg(price, display_quantity))
+
+    def chase(self, symbol: str, side: str, quantity: float, display_quantity: float = None,
+              reprice_interval: float = 1.0, max_duration: float = None) -> ParentOrder:
+        return self.submit(symbol, side, quantity, PostOnlyChase(display_quantity, reprice_interval, max_duration))
+
+    def _quantity_step(self, symbol: str) -> float:
+        if self.quantity_step:
+            return self.quantity_step
+
+        exchange_info = self.manager.exchange_info
+        filters = exchange_info.filters(symbol) if exchange_info else None
+        return filters.step_size if filters is not None else QUANTITY_STEP
+
+    def submit(self, symbol: str, side: str, quantity: float, algo: ExecutionAlgo) -> ParentOrder:
+        """Start working a parent order with ``algo``; returns at once."""
+        symbol = validate_symbol(symbol)
+        side = validate_side(side)
+        step = self._quantity_step(symbol)
+        quantity = round_step(validate_quantity(quantity), step)
+        if quantity <= 0:
+            raise ValueError(f"Quantity must be at least {step}")
+
+        loop = self._loop
+        if loop is None:
+            raise Exception("Execution engine is not running, call start() first")
+
+        bid, ask = self.quote(symbol)
+        arrival = (bid + ask) / 2 if bid and ask else None
+
+        parent = ParentOrder(
+            f"{self._prefix}{next(self._seq)}", symbol, side, quantity, algo, arrival, step
+        )
+        parent.bid, parent.ask = bid, ask
+        self._parents[parent.parent_id] = parent
+
+        self.logger.info(
+            f"Parent {parent.parent_id}: {algo.name} {side} {quantity} {symbol}, arrival {arrival}"
+        )
+        loop.call_soon_threadsafe(self._start_parent, parent)
+        return parent
+
+    def cancel(self, parent_id: str):
+        parent = self._parents.get(parent_id)
+        loop = self._loop
+        if parent is not None and loop is not None and not parent.done:
+            loop.call_soon_threadsafe(self._cancel_parent, parent)
+
+    def get(self, parent_id: str):
+        return self._parents.get(parent_id)
+
+    def parents(self, working_only: bool = False) -> list:
+        parents = list(self._parents.values())
+        return [parent for parent in parents if not parent.done] if working_only else parents
+
+    def stats(self) -> dict:
+        parents = list(self._parents.values())
+        return {
+            "parents": len(parents),
+            "workingParents": sum(not parent.done for parent in parents),
+            "workingChildren": len(self._children),
+            "childOrders": sum(len(parent.children) for parent in parents),
+            "streamConnected": self._stream_connected(),
+        }
+
+    # -------------------------------
+    # QUOTES
+    # -------------------------------
+    def quote(self, symbol: str) -> tuple:
+        """(best bid, best ask) from the manager's OrderBookService, else a shared REST snapshot."""
+        books = self.manager.order_books
+        book = books.get(symbol) if books is not None else None
+        if book is not None:
+            bid, ask = book.best_bid(), book.best_ask()
+            return (bid[0] if bid else None, ask[0] if ask else None)
+
+        cached = self._quotes.get(symbol)
+        if cached is not None and time.monotonic() - cached[0] < QUOTE_TTL:
+            return cached[1]
+
+        snapshot = self.manager.client.get_order_book(symbol, limit=5)
+        quote = (
+            float(snapshot["bids"][0][0]) if snapshot["bids"] else None,
+            float(snapshot["asks"][0][0]) if snapshot["asks"] else None,
+        )
+        self._quotes[symbol] = (time.monotonic(), quote)
+        return quote
+
+    # -------------------------------
+    # ALGO DISPATCH (event loop)
+    # -------------------------------
+    def _start_parent(self, parent: ParentOrder):
+        parent._lock = asyncio.Lock()
+        self._dispatch(parent, "on_start")
+
+        if parent.algo.timer_interval:
+            self._loop.call_later(parent.algo.timer_interval, self._on_timer, parent)
+
+    def _on_timer(self, parent: ParentOrder):
+        if parent.done:
+            return
+
+        if not parent.cancelling:
+            self._dispatch(parent, "on_timer")
+
+        self._loop.call_later(parent.algo.timer_interval, self._on_timer, parent)
+
+    def _dispatch(self, parent: ParentOrder, hook: str, *args):
+        self._loop.create_task(self._run_hook(parent, hook, *args))
+
+    async def _run_hook(self, parent: ParentOrder, hook: str, *args):
+        # One decision at a time per parent, on a fresh quote
+        async with parent._lock:
+            if parent.done or parent.cancelling:
+                return
+
+            try:
+                parent.bid, parent.ask = await self._loop.run_in_executor(self._executor, self.quote, parent.symbol)
+            except Exception as e:
+                self.logger.warning(f"Parent {parent.parent_id}: quote failed, using the last one: {e}")
+
+            try:
+                getattr(parent.algo, hook)(self, parent, *args)
+            except Exception as e:
+                self.logger.exception(f"Parent {parent.parent_id}: {parent.algo.name} failed in {hook}")
+                parent.error = str(e)
+                self._cancel_parent(parent, "FAILED")
+                return
+
+            self._check_done(parent)
+
+    # -------------------------------
+    # CHILD ORDERS (event loop)
+    # -------------------------------
+    def send_child(self, parent: ParentOrder, order_type: str, quantity: float, price: float = None,
+                   time_in_force: str = "GTC"):
+        """Submit a child order without waiting; its outcome reaches the algo's ``on_child_done``."""
+        if parent.cancelling or parent.done:
+            return None
+
+        child = ChildOrder(
+            f"{parent.parent_id}-{next(parent._seq)}", parent, order_type, quantity, price, time_in_force
+        )
+        parent.children.append(child)
+        parent.working[child.client_order_id] = child
+        self._children[child.client_order_id] = child
+
+        place = functools.partial(
+            self.manager.place_order, parent.symbol, parent.side, order_type, quantity, price,
+            wait_for_fill=False, client_order_id=child.client_order_id, time_in_force=time_in_force,
+        )
+        future = self._loop.run_in_executor(self._executor, place)
+        future.add_done_callback(functools.partial(self._on_ack, child))
+
+        return child
+
+    def cancel_child(self, child: ChildOrder):
+        if child.status in FINAL_STATUSES or child.cancel_requested:
+            return
+
+        child.cancel_requested = True
+        if child.order_id is None:
+            # Cancelled as soon as the ack brings its order id
+            return
+
+        cancel = functools.partial(self.manager.cancel_order, child.parent.symbol, child.order_id)
+        future = self._loop.run_in_executor(self._executor, cancel)
+        future.add_done_callback(functools.partial(self._on_cancel_result, child))
+
+    def _on_ack(self, child: ChildOrder, future):
+        try:
+            result = future.result()
+        except Exception as e:
+            child.error = getattr(e, "message", None) or str(e)
+            if getattr(e, "code", None) != POST_ONLY_REJECTED:
+                child.parent.child_errors += 1
+            self.logger.warning(f"Child {child.client_order_id} rejected: {child.error}")
+            self._update_child(child, "REJECTED", child.executed, child.avg_price)
+            return
+
+        child.order_id = result["orderId"]
+        child.parent.child_errors = 0
+        self._update_child(child, result["status"], result["executedQty"], result["avgPrice"])
+
+        if child.cancel_requested and child.status not in FINAL_STATUSES:
+            child.cancel_requested = False
+            self.cancel_child(child)
+
+    def _on_cancel_result(self, child: ChildOrder, future):
+        try:
+            result = future.result()
+        except Exception as e:
+            # Usually already filled; the stream (or the next poll) reports the final state
+            self.logger.info(f"Cancel of child {child.client_order_id} failed: {e}")
+            return
+
+        self._update_child(child, result["status"], result["executedQty"], result["avgPrice"])
+
+    def _on_stream_event(self, event: dict):
+        # Called on the user-stream thread
+        if event.get("e") != "ORDER_TRADE_UPDATE":
+            return
+
+        order = event["o"]
+        child = self._children.get(order.get("c"))
+        loop = self._loop
+        if child is None or loop is None:
+            return
+
+        loop.call_soon_threadsafe(
+            self._update_child, child, order["X"], float(order.get("z", 0)), float(order.get("ap", 0))
+        )
+
+    def _update_child(self, child: ChildOrder, status: str, executed: float, avg_price: float):
+        if child.status in FINAL_STATUSES:
+            return
+
+        parent = child.parent
+
+        if executed > child.executed:
+            parent.filled += executed - child.executed
+            parent.notional += executed * avg_price - child.executed * child.avg_price
+            child.executed, child.avg_price = executed, avg_price
+
+        if status in FINAL_STATUSES or child.status == "PENDING":
+            child.status = status
+
+        if status not in FINAL_STATUSES:
+            return
+
+        self._children.pop(child.client_order_id, None)
+        parent.working.pop(child.client_order_id, None)
+
+        if self.metrics.enabled:
+            self.metrics.inc("bot_execution_child_orders_total", algo=parent.algo.name, status=status)
+
+        if parent.cancelling:
+            self._check_done(parent)
+        else:
+            self._dispatch(parent, "on_child_done", child)
+
+    # -------------------------------
+    # COMPLETION (event loop)
+    # -------------------------------
+    def _check_done(self, parent: ParentOrder):
+        if parent.done:
+            return
+
+        if parent.cancelling:
+            if not parent.working:
+                self._finish(parent, parent.cancelling)
+            return
+
+        if parent.remaining < parent.step / 2 and not parent.working:
+            self._finish(parent, "FILLED")
+
+        elif parent.child_errors >= MAX_CHILD_ERRORS:
+            parent.error = parent.error or f"{parent.child_errors} child orders rejected in a row"
+            self._cancel_parent(parent, "FAILED")
+
+        elif not parent.working and parent.algo.exhausted(parent):
+            self._finish(parent, "INCOMPLETE")
+
+    def _cancel_parent(self, parent: ParentOrder, status: str = "CANCELED"):
+        if parent.done or parent.cancelling:
+            return
+
+        parent.cancelling = status
+        for child in list(parent.working.values()):
+            self.cancel_child(child)
+
+        self._check_done(parent)
+
+    def _finish(self, parent: ParentOrder, status: str):
+        parent.status = status
+        parent.finished = time.time()
+        parent._done.set()
+
+        slippage = parent.slippage_bps
+        self.logger.info(
+            f"Parent {parent.parent_id} {status}: {parent.filled}/{parent.quantity} {parent.symbol} "
+            f"avg {parent.avg_price:.8g} in {len(parent.children)} children"
+            + (f", slippage {slippage:.2f} bps" if slippage is not None else "")
+        )
+
+    # -------------------------------
+    # REST FALLBACK
+    # -------------------------------
+    def _stream_connected(self) -> bool:
+        stream = self.manager.user_stream
+        return stream is not None and stream.connected
+
+    async def _poll_periodically(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+
+            if self._stream_connected():
+                continue
+
+            now = time.monotonic()
+            stale = [
+                child for child in self._children.values()
+                if child.order_id is not None and now - child.sent >= self.poll_interval
+            ]
+            if stale:
+                results = await self._loop.run_in_executor(self._executor, self._poll_children, stale)
+                for child, order in results:
+                    self._update_child(
+                        child, order["status"], float(order.get("executedQty", 0)), float(order.get("avgPrice", 0))
+                    )
+
+    def _poll_children(self, children: list) -> list:
+        results = []
+        for child in children:
+            try:
+                results.append((child, self.manager.get_order(child.parent.symbol, child.order_id)))
+            except Exception as e:
+                self.logger.warning(f"Polling child {child.client_order_id} failed: {e}")
+        return results
@@ -0,0 +1,243 @@
+# bot/indicators.py
+
+"""
+Technical indicators with two matching paths.
+
+Batch functions (``ema``, ``rsi``, ...) take whole NumPy / pandas columns
+from get_futures_klines and return arrays aligned with the input, NaN
+during warm-up. Incremental classes (``EMA``, ``RSI``, ...) keep O(1)
+state and ``update()`` once per new bar; fed the same bars they produce
+the same values as the batch path (to floating-point rounding).
+"""
+
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+
+# -------------------------------
+# BATCH PATH
+# -------------------------------
+def _as_array(values) -> np.ndarray:
+    return np.asarray(values, dtype="float64")
+
+
+def _seeded_ewm(values: np.ndarray, period: int, alpha: float) -> np.ndarray:
+    """EMA seeded with the SMA of the first ``period`` values."""
+    out = np.full(len(values), np.nan)
+
+    if len(values) < period:
+        return out
+
+    seeded = np.concatenate(([values[:period].mean()], values[period:]))
+    out[period - 1:] = pd.Series(seeded).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+    return out
+
+
+def sma(values, period: int) -> np.ndarray:
+    return pd.Series(_as_array(values)).rolling(period).mean().to_numpy()
+
+
+def ema(values, period: int) -> np.ndarray:
+    return _seeded_ewm(_as_array(values), period, 2 / (period + 1))
+
+
+def rsi(values, period: int = 14) -> np.ndarray:
+    values = _as_array(values)
+    out = np.full(len(values), np.nan)
+
+    if len(values) <= period:
+        return out
+
+    change = np.diff(values)
+    avg_gain = _seeded_ewm(np.clip(change, 0, None), period, 1 / period)
+    avg_loss = _seeded_ewm(np.clip(-change, 0, None), period, 1 / period)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[1:] = np.where(avg_loss == 0, 100.0, 100 - 100 / (1 + avg_gain / avg_loss))
+
+    return out
+
+
+def true_range(high, low, close) -> np.ndarray:
+    high, low, close = _as_array(high), _as_array(low), _as_array(close)
+
+    prev_close = np.empty_like(close)
+    prev_close[0] = np.nan
+    prev_close[1:] = close[:-1]
+
+    tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    tr[0] = high[0] - low[0] if len(tr) else np.nan
+
+    return tr
+
+
+def atr(high, low, close, period: int = 14) -> np.ndarray:
+    return _seeded_ewm(true_range(high, low, close), period, 1 / period)
+
+
+def bollinger(values, period: int = 20, num_std: float = 2.0) -> tuple:
+    """Return (middle, upper, lower) bands using the population std."""
+    rolling = pd.Series(_as_array(values)).rolling(period)
+    middle = rolling.mean().to_numpy()
+    std = rolling.std(ddof=0).to_numpy()
+
+    return middle, middle + num_std * std, middle - num_std * std
+
+
+def vwap(high, low, close, volume) -> np.ndarray:
+    """Cumulative VWAP over the typical price (h + l + c) / 3."""
+    typical = (_as_array(high) + _as_array(low) + _as_array(close)) / 3
+    volume = _as_array(volume)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.cumsum(typical * volume) / np.cumsum(volume)
+
+
+# -------------------------------
+# INCREMENTAL PATH
+# -------------------------------
+class _SeededEWM:
+    __slots__ = ("period", "alpha", "count", "total", "value")
+
+    def __init__(self, period: int, alpha: float):
+        self.period = period
+        self.alpha = alpha
+        self.count = 0
+        self.total = 0.0
+        self.value = math.nan
+
+    def update(self, x: float) -> float:
+        if self.count < self.period:
+            self.count += 1
+            self.total += x
+            if self.count == self.period:
+                self.value = self.total / self.period
+        else:
+            self.value = (1 - self.alpha) * self.value + self.alpha * x
+
+        return self.value
+
+
+class SMA:
+    __slots__ = ("period", "window", "total", "value")
+
+    def __init__(self, period: int):
+        self.period = period
+        self.window = deque(maxlen=period)
+        self.total = 0.0
+        self.value = math.nan
+
+    def update(self, x: float) -> float:
+        if len(self.window) == self.period:
+            self.total -= self.window[0]
+
+        self.window.append(x)
+        self.total += x
+
+        if len(self.window) == self.period:
+            self.value = self.total / self.period
+
+        return self.value
+
+
+class EMA(_SeededEWM):
+    __slots__ = ()
+
+    def __init__(self, period: int):
+        super().__init__(period, 2 / (period + 1))
+
+
+class RSI:
+    __slots__ = ("prev", "gain", "loss", "value")
+
+    def __init__(self, period: int = 14):
+        self.prev = None
+        self.gain = _SeededEWM(period, 1 / period)
+        self.loss = _SeededEWM(period, 1 / period)
+        self.value = math.nan
+
+    def update(self, close: float) -> float:
+        if self.prev is not None:
+            change = close - self.prev
+            avg_gain = self.gain.update(max(change, 0.0))
+            avg_loss = self.loss.update(max(-change, 0.0))
+
+            if not math.isnan(avg_gain):
+                self.value = 100.0 if avg_loss == 0 else 100 - 100 / (1 + avg_gain / avg_loss)
+
+        self.prev = close
+        return self.value
+
+
+class ATR:
+    __slots__ = ("prev_close", "average", "value")
+
+    def __init__(self, period: int = 14):
+        self.prev_close = None
+        self.average = _SeededEWM(period, 1 / period)
+        self.value = math.nan
+
+    def update(self, high: float, low: float, close: float) -> float:
+        if self.prev_close is None:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+
+        self.prev_close = close
+        self.value = self.average.update(tr)
+        return self.value
+
+
+class BollingerBands:
+    """Sliding-window mean / variance (Welford-style add and remove)."""
+
+    __slots__ = ("period", "num_std", "window", "mean", "m2", "value")
+
+    def __init__(self, period: int = 20, num_std: float = 2.0):
+        self.period = period
+        self.num_std = num_std
+        self.window = deque(maxlen=period)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.value = (math.nan, math.nan, math.nan)
+
+    def update(self, x: float) -> tuple:
+        if len(self.window) < self.period:
+            self.window.append(x)
+            delta = x - self.mean
+            self.mean += delta / len(self.window)
+            self.m2 += delta * (x - self.mean)
+        else:
+            old = self.window[0]
+            self.window.append(x)
+            old_mean = self.mean
+            self.mean += (x - old) / self.period
+            self.m2 += (x - old) * (x - self.mean + old - old_mean)
+
+        if len(self.window) == self.period:
+            std = math.sqrt(max(self.m2, 0.0) / self.period)
+            self.value = (self.mean, self.mean + self.num_std * std, self.mean - self.num_std * std)
+
+        return self.value
+
+
+class VWAP:
+    __slots__ = ("price_volume", "volume", "value")
+
+    def __init__(self):
+        self.price_volume = 0.0
+        self.volume = 0.0
+        self.value = math.nan
+
+    def update(self, high: float, low: float, close: float, volume: float) -> float:
+        self.price_volume += (high + low + close) / 3 * volume
+        self.volume += volume
+
+        if self.volume:
+            self.value = self.price_volume / self.volume
+
+        return self.value
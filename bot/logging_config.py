@@ -1,21 +1,109 @@
 # bot/logging_config.py
 
+import atexit
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import time
+from datetime import datetime, timezone
 
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+
+# BOT_LOG_FORMAT=json writes the log file as JSON lines
+LOG_FORMAT_ENV = "BOT_LOG_FORMAT"
+
+_listener = None
+
+
+class RotatingLogHandler(logging.handlers.RotatingFileHandler):
+    """
+    File handler that rotates on size and, optionally, on age.
+
+    Rolls over when the file would exceed ``max_bytes`` or every
+    ``rotate_every`` seconds, keeping ``backup_count`` numbered backups
+    (trading_bot.log.1, .2, ...).
+    """
+
+    def __init__(self, filename: str, max_bytes: int = DEFAULT_MAX_BYTES,
+                 backup_count: int = DEFAULT_BACKUP_COUNT, rotate_every: float = None):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        self.rotate_every = rotate_every
+        self.rollover_at = time.time() + rotate_every if rotate_every else None
+
+    def shouldRollover(self, record) -> bool:
+        if self.rollover_at is not None and time.time() >= self.rollover_at:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self):
+        super().doRollover()
+        if self.rotate_every:
+            self.rollover_at = time.time() + self.rotate_every
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message (+ exception)."""
+
+    def format(self, record) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+
+        return json.dumps(entry, default=str)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    # The stock prepare() renders the message on the calling thread; the
+    # record is only ever read in-process, so leave formatting to the listener
+    def prepare(self, record):
+        return record
+
+
+def setup_logging(
+    log_dir: str = "logs",
+    use_queue: bool = True,
+    json_lines: bool = None,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    backup_count: int = DEFAULT_BACKUP_COUNT,
+    rotate_every: float = None,
+    console: bool = True,
+):
+    """
+    Configure the root logger.
+
+    With ``use_queue`` (the default) the root logger only enqueues
+    records; a background QueueListener formats them and does the file
+    and console I/O, so logging calls on the order path never block on
+    disk or the terminal. ``json_lines`` (or BOT_LOG_FORMAT=json) writes
+    the file as JSON lines.
+    """
+    global _listener
 
-def setup_logging(log_dir: str = "logs"):
     BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    LOG_DIR = os.path.join(BASE_DIR, "logs")
+    LOG_DIR = os.path.join(BASE_DIR, log_dir)
 
     os.makedirs(LOG_DIR, exist_ok=True)
 
     log_file = os.path.join(LOG_DIR, "trading_bot.log")
 
+    if json_lines is None:
+        json_lines = os.getenv(LOG_FORMAT_ENV, "").lower() == "json"
+
     logger = logging.getLogger()
     logger.setLevel(logging.INFO)
 
     # Prevent duplicate handlers
+    stop_logging()
     if logger.handlers:
         logger.handlers.clear()
 
@@ -24,14 +112,40 @@ def setup_logging(log_dir: str = "logs"):
     )
 
     # File handler
-    file_handler = logging.FileHandler(log_file)
-    file_handler.setFormatter(formatter)
+    file_handler = RotatingLogHandler(log_file, max_bytes, backup_count, rotate_every)
+    file_handler.setFormatter(JsonFormatter() if json_lines else formatter)
+    handlers = [file_handler]
 
     # Console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+
+    if use_queue:
+        log_queue = queue.SimpleQueue()
+        logger.addHandler(_DeferredQueueHandler(log_queue))
+
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+    else:
+        for handler in handlers:
+            logger.addHandler(handler)
+
+    return logger
+
+
+def stop_logging():
+    """Flush queued records and stop the background listener (runs at exit)."""
+    global _listener
+
+    listener, _listener = _listener, None
+    if listener is None:
+        return
+
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
 
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
 
-    return logger
\ No newline at end of file
+atexit.register(stop_logging)
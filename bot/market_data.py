@@ -0,0 +1,574 @@
+# bot/market_data.py
+
+import asyncio
+import json
+import logging
+import threading
+import time
+
+import numpy as np
+import websockets
+from binance.helpers import interval_to_milliseconds
+
+from bot.client import base_url_path, market_rest_url, market_stream_url
+
+DEFAULT_CAPACITY = 1000
+FLUSH_INTERVAL = 60.0
+# An aggTrade-built bar closes this long after its end even without a new trade
+CLOSE_GRACE_MS = 1000
+
+RECONNECT_DELAY = 1.0
+MAX_RECONNECT_DELAY = 30.0
+
+# Same columns as the kline store / .klines files
+BAR_DTYPE = np.dtype([
+    ("open_time", "i8"),
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+    ("volume", "f8"),
+    ("close_time", "i8"),
+])
+
+
+class KlineRing:
+    """
+    Fixed-size ring of closed bars with zero-copy reads.
+
+    Every bar is written twice, at ``i`` and ``i + capacity``, so the
+    latest ``n <= capacity`` bars are always one contiguous slice of the
+    backing array and ``latest(n)`` returns a read-only view instead of
+    a copy. A view stays valid until ``capacity - n`` more bars arrive;
+    copy it to keep it longer.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._bars = np.zeros(capacity * 2, dtype=BAR_DTYPE)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    @property
+    def last_open_time(self):
+        if not self._count:
+            return None
+        return int(self._bars[(self._count - 1) % self.capacity]["open_time"])
+
+    def append(self, bar: tuple) -> bool:
+        """Append a closed bar; a repeat of the last bar replaces it, older bars are ignored."""
+        with self._lock:
+            last = self.last_open_time
+
+            if last is not None and bar[0] < last:
+                return False
+
+            if last is not None and bar[0] == last:
+                slot = (self._count - 1) % self.capacity
+            else:
+                slot = self._count % self.capacity
+                self._count += 1
+
+            self._bars[slot] = bar
+            self._bars[slot + self.capacity] = bar
+
+        return True
+
+    def latest(self, n: int = None) -> np.ndarray:
+        size = len(self)
+        n = size if n is None else min(n, size)
+        end = (self._count - 1) % self.capacity + 1 + (self.capacity if self._count > self.capacity else 0)
+
+        view = self._bars[end - n:end]
+        view.flags.writeable = False
+        return view
+
+    def since(self, open_time: int) -> np.ndarray:
+        """Copy of the bars opened after ``open_time``."""
+        with self._lock:
+            bars = self.latest().copy()
+        return bars[bars["open_time"] > open_time]
+
+
+class _Series:
+    __slots__ = ("symbol", "interval", "step", "ring", "current", "flushed_until", "held")
+
+    def __init__(self, symbol: str, interval: str, capacity: int):
+        self.symbol = symbol
+        self.interval = interval
+        self.step = interval_to_milliseconds(interval)
+        self.ring = KlineRing(capacity)
+        # The bar still forming, as a mutable list in BAR_DTYPE order
+        self.current = None
+        self.flushed_until = None
+        # Closed bars held back while a gap before them is backfilled, or None
+        self.held = None
+
+
+class MarketDataService:
+    """
+    Live candles for many (symbol, interval) pairs from the futures market streams.
+
+    One combined websocket carries either the exchange's kline streams
+    (``source="kline"``) or aggTrade streams that are aggregated into
+    candles locally (``source="aggTrade"``). Closed bars land in a
+    KlineRing per pair that strategies read zero-copy with ``latest``.
+    On every (re)connect the rings are seeded from the historical
+    KlineStore and the rest of the gap, like any bar missed mid-stream,
+    is backfilled over REST; closed bars are flushed back to the store
+    every ``flush_interval`` seconds. ``use_store=False`` keeps
+    everything in memory.
+
+    Backfills come from the REST venue behind ``stream_url`` and each
+    venue but mainnet keeps its own cache directory, so testnet bars
+    never land in the mainnet history the backtester reads. With a
+    stream of unknown venue the store is off unless ``use_store=True``.
+    """
+
+    def __init__(
+        self,
+        subscriptions: list,
+        capacity: int = DEFAULT_CAPACITY,
+        source: str = "kline",
+        stream_url: str = None,
+        store=None,
+        use_store: bool = None,
+        downloader=None,
+        flush_interval: float = FLUSH_INTERVAL,
+    ):
+        if source not in ("kline", "aggTrade"):
+            raise ValueError("source must be 'kline' or 'aggTrade'")
+
+        self.logger = logging.getLogger(__name__)
+        self.source = source
+        self.stream_url = (stream_url or market_stream_url()).rstrip("/")
+        # REST base URL of the stream's venue, None when unknown
+        self.base_url = market_rest_url(self.stream_url)
+        self.use_store = self.base_url is not None if use_store is None else use_store
+        self.flush_interval = flush_interval if self.use_store else 0
+
+        self._store = store
+        self._store_lock = threading.Lock()
+        self._downloader = downloader
+        self._series = {}
+        self._by_stream = {}
+
+        for symbol, interval in subscriptions:
+            symbol = symbol.upper()
+            series = _Series(symbol, interval, capacity)
+            self._series[(symbol, interval)] = series
+
+            stream = f"{symbol.lower()}@kline_{interval}" if source == "kline" else f"{symbol.lower()}@aggTrade"
+            self._by_stream.setdefault(stream, []).append(series)
+
+        self._callbacks = []
+        self._gap_fills = set()
+        self._connected = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._loop = None
+        self._task = None
+
+        self.reconnects = 0
+        self.backfilled = 0
+        self.messages = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    @property
+    def store(self):
+        if self._store is None:
+            from historical_data.downloader import FUTURES_URL
+            from historical_data.kline_store import DEFAULT_CACHE_DIR, KlineStore
+
+            # The default cache holds mainnet history
+            venue = None if self.base_url == FUTURES_URL else self.base_url
+            self._store = KlineStore(base_url_path(DEFAULT_CACHE_DIR, venue))
+        return self._store
+
+    @property
+    def downloader(self):
+        if self._downloader is None:
+            from historical_data.downloader import KlineDownloader
+
+            self._downloader = KlineDownloader(base_url=self.base_url)
+        return self._downloader
+
+    # -------------------------------
+    # READS
+    # -------------------------------
+    def latest(self, symbol: str, interval: str, n: int = None) -> np.ndarray:
+        """The last ``n`` closed bars as a read-only BAR_DTYPE view (no copy, no REST)."""
+        return self._series[(symbol.upper(), interval)].ring.latest(n)
+
+    def current_bar(self, symbol: str, interval: str):
+        """The still-open bar as a BAR_DTYPE record, or None."""
+        current = self._series[(symbol.upper(), interval)].current
+        if current is None:
+            return None
+        return np.array(tuple(current), dtype=BAR_DTYPE)
+
+    def latest_frame(self, symbol: str, interval: str, n: int = None):
+        """``latest`` as a DataFrame in the get_futures_klines schema (copies)."""
+        from historical_data.kline_store import to_output_frame
+        import pandas as pd
+
+        return to_output_frame(pd.DataFrame(self.latest(symbol, interval, n)))
+
+    def add_callback(self, callback):
+        """Register ``callback(symbol, interval, bar)`` for every closed live bar (a BAR_DTYPE-ordered tuple)."""
+        self._callbacks.append(callback)
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.connected,
+            "messages": self.messages,
+            "reconnects": self.reconnects,
+            "backfilledBars": self.backfilled,
+            "series": {
+                f"{series.symbol}@{series.interval}": len(series.ring)
+                for series in self._series.values()
+            },
+        }
+
+    # -------------------------------
+    # LIFECYCLE
+    # -------------------------------
+    def start(self, wait: float = 10.0) -> bool:
+        if self._thread and self._thread.is_alive():
+            return self.connected
+
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run_loop, name="market-data", daemon=True)
+        self._thread.start()
+
+        return self._connected.wait(wait)
+
+    def stop(self, flush: bool = True):
+        self._stopping = True
+
+        loop, task = self._loop, self._task
+        if loop is not None and task is not None:
+            loop.call_soon_threadsafe(task.cancel)
+
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+
+        self._connected.clear()
+
+        if flush and self.use_store:
+            self.flush()
+
+    # -------------------------------
+    # BAR BUILDING
+    # -------------------------------
+    def handle_message(self, message):
+        try:
+            payload = json.loads(message)
+        except (TypeError, ValueError):
+            self.logger.warning(f"Ignoring malformed market message: {message!r}")
+            return
+
+        self.messages += 1
+
+        # Combined streams wrap each event as {"stream": ..., "data": ...}
+        event = payload.get("data", payload)
+        event_type = event.get("e")
+        symbol = str(event.get("s", "")).lower()
+
+        if event_type == "kline":
+            for series in self._by_stream.get(f"{symbol}@kline_{event['k']['i']}", ()):
+                self._on_kline(series, event["k"])
+
+        elif event_type == "aggTrade":
+            for series in self._by_stream.get(f"{symbol}@aggTrade", ()):
+                self._on_trade(series, int(event["T"]), float(event["p"]), float(event["q"]))
+
+    def _on_kline(self, series: _Series, k: dict):
+        bar = [int(k["t"]), float(k["o"]), float(k["h"]), float(k["l"]), float(k["c"]), float(k["v"]), int(k["T"])]
+
+        if k.get("x"):
+            self._close_bar(series, bar)
+            series.current = None
+        else:
+            series.current = bar
+
+    def _on_trade(self, series: _Series, trade_time: int, price: float, qty: float):
+        open_time = trade_time // series.step * series.step
+        current = series.current
+
+        if current is not None and open_time > current[0]:
+            self._close_bar(series, current)
+            current = None
+
+        if current is None:
+            last = series.ring.last_open_time
+            if last is not None and open_time <= last:
+                # Late trade for a bar that is already closed
+                return
+            series.current = [open_time, price, price, price, price, qty, open_time + series.step - 1]
+        else:
+            current[2] = max(current[2], price)
+            current[3] = min(current[3], price)
+            current[4] = price
+            current[5] += qty
+
+    def _close_bar(self, series: _Series, bar: list):
+        if series.held is not None:
+            series.held.append(bar)
+            return
+
+        last = series.ring.last_open_time
+
+        if last is not None and bar[0] > last + series.step:
+            if self.source == "kline":
+                if self._backfill_later(series, bar):
+                    return
+                self._backfill(series, bar[0] - 1)
+            else:
+                self._fill_flat(series, bar[0])
+
+        bar = tuple(bar)
+        if series.ring.append(bar):
+            for callback in self._callbacks:
+                try:
+                    callback(series.symbol, series.interval, bar)
+                except Exception:
+                    self.logger.exception("Market data callback failed")
+
+    def _fill_flat(self, series: _Series, until: int):
+        # No trades in a whole interval: the exchange prints a flat, zero-volume bar
+        last = series.ring.latest(1)[0]
+        close = float(last["close"])
+        open_time = int(last["open_time"]) + series.step
+
+        while open_time < until:
+            series.ring.append((open_time, close, close, close, close, 0.0, open_time + series.step - 1))
+            open_time += series.step
+
+    def close_stale_bars(self, now_ms: int = None):
+        """Close aggTrade-built bars whose interval ended without a later trade."""
+        now_ms = now_ms or int(time.time() * 1000)
+
+        for series in self._series.values():
+            current = series.current
+            if current is not None and now_ms >= current[6] + CLOSE_GRACE_MS:
+                self._close_bar(series, current)
+                series.current = None
+
+    # -------------------------------
+    # BACKFILL / FLUSH
+    # -------------------------------
+    def _backfill(self, series: _Series, end_ms: int = None) -> int:
+        """Fetch closed bars missing between the ring's last bar and ``end_ms`` over REST."""
+        now_ms = int(time.time() * 1000)
+        if end_ms is None:
+            end_ms = now_ms // series.step * series.step - 1
+
+        last = series.ring.last_open_time
+        start_ms = last + series.step if last is not None else end_ms - series.step * series.ring.capacity + 1
+
+        if start_ms > end_ms:
+            return 0
+
+        try:
+            frame = self.downloader.download(series.symbol, series.interval, start_ms, end_ms)
+        except Exception as e:
+            self.logger.warning(f"Backfill of {series.symbol} {series.interval} failed: {e}")
+            return 0
+
+        frame = frame[frame["close_time"] <= end_ms]
+        added = 0
+        for row in frame[list(BAR_DTYPE.names)].itertuples(index=False):
+            added += series.ring.append(tuple(row))
+
+        # A gap longer than the ring would never reach the store through flush()
+        if self.use_store and added and last is not None and series.flushed_until == last:
+            with self._store_lock:
+                self.store.merge(series.symbol, series.interval, frame, start_ms, int(frame["close_time"].iloc[-1]))
+            series.flushed_until = series.ring.last_open_time
+
+        if added:
+            self.backfilled += added
+            self.logger.info(f"Backfilled {added} {series.symbol} {series.interval} bars")
+
+        return added
+
+    def _backfill_later(self, series: _Series, bar: list) -> bool:
+        """On an event loop, fill the gap before ``bar`` from a worker thread, holding bars back meanwhile."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Fed from a plain thread: nothing to block, backfill inline
+            return False
+
+        series.held = [bar]
+        task = loop.create_task(self._fill_gap(series, bar[0] - 1))
+        self._gap_fills.add(task)
+        task.add_done_callback(self._gap_fills.discard)
+        return True
+
+    async def _fill_gap(self, series: _Series, end_ms: int):
+        try:
+            await asyncio.to_thread(self._backfill, series, end_ms)
+        finally:
+            held, series.held = series.held, None
+            for bar in held:
+                self._close_bar(series, bar)
+
+    def _seed(self, series: _Series):
+        # Warm the ring from the local store first; REST only fills what is left
+        if not self.use_store or series.ring.last_open_time is not None:
+            return
+
+        covered = self.store.coverage(series.symbol, series.interval)
+        if covered is None:
+            return
+
+        bars = self.store.load(series.symbol, series.interval, covered[1] - series.step * series.ring.capacity)
+
+        for row in bars.tail(series.ring.capacity)[list(BAR_DTYPE.names)].itertuples(index=False):
+            series.ring.append(tuple(row))
+
+        series.flushed_until = series.ring.last_open_time
+
+    def _catch_up(self):
+        for series in self._series.values():
+            self._seed(series)
+            self._backfill(series)
+
+            # A bar left open by the dropped connection was just replaced over REST
+            last = series.ring.last_open_time
+            if series.current is not None and last is not None and series.current[0] <= last:
+                series.current = None
+
+    def flush(self) -> int:
+        """Merge closed bars not yet persisted into the KlineStore; return how many."""
+        import pandas as pd
+
+        written = 0
+        if not self.use_store:
+            return written
+
+        for series in self._series.values():
+            bars = series.ring.since(series.flushed_until if series.flushed_until is not None else -1)
+            if not len(bars):
+                continue
+
+            first, last = int(bars["open_time"][0]), int(bars["close_time"][-1])
+
+            with self._store_lock:
+                covered = self.store.coverage(series.symbol, series.interval)
+
+                # Never let the store's coverage span a hole
+                if covered is not None and (first > covered[1] + 1 or last + 1 < covered[0]):
+                    self.logger.warning(
+                        f"Not flushing {series.symbol} {series.interval}: not contiguous with the stored range"
+                    )
+                    continue
+
+                self.store.merge(series.symbol, series.interval, pd.DataFrame(bars), first, last)
+
+            series.flushed_until = int(bars["open_time"][-1])
+            written += len(bars)
+
+        return written
+
+    # -------------------------------
+    # CONNECTION
+    # -------------------------------
+    def _url(self) -> str:
+        return f"{self.stream_url}/stream?streams={'/'.join(self._by_stream)}"
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+
+        self._task = self._loop.create_task(self._run())
+
+        try:
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            # Cancelled from stop()
+            pass
+        finally:
+            self._loop.close()
+            self._loop = None
+            self._task = None
+
+    async def run(self):
+        """
+        Run the feed on the caller's event loop instead of its own thread.
+
+        Await it as a task of its own; ``stop()`` cancels that task. Bar
+        callbacks then run on the caller's loop.
+        """
+        self._stopping = False
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.current_task()
+
+        try:
+            await self._run()
+        finally:
+            self._loop = None
+            self._task = None
+
+    async def _run(self):
+        delay = RECONNECT_DELAY
+        housekeeping = asyncio.ensure_future(self._housekeeping())
+
+        try:
+            while not self._stopping:
+                try:
+                    async with websockets.connect(self._url()) as ws:
+                        # One writer per ring: gap fills from the last connection finish first
+                        if self._gap_fills:
+                            await asyncio.gather(*self._gap_fills, return_exceptions=True)
+
+                        # Messages queue in the socket while the gap is filled
+                        await asyncio.to_thread(self._catch_up)
+
+                        self.logger.info(f"Market data stream connected ({len(self._by_stream)} streams)")
+                        self._connected.set()
+                        delay = RECONNECT_DELAY
+
+                        async for message in ws:
+                            self.handle_message(message)
+
+                except Exception as e:
+                    self.logger.warning(f"Market data stream error: {e}")
+
+                self._connected.clear()
+
+                if self._stopping:
+                    break
+
+                self.reconnects += 1
+                self.logger.info(f"Reconnecting market data stream in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+        finally:
+            housekeeping.cancel()
+            for task in self._gap_fills:
+                task.cancel()
+
+    async def _housekeeping(self):
+        last_flush = time.monotonic()
+
+        while True:
+            await asyncio.sleep(1)
+
+            if self.source == "aggTrade":
+                self.close_stale_bars()
+
+            if self.flush_interval and time.monotonic() - last_flush >= self.flush_interval:
+                last_flush = time.monotonic()
+                try:
+                    await asyncio.to_thread(self.flush)
+                except Exception:
+                    self.logger.exception("Flushing bars to the kline store failed")
@@ -0,0 +1,349 @@
+# bot/metrics.py
+
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Set to 0 to turn instrumentation off; set a port to serve /metrics
+METRICS_ENV = "BOT_METRICS"
+METRICS_PORT_ENV = "BOT_METRICS_PORT"
+
+# Latency bucket upper bounds in seconds (the Prometheus "le" labels)
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+MAX_TRACES = 256
+
+
+class Histogram:
+    """Fixed-bucket latency histogram, Prometheus style."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation (inf past the last bucket)."""
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+
+        return float("inf")
+
+    def to_dict(self) -> dict:
+        cumulative, buckets = 0, {}
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        buckets["+Inf"] = self.count
+
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "avg": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": buckets,
+        }
+
+
+class Metrics:
+    """
+    In-process registry of latency histograms, error counters and order traces.
+
+    Series are keyed by name plus keyword labels. Callers check
+    ``enabled`` before doing any timing work, so a disabled registry
+    costs one attribute read per call site.
+    """
+
+    def __init__(self, enabled: bool = True, buckets: tuple = LATENCY_BUCKETS, max_traces: int = MAX_TRACES):
+        self.enabled = enabled
+        self.buckets = buckets
+
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self.traces = deque(maxlen=max_traces)
+
+    # -------------------------------
+    # RECORDING
+    # -------------------------------
+    def observe(self, name: str, seconds: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def inc(self, name: str, amount: int = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def trace_order(self, **attrs):
+        """An OrderTrace for one order's lifecycle, or a no-op trace when disabled."""
+        if not self.enabled:
+            return NULL_TRACE
+        return OrderTrace(self, attrs)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self.traces.clear()
+
+    # -------------------------------
+    # EXPORT
+    # -------------------------------
+    def snapshot(self) -> dict:
+        """JSON-serialisable view of every series and the recent order traces."""
+        with self._lock:
+            histograms = [
+                {"name": name, "labels": dict(labels), **histogram.to_dict()}
+                for (name, labels), histogram in sorted(self._histograms.items())
+            ]
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            traces = list(self.traces)
+
+        return {"histograms": histograms, "counters": counters, "traces": traces}
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), default=str)
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        typed = set()
+
+        with self._lock:
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {name} histogram")
+                    typed.add(name)
+
+                cumulative = 0
+                for bound, count in zip(histogram.bounds, histogram.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(labels, le=bound)} {cumulative}")
+                lines.append(f"{name}_bucket{_labels(labels, le='+Inf')} {histogram.count}")
+                lines.append(f"{name}_sum{_labels(labels)} {histogram.sum}")
+                lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+            for (name, labels), value in sorted(self._counters.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {name} counter")
+                    typed.add(name)
+                lines.append(f"{name}{_labels(labels)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels: tuple, **extra) -> str:
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+
+    body = ",".join(
+        f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for key, value in pairs
+    )
+    return "{" + body + "}"
+
+
+# -------------------------------
+# ORDER TRACES
+# -------------------------------
+class OrderTrace:
+    """
+    Timeline of one order: validate, submit, ack, each poll, fill.
+
+    ``span(name)`` times a phase (also observed into the
+    bot_order_phase_seconds histogram), ``event(name)`` marks an instant.
+    ``finish(status)`` records the total and keeps the trace in the
+    registry's recent-traces ring.
+    """
+
+    __slots__ = ("metrics", "attrs", "started", "_t0", "spans", "status")
+
+    def __init__(self, metrics: Metrics, attrs: dict):
+        self.metrics = metrics
+        self.attrs = attrs
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        self.spans = []
+        self.status = None
+
+    def span(self, name: str, **attrs) -> "_Span":
+        return _Span(self, name, attrs)
+
+    def event(self, name: str, **attrs):
+        self.spans.append({
+            "name": name,
+            "offset_ms": (time.perf_counter() - self._t0) * 1000,
+            "duration_ms": 0.0,
+            **attrs,
+        })
+
+    def finish(self, status: str, **attrs):
+        total = time.perf_counter() - self._t0
+        self.status = status
+        order_type = self.attrs.get("type", "")
+
+        self.metrics.observe("bot_order_seconds", total, type=order_type, status=status)
+        self.metrics.inc("bot_orders_total", type=order_type, status=status)
+        self.metrics.traces.append({
+            **self.attrs,
+            **attrs,
+            "status": status,
+            "started": self.started,
+            "total_ms": total * 1000,
+            "spans": self.spans,
+        })
+
+
+class _Span:
+    __slots__ = ("trace", "name", "attrs", "_start")
+
+    def __init__(self, trace: OrderTrace, name: str, attrs: dict):
+        self.trace = trace
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        trace = self.trace
+        span = {
+            "name": self.name,
+            "offset_ms": (self._start - trace._t0) * 1000,
+            "duration_ms": (end - self._start) * 1000,
+            **self.attrs,
+        }
+        if exc_type is not None:
+            span["error"] = exc_type.__name__
+
+        trace.spans.append(span)
+        trace.metrics.observe("bot_order_phase_seconds", end - self._start, phase=self.name)
+        return False
+
+
+class _NullTrace:
+    """Stand-in used when metrics are disabled; every call is a no-op."""
+
+    __slots__ = ()
+
+    def span(self, name: str, **attrs):
+        return NULL_SPAN
+
+    def event(self, name: str, **attrs):
+        pass
+
+    def finish(self, status: str, **attrs):
+        pass
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def set(self, **attrs):
+        pass
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_TRACE = _NullTrace()
+NULL_SPAN = _NullSpan()
+
+
+# -------------------------------
+# HTTP ENDPOINT
+# -------------------------------
+def start_metrics_server(port: int, host: str = "127.0.0.1", metrics: Metrics = None) -> ThreadingHTTPServer:
+    """Serve /metrics (Prometheus text) and /metrics.json from a daemon thread."""
+    metrics = metrics or get_metrics()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith("/metrics.json"):
+                body, content_type = metrics.to_json(), "application/json"
+            elif self.path.startswith("/metrics"):
+                body, content_type = metrics.to_prometheus(), "text/plain; version=0.0.4"
+            else:
+                self.send_error(404)
+                return
+
+            payload = body.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+
+    logging.getLogger(__name__).info(f"Metrics served on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+_default_metrics = None
+_default_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    """Process-wide registry; BOT_METRICS=0 disables it, BOT_METRICS_PORT serves it."""
+    global _default_metrics
+
+    if _default_metrics is None:
+        with _default_metrics_lock:
+            if _default_metrics is None:
+                metrics = Metrics(enabled=os.getenv(METRICS_ENV, "1") != "0")
+
+                port = os.getenv(METRICS_PORT_ENV)
+                if port and metrics.enabled:
+                    start_metrics_server(int(port), metrics=metrics)
+
+                _default_metrics = metrics
+
+    return _default_metrics
@@ -0,0 +1,492 @@
+# bot/order_book.py
+
+import asyncio
+import json
+import logging
+import threading
+import time
+
+import numpy as np
+import websockets
+
+from bot.client import market_stream_url
+from bot.market_data import MAX_RECONNECT_DELAY, RECONNECT_DELAY
+
+DEPTH_LIMIT = 1000
+# Diff-depth update speed: "100ms", "250ms" or "500ms"
+DEPTH_SPEED = "100ms"
+# At most one snapshot per symbol per this many seconds while resyncing fails
+RESYNC_BACKOFF = 1.0
+
+# Depth queries sum this many levels first and only widen if that is not enough
+SCAN_LEVELS = 32
+
+_EMPTY = np.empty(0, dtype=np.float64)
+
+
+def _levels(levels: list) -> tuple:
+    """[[price, qty], ...] (exchange strings) -> (prices, quantities) arrays."""
+    if not levels:
+        return _EMPTY, _EMPTY
+    array = np.array(levels, dtype=np.float64)
+    return array[:, 0], array[:, 1]
+
+
+def _merge(side: tuple, updates: tuple) -> tuple:
+    prices, quantities = side
+    new_prices, new_quantities = updates
+
+    order = np.argsort(new_prices, kind="stable")
+    new_prices, new_quantities = new_prices[order], new_quantities[order]
+
+    # Overwrite the levels that exist, insert the rest in place, drop the zeros
+    index = np.searchsorted(prices, new_prices)
+    exists = index < len(prices)
+    exists[exists] = prices[index[exists]] == new_prices[exists]
+
+    quantities = quantities.copy()
+    quantities[index[exists]] = new_quantities[exists]
+
+    insert = ~exists
+    if insert.any():
+        # Same as np.insert for both arrays, with one shared mask
+        slots = index[insert] + np.arange(int(insert.sum()))
+        old = np.ones(len(prices) + len(slots), dtype=bool)
+        old[slots] = False
+
+        merged_prices = np.empty(len(old))
+        merged_prices[slots], merged_prices[old] = new_prices[insert], prices
+        merged_quantities = np.empty(len(old))
+        merged_quantities[slots], merged_quantities[old] = new_quantities[insert], quantities
+        prices, quantities = merged_prices, merged_quantities
+
+    keep = quantities > 0
+    if keep.all():
+        return prices, quantities
+    return prices[keep], quantities[keep]
+
+
+def _running_total(prices, quantities, target: float, notional: bool):
+    """Cumulative quantity (or notional) from the top, summed only as deep as ``target`` needs."""
+    n = SCAN_LEVELS
+
+    while True:
+        values = prices[:n] * quantities[:n] if notional else quantities[:n]
+        total = np.cumsum(values)
+        if total[-1] >= target or n >= len(prices):
+            return total
+        n *= 8
+
+
+class OrderBook:
+    """
+    Local replica of one symbol's order book.
+
+    Each side is a pair of price-sorted NumPy arrays (bids and asks both
+    ascending, so the best bid is the last element and the best ask the
+    first). Updates are merged in one vectorised step and published by
+    swapping the arrays, so readers never take a lock: top of book is an
+    array lookup and depth queries a cumulative sum over the levels.
+    """
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol.upper()
+        self.last_update_id = None
+        self.updated = None
+        self._bids = (_EMPTY, _EMPTY)
+        self._asks = (_EMPTY, _EMPTY)
+
+    @classmethod
+    def from_snapshot(cls, symbol: str, snapshot: dict) -> "OrderBook":
+        book = cls(symbol)
+        book.load_snapshot(snapshot)
+        return book
+
+    @property
+    def synced(self) -> bool:
+        return self.last_update_id is not None
+
+    def load_snapshot(self, snapshot: dict):
+        """Replace the book with a REST depth snapshot."""
+        bids, asks = _levels(snapshot["bids"]), _levels(snapshot["asks"])
+
+        order = np.argsort(bids[0])
+        self._bids = (bids[0][order], bids[1][order])
+        order = np.argsort(asks[0])
+        self._asks = (asks[0][order], asks[1][order])
+
+        self.last_update_id = snapshot["lastUpdateId"]
+        self.updated = time.time()
+
+    def apply(self, bids: list, asks: list, update_id: int):
+        """Apply diff-depth levels; a quantity of 0 removes the level."""
+        if bids:
+            self._bids = _merge(self._bids, _levels(bids))
+        if asks:
+            self._asks = _merge(self._asks, _levels(asks))
+
+        self.last_update_id = update_id
+        self.updated = time.time()
+
+    def invalidate(self):
+        self.last_update_id = None
+
+    # -------------------------------
+    # TOP OF BOOK
+    # -------------------------------
+    def best_bid(self):
+        """(price, quantity) of the best bid, or None."""
+        prices, quantities = self._bids
+        return (float(prices[-1]), float(quantities[-1])) if len(prices) else None
+
+    def best_ask(self):
+        prices, quantities = self._asks
+        return (float(prices[0]), float(quantities[0])) if len(prices) else None
+
+    def mid(self):
+        bid, ask = self._bids[0], self._asks[0]
+        if not len(bid) or not len(ask):
+            return None
+        return float(bid[-1] + ask[0]) / 2
+
+    def spread(self):
+        bid, ask = self._bids[0], self._asks[0]
+        if not len(bid) or not len(ask):
+            return None
+        return float(ask[0] - bid[-1])
+
+    def spread_bps(self):
+        mid = self.mid()
+        return None if not mid else self.spread() / mid * 10_000
+
+    # -------------------------------
+    # DEPTH
+    # -------------------------------
+    def _walk(self, side: str) -> tuple:
+        # Levels a BUY order takes (asks, best first) or a SELL order (bids, best first)
+        if side.upper() == "BUY":
+            return self._asks
+        prices, quantities = self._bids
+        return prices[::-1], quantities[::-1]
+
+    def levels(self, side: str, n: int = 10) -> list:
+        """The best ``n`` [price, quantity] levels an order on ``side`` would trade against."""
+        prices, quantities = self._walk(side)
+        return np.column_stack((prices[:n], quantities[:n])).tolist()
+
+    def depth(self, side: str, notional: float) -> dict:
+        """
+        Quantity available to an order on ``side`` up to ``notional`` USDT.
+
+        Returns the quantity, the notional actually covered (less than
+        asked if the book runs out) and the worst price reached.
+        """
+        prices, quantities = self._walk(side)
+        if not len(prices):
+            return {"quantity": 0.0, "notional": 0.0, "price": None}
+
+        cumulative = _running_total(prices, quantities, notional, notional=True)
+        i = int(np.searchsorted(cumulative, notional))
+
+        if i >= len(cumulative):
+            return {"quantity": float(quantities.sum()), "notional": float(cumulative[-1]), "price": float(prices[-1])}
+
+        before = cumulative[i - 1] if i else 0.0
+        quantity = quantities[:i].sum() + (notional - before) / prices[i]
+        return {"quantity": float(quantity), "notional": float(notional), "price": float(prices[i])}
+
+    def estimate_fill(self, side: str, quantity: float) -> dict:
+        """
+        Expected fill of a MARKET order for ``quantity`` against the current book.
+
+        ``slippageBps`` is the average price's distance from mid, in the
+        direction that costs the order. ``filledQty`` is short of the
+        quantity if the local book does not hold enough levels. None for an
+        empty book or a quantity that is not positive.
+        """
+        prices, quantities = self._walk(side)
+        mid = self.mid()
+        if quantity <= 0 or not len(prices) or mid is None:
+            return None
+
+        cumulative = _running_total(prices, quantities, quantity, notional=False)
+        i = min(int(np.searchsorted(cumulative, quantity)), len(cumulative) - 1)
+
+        taken = quantities[:i + 1].copy()
+        taken[-1] -= max(cumulative[i] - quantity, 0.0)
+        filled = float(min(cumulative[i], quantity))
+        avg_price = float((prices[:i + 1] * taken).sum() / filled)
+
+        direction = 1 if side.upper() == "BUY" else -1
+        return {
+            "avgPrice": avg_price,
+            "worstPrice": float(prices[i]),
+            "filledQty": filled,
+            "slippageBps": (avg_price - mid) / mid * 10_000 * direction,
+        }
+
+
+class _BookSync:
+    __slots__ = ("book", "bridged", "last_attempt", "held")
+
+    def __init__(self, symbol: str):
+        self.book = OrderBook(symbol)
+        # True once the first diff after the snapshot has been applied
+        self.bridged = False
+        self.last_attempt = 0.0
+        # Diffs held back while a snapshot is fetched off the event loop, or None
+        self.held = None
+
+
+class OrderBookService:
+    """
+    Order books for many symbols kept in sync from the diff-depth streams.
+
+    Follows the exchange's recipe: open the ``<symbol>@depth`` streams,
+    load a REST snapshot, drop diffs older than its ``lastUpdateId``,
+    bridge with the first diff spanning it, then require every diff's
+    ``pu`` to equal the previous ``u``. A break in that chain, or a
+    reconnect, invalidates the book and reloads the snapshot.
+    """
+
+    def __init__(self, symbols: list, client=None, stream_url: str = None,
+                 depth_limit: int = DEPTH_LIMIT, speed: str = DEPTH_SPEED):
+        self.logger = logging.getLogger(__name__)
+        self._client = client
+        self.stream_url = (stream_url or market_stream_url()).rstrip("/")
+        self.depth_limit = depth_limit
+        self.speed = speed
+
+        self._books = {symbol.upper(): _BookSync(symbol) for symbol in symbols}
+
+        self._connected = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._loop = None
+        self._task = None
+        self._pending_resyncs = set()
+
+        self.messages = 0
+        self.resyncs = 0
+        self.gaps = 0
+        self.reconnects = 0
+
+    @property
+    def client(self):
+        if self._client is None:
+            from bot.client import get_client
+
+            self._client = get_client()
+        return self._client
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    def book(self, symbol: str) -> OrderBook:
+        return self._books[symbol.upper()].book
+
+    def get(self, symbol: str):
+        """The symbol's book if it is subscribed and in sync, else None."""
+        sync = self._books.get(symbol.upper())
+        return sync.book if sync is not None and sync.book.synced else None
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.connected,
+            "messages": self.messages,
+            "resyncs": self.resyncs,
+            "gaps": self.gaps,
+            "reconnects": self.reconnects,
+            "books": {
+                symbol: {"synced": sync.book.synced, "lastUpdateId": sync.book.last_update_id}
+                for symbol, sync in self._books.items()
+            },
+        }
+
+    # -------------------------------
+    # LIFECYCLE
+    # -------------------------------
+    def start(self, wait: float = 10.0) -> bool:
+        if self._thread and self._thread.is_alive():
+            return self.connected
+
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run_loop, name="order-book", daemon=True)
+        self._thread.start()
+
+        return self._connected.wait(wait)
+
+    def stop(self):
+        self._stopping = True
+
+        loop, task = self._loop, self._task
+        if loop is not None and task is not None:
+            loop.call_soon_threadsafe(task.cancel)
+
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+
+        self._connected.clear()
+
+    # -------------------------------
+    # SYNCHRONISATION
+    # -------------------------------
+    def resync(self, symbol: str) -> bool:
+        """Reload the symbol's snapshot; diffs already queued on the socket are replayed on top."""
+        sync = self._books[symbol.upper()]
+        sync.book.invalidate()
+        sync.bridged = False
+        sync.last_attempt = time.monotonic()
+
+        try:
+            snapshot = self.client.get_order_book(sync.book.symbol, self.depth_limit)
+        except Exception as e:
+            self.logger.warning(f"Order book snapshot for {sync.book.symbol} failed: {e}")
+            return False
+
+        sync.book.load_snapshot(snapshot)
+        self.resyncs += 1
+        return True
+
+    def handle_message(self, message):
+        try:
+            payload = json.loads(message)
+        except (TypeError, ValueError):
+            self.logger.warning(f"Ignoring malformed depth message: {message!r}")
+            return
+
+        self.messages += 1
+
+        event = payload.get("data", payload)
+        if event.get("e") != "depthUpdate":
+            return
+
+        sync = self._books.get(event.get("s"))
+        if sync is not None:
+            self._on_diff(sync, event)
+
+    def _on_diff(self, sync: _BookSync, event: dict):
+        if sync.held is not None:
+            sync.held.append(event)
+            return
+
+        book = sync.book
+
+        if not book.synced:
+            if time.monotonic() - sync.last_attempt < RESYNC_BACKOFF or not self._resync_for(sync, event):
+                return
+
+        first, last = event["U"], event["u"]
+
+        if last < book.last_update_id:
+            # Already contained in the snapshot
+            return
+
+        if not sync.bridged:
+            # A diff starting right after the snapshot bridges it as well as one spanning it
+            if first > book.last_update_id + 1:
+                # The snapshot is older than the stream: fetch a newer one
+                self.logger.info(f"{book.symbol} snapshot behind the stream, resyncing")
+                if not self._resync_for(sync, event) or event["u"] < book.last_update_id:
+                    return
+        elif event["pu"] != book.last_update_id:
+            self.gaps += 1
+            self.logger.warning(
+                f"{book.symbol} depth gap (pu {event['pu']} != {book.last_update_id}), resyncing"
+            )
+            if not self._resync_for(sync, event) or event["u"] < book.last_update_id:
+                return
+
+        book.apply(event["b"], event["a"], last)
+        sync.bridged = True
+
+    def _resync_for(self, sync: _BookSync, event: dict) -> bool:
+        """
+        Resync before applying ``event``; True if it can be applied now.
+
+        On an event loop the snapshot is fetched from a worker thread
+        instead: the book is marked unsynced, and ``event`` and the diffs
+        after it are held and replayed once the snapshot lands.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return self.resync(sync.book.symbol)
+
+        sync.book.invalidate()
+        sync.bridged = False
+        sync.held = [event]
+
+        task = loop.create_task(self._resync_later(sync))
+        self._pending_resyncs.add(task)
+        task.add_done_callback(self._pending_resyncs.discard)
+        return False
+
+    async def _resync_later(self, sync: _BookSync):
+        try:
+            await asyncio.to_thread(self.resync, sync.book.symbol)
+        finally:
+            held, sync.held = sync.held, None
+            for event in held:
+                self._on_diff(sync, event)
+
+    # -------------------------------
+    # CONNECTION
+    # -------------------------------
+    def _url(self) -> str:
+        suffix = "depth" if self.speed == "250ms" else f"depth@{self.speed}"
+        streams = "/".join(f"{symbol.lower()}@{suffix}" for symbol in self._books)
+        return f"{self.stream_url}/stream?streams={streams}"
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+
+        self._task = self._loop.create_task(self._run())
+
+        try:
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            # Cancelled from stop()
+            pass
+        finally:
+            self._loop.close()
+            self._loop = None
+            self._task = None
+
+    async def _run(self):
+        delay = RECONNECT_DELAY
+
+        while not self._stopping:
+            try:
+                async with websockets.connect(self._url()) as ws:
+                    # Snapshots requested before the reconnect land first
+                    if self._pending_resyncs:
+                        await asyncio.gather(*self._pending_resyncs, return_exceptions=True)
+
+                    # Subscribed first, so diffs after the snapshots queue on the socket
+                    for symbol in self._books:
+                        await asyncio.to_thread(self.resync, symbol)
+
+                    self.logger.info(f"Order book stream connected ({len(self._books)} symbols)")
+                    self._connected.set()
+                    delay = RECONNECT_DELAY
+
+                    async for message in ws:
+                        self.handle_message(message)
+
+            except Exception as e:
+                self.logger.warning(f"Order book stream error: {e}")
+
+            self._connected.clear()
+            for sync in self._books.values():
+                sync.book.invalidate()
+
+            if self._stopping:
+                break
+
+            self.reconnects += 1
+            self.logger.info(f"Reconnecting order book stream in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
@@ -0,0 +1,428 @@
+# bot/order_store.py
+
+import itertools
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from bot.client import base_url_path
+from bot.user_stream import FINAL_STATUSES
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_WAL_PATH = os.path.join(BASE_DIR, "data", "orders.wal")
+
+# Final orders kept in memory, and in the log once it is compacted
+RETAIN_CLOSED = 10_000
+# The log is compacted once it holds this many times more records than live orders
+COMPACT_RATIO = 4
+MIN_COMPACT_RECORDS = 10_000
+
+# Written before the request is sent; no response yet
+PENDING = "PENDING_NEW"
+# Sent before a restart, neither open on the exchange nor resolvable yet
+UNKNOWN = "UNKNOWN"
+# "Order does not exist": a lookup by client id proves the order was never placed
+ORDER_NOT_FOUND = -2013
+OPEN_STATUSES = (PENDING, "NEW", "PARTIALLY_FILLED")
+
+# Status order: an update never moves an order back to an earlier one
+_RANK = {PENDING: 0, UNKNOWN: 0, "NEW": 1, "PARTIALLY_FILLED": 2}
+
+# user-data stream ORDER_TRADE_UPDATE field -> REST order field
+STREAM_FIELDS = {
+    "c": "clientOrderId",
+    "i": "orderId",
+    "s": "symbol",
+    "S": "side",
+    "o": "type",
+    "f": "timeInForce",
+    "p": "price",
+    "q": "origQty",
+    "z": "executedQty",
+    "ap": "avgPrice",
+    "X": "status",
+    "T": "updateTime",
+}
+FLOAT_FIELDS = ("price", "origQty", "executedQty", "avgPrice")
+
+
+def normalize_order(order: dict) -> dict:
+    """An order (REST response or mapped stream event) in the store's shape: float quantities and prices."""
+    state = {
+        "clientOrderId": order.get("clientOrderId"),
+        "orderId": order.get("orderId"),
+        "symbol": order.get("symbol"),
+        "side": order.get("side"),
+        "type": order.get("type"),
+        "timeInForce": order.get("timeInForce"),
+        "status": order.get("status"),
+        "updateTime": order.get("updateTime"),
+    }
+    for field in FLOAT_FIELDS:
+        if order.get(field) is not None:
+            state[field] = float(order[field])
+
+    return {key: value for key, value in state.items() if value is not None}
+
+
+class OrderStoreLocked(Exception):
+    """Raised when a writable store is opened while another process owns the log."""
+
+
+def _record(state: dict) -> str:
+    # clientOrderId first, so loading can skip superseded records without decoding them
+    return f"{state['clientOrderId']}\t{json.dumps(state, separators=(',', ':'))}\n"
+
+
+def _rank(status: str) -> int:
+    return _RANK.get(status, 3)
+
+
+def _try_lock(f) -> bool:
+    """Non-blocking exclusive lock on an open file, held until it is closed."""
+    try:
+        if os.name == "nt":
+            import msvcrt
+
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+
+    return True
+
+
+class OrderStore:
+    """
+    Every order this bot sends, in memory, backed by a write-ahead log.
+
+    Orders are keyed by clientOrderId and indexed by orderId, symbol and
+    status, so lookups and open-order views are dict reads. Each change
+    (the intent before a request is sent, REST responses, user-stream
+    events) is appended to the log as a full JSON record before it is
+    visible; on start the log is replayed and compacted. ``reconcile`` brings
+    the open orders up to date with one bulk ``openOrders`` call.
+
+    One process at a time owns the log (an exclusive lock on ``<path>.lock``);
+    opening it while another process holds the lock raises OrderStoreLocked.
+    A ``read_only`` store takes no lock: it replays the log but never
+    writes, truncates or compacts it, so its changes live in memory only.
+    ``read_only=None`` opens read-only only when the log is in use.
+    """
+
+    def __init__(self, path: str = None, retain_closed: int = RETAIN_CLOSED, durable: bool = False,
+                 base_url: str = None, read_only: bool = False):
+        self.logger = logging.getLogger(__name__)
+        # One log per exchange (``base_url``, None for the testnet) unless a path is given
+        self.path = path or base_url_path(DEFAULT_WAL_PATH, base_url)
+        self.retain_closed = retain_closed
+        # fsync every record (survives power loss, not just a crash, at ~1ms per write)
+        self.durable = durable
+
+        self._lock = threading.Lock()
+        self._orders = {}
+        self._by_id = {}
+        self._by_symbol = {}
+        self._by_status = {}
+        # client ids of final orders, oldest first
+        self._closed = OrderedDict()
+
+        self._prefix = f"b{secrets.token_hex(4)}"
+        self._seq = itertools.count(1)
+        self._records = 0
+        self._file = None
+
+        self.load_ms = None
+        self.reconciled = None
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock_file = None
+        self.read_only = bool(read_only)
+
+        if not self.read_only:
+            self._lock_file = open(f"{self.path}.lock", "a+b")
+            if not _try_lock(self._lock_file):
+                self._lock_file.close()
+                self._lock_file = None
+                if read_only is not None:
+                    raise OrderStoreLocked(f"{self.path} is in use by another process")
+
+                self.read_only = True
+                self.logger.warning(f"{self.path} is in use by another process; opened read-only")
+
+        self._load()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+
+    # -------------------------------
+    # RECOVERY
+    # -------------------------------
+    def _load(self):
+        started = time.perf_counter()
+        records, skipped = 0, 0
+        # Each record is an order's full state, so only the last one per order is decoded
+        latest = {}
+
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                data = f.read()
+
+            end = data.rfind(b"\n") + 1
+            if end < len(data):
+                # A record torn by a crash mid-write (or, read-only, still being written)
+                skipped += 1
+                if not self.read_only:
+                    # Cut it so appends start on a new line
+                    with open(self.path, "r+b") as f:
+                        f.truncate(end)
+
+            for line in data[:end].decode("utf-8").splitlines():
+                key, _, record = line.partition("\t")
+                records += 1
+                # Re-inserted so final orders keep the order they closed in
+                latest.pop(key, None)
+                latest[key] = record
+
+        decode = json.JSONDecoder().decode
+        for record in latest.values():
+            try:
+                self._index(decode(record))
+            except ValueError:
+                skipped += 1
+
+        self._records = records
+
+        if not self.read_only:
+            self._file = open(self.path, "a", encoding="utf-8")
+            if self._should_compact():
+                self._compact()
+
+        self.load_ms = (time.perf_counter() - started) * 1000
+        self.logger.info(
+            f"Order store: {len(self._orders)} orders ({len(self.open_orders())} open) "
+            f"from {records} log records in {self.load_ms:.1f}ms"
+            + (f", {skipped} torn records skipped" if skipped else "")
+        )
+
+    def _should_compact(self) -> bool:
+        return self._records > max(MIN_COMPACT_RECORDS, COMPACT_RATIO * len(self._orders))
+
+    def _compact(self):
+        temp_path = f"{self.path}.tmp"
+
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for state in self._orders.values():
+                f.write(_record(state))
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._file.close()
+        os.replace(temp_path, self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+        self.logger.info(f"Order store log compacted from {self._records} to {len(self._orders)} records")
+        self._records = len(self._orders)
+
+    def reconcile(self, client, resolve_closed: bool = True) -> dict:
+        """
+        Update the open-order view from one ``openOrders`` call (all symbols).
+
+        Orders open on the exchange are recorded (including ones this store
+        never saw). Orders open here but not there finished while the bot
+        was down; with ``resolve_closed`` each is looked up once for its
+        final state, by clientOrderId if it never got an id. An order the
+        exchange does not know was never placed and is marked REJECTED;
+        one that cannot be looked up stays UNKNOWN until the next reconcile.
+        """
+        exchange_open = client.get_open_orders()
+        open_ids = set()
+
+        for order in exchange_open:
+            open_ids.add(order.get("clientOrderId"))
+            self.record_order(order)
+
+        stale = [
+            state for state in self.by_status(*OPEN_STATUSES, UNKNOWN)
+            if state["clientOrderId"] not in open_ids
+        ]
+        resolved = unknown = 0
+
+        for state in stale:
+            client_order_id = state["clientOrderId"]
+            if not resolve_closed:
+                self._apply({"clientOrderId": client_order_id, "status": UNKNOWN}, force=True)
+                unknown += 1
+                continue
+
+            try:
+                if state.get("orderId") is not None:
+                    self.record_order(client.get_order(state["symbol"], state["orderId"]))
+                else:
+                    self.record_order(client.get_order(state["symbol"], client_order_id=client_order_id))
+                resolved += 1
+            except Exception as e:
+                if state.get("orderId") is None and getattr(e, "code", None) == ORDER_NOT_FOUND:
+                    self.record_rejected(client_order_id, "Never reached the exchange")
+                    resolved += 1
+                    continue
+
+                self.logger.warning(f"Could not resolve order {state.get('orderId') or client_order_id}: {e}")
+                if state.get("orderId") is None:
+                    self._apply({"clientOrderId": client_order_id, "status": UNKNOWN}, force=True)
+                    unknown += 1
+
+        self.reconciled = time.time()
+        summary = {"open": len(exchange_open), "resolved": resolved, "unknown": unknown}
+        self.logger.info(f"Order store reconciled: {summary}")
+        return summary
+
+    # -------------------------------
+    # RECORDING
+    # -------------------------------
+    def new_client_order_id(self) -> str:
+        return f"{self._prefix}-{next(self._seq)}"
+
+    def record_submit(self, params: dict):
+        """Log an order about to be sent (``params`` as sent, with newClientOrderId)."""
+        self._apply({
+            "clientOrderId": params["newClientOrderId"],
+            "symbol": params["symbol"],
+            "side": params["side"],
+            "type": params["type"],
+            "timeInForce": params.get("timeInForce"),
+            "price": float(params.get("price") or 0),
+            "origQty": float(params["quantity"]),
+            "executedQty": 0.0,
+            "status": PENDING,
+            "updateTime": int(time.time() * 1000),
+        })
+
+    def record_order(self, order: dict):
+        """Record a REST order response (create / query / cancel / openOrders)."""
+        self._apply(normalize_order(order))
+
+    def record_event(self, order: dict):
+        """Record the ``o`` payload of an ORDER_TRADE_UPDATE stream event."""
+        self._apply(normalize_order({
+            field: order[key] for key, field in STREAM_FIELDS.items() if key in order
+        }))
+
+    def record_rejected(self, client_order_id: str, error: str):
+        self._apply({"clientOrderId": client_order_id, "status": "REJECTED", "error": error}, force=True)
+
+    def _apply(self, update: dict, force: bool = False):
+        with self._lock:
+            key = update.get("clientOrderId") or self._by_id.get(update.get("orderId"))
+            if key is None:
+                return
+
+            old = self._orders.get(key)
+            state = self._merge(old, update, force)
+            if state is None:
+                return
+
+            if not self.read_only:
+                self._file.write(_record(state))
+                self._file.flush()
+                if self.durable:
+                    os.fsync(self._file.fileno())
+                self._records += 1
+
+            self._index(state, old)
+
+            if not self.read_only and self._should_compact():
+                self._compact()
+
+    @staticmethod
+    def _merge(old, update: dict, force: bool):
+        if old is None:
+            return update
+
+        state = {**old, **update}
+
+        if not force and _rank(update.get("status", old["status"])) < _rank(old["status"]):
+            # A late response behind a stream event: keep the newer status
+            state["status"] = old["status"]
+
+        state["executedQty"] = max(old.get("executedQty", 0.0), update.get("executedQty", 0.0))
+        if state["executedQty"] == old.get("executedQty") and "avgPrice" in old:
+            state["avgPrice"] = old["avgPrice"]
+
+        return None if state == old else state
+
+    def _index(self, state: dict, old: dict = None):
+        """Store ``state`` and move it between indexes; caller holds the lock (or is loading)."""
+        key = state["clientOrderId"]
+        old = old if old is not None else self._orders.get(key)
+
+        if old is not None:
+            self._by_status.get(old["status"], set()).discard(key)
+
+        self._orders[key] = state
+        self._by_status.setdefault(state["status"], set()).add(key)
+        if state.get("orderId") is not None:
+            self._by_id[state["orderId"]] = key
+        if state.get("symbol"):
+            self._by_symbol.setdefault(state["symbol"], set()).add(key)
+
+        if state["status"] in FINAL_STATUSES:
+            self._closed[key] = None
+            while len(self._closed) > self.retain_closed:
+                self._evict(self._closed.popitem(last=False)[0])
+
+    def _evict(self, key: str):
+        state = self._orders.pop(key, None)
+        if state is None:
+            return
+
+        self._by_status.get(state["status"], set()).discard(key)
+        self._by_symbol.get(state.get("symbol"), set()).discard(key)
+        if self._by_id.get(state.get("orderId")) == key:
+            del self._by_id[state["orderId"]]
+
+    # -------------------------------
+    # QUERIES
+    # -------------------------------
+    def get(self, order_id: int = None, client_order_id: str = None):
+        """One order's latest state (a copy), by orderId or clientOrderId."""
+        with self._lock:
+            key = client_order_id or self._by_id.get(order_id)
+            state = self._orders.get(key)
+            return dict(state) if state is not None else None
+
+    def open_orders(self, symbol: str = None) -> list:
+        return self.by_status(*OPEN_STATUSES, symbol=symbol)
+
+    def by_status(self, *statuses: str, symbol: str = None) -> list:
+        with self._lock:
+            keys = set().union(*(self._by_status.get(status, ()) for status in statuses))
+            if symbol:
+                keys &= self._by_symbol.get(symbol.upper(), set())
+            return [dict(self._orders[key]) for key in keys]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "orders": len(self._orders),
+                "byStatus": {status: len(keys) for status, keys in self._by_status.items() if keys},
+                "logRecords": self._records,
+                "readOnly": self.read_only,
+                "loadMs": self.load_ms,
+                "reconciled": self.reconciled,
+            }
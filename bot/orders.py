@@ -1,14 +1,97 @@
 # bot/orders.py
 
 import logging
+import threading
 import time
-from bot.client import BinanceFuturesClient
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from bot.client import get_client
+from bot.exchange_info import ExchangeInfoCache
+from bot.metrics import NULL_TRACE
+from bot.order_store import normalize_order
+from bot.records import position_records, positions_to_array
+from bot.trade_store import TradeStore
+from bot.user_stream import FINAL_STATUSES, StreamDisconnected, UserDataStream
+from bot.validators import validate_order_filters, validate_orders_batch, validate_price_near_market
+
+POLL_INTERVAL = 2
+MAX_BATCH_SIZE = 5
+DEFAULT_BATCH_WORKERS = 4
+# Threads waiting on batch order fills at once
+MAX_FILL_WAITERS = 32
+# Below this many orders the per-order filter check beats numpy's fixed cost
+VECTORIZE_MIN_ORDERS = 50
+# "Execution status unknown": the order may still have been placed
+UNKNOWN_STATUS_CODES = (-1006, -1007)
+
 
 class OrderManager:
-    def __init__(self):
+    def __init__(self, use_user_stream: bool = False, stream_url: str = None, client=None,
+                 order_books=None, position_engine=None, order_store=None, exchange_info=None):
         self.logger = logging.getLogger(__name__)
-        self.client = BinanceFuturesClient()
+        self.client = client or get_client()
+        self.metrics = self.client.metrics
+        # Optional OrderBookService: LIMIT price sanity checks and MARKET slippage estimates
+        self.order_books = order_books
+        # Optional PositionEngine: positions served from memory instead of positionRisk polls
+        self.position_engine = position_engine
+        # Optional OrderStore: every order sent, recorded in memory and a write-ahead log
+        self.order_store = order_store
+        # Symbol filters: orders are quantized and checked before sending (False leaves it to the exchange)
+        self.exchange_info = ExchangeInfoCache(self.client) if exchange_info is None else exchange_info
+        self.user_stream = None
+        self._trade_store = None
+        self._trade_store_lock = threading.Lock()
+
+        if use_user_stream:
+            self.enable_user_stream(stream_url)
+
+    # -------------------------------
+    # FILL TRACKING
+    # -------------------------------
+    def enable_user_stream(self, stream_url: str = None) -> bool:
+        """Track fills from the user-data stream instead of REST polling."""
+        if self.user_stream is None:
+            stream_url = stream_url or self.client.stream_url
+            kwargs = {"base_url": stream_url} if stream_url else {}
+            self.user_stream = UserDataStream(self.client, **kwargs)
+            self.user_stream.add_callback(self._on_stream_event)
+
+            if self.position_engine is not None:
+                self.position_engine.attach(self.user_stream)
+
+        connected = self.user_stream.start()
+        if not connected:
+            self.logger.warning("User data stream not connected yet, REST polling until it is")
+
+        store = self.order_store
+        if store is not None and store.reconciled is None:
+            # Stream events from here on; catch up on what changed while we were down
+            try:
+                store.reconcile(self.client)
+            except Exception as e:
+                self.logger.warning(f"Order store reconciliation failed: {e}")
+
+        return connected
+
+    def _on_stream_event(self, event: dict):
+        # Fills and account updates change balance, positions and trades
+        if event.get("e") in ("ACCOUNT_UPDATE", "ORDER_TRADE_UPDATE"):
+            self.client.invalidate_cache()
+
+        if self.order_store is not None and event.get("e") == "ORDER_TRADE_UPDATE":
+            self.order_store.record_event(event["o"])
+
+    def close(self):
+        if self.user_stream is not None:
+            self.user_stream.stop()
+            self.user_stream = None
+
+        if self._trade_store is not None:
+            self._trade_store.close()
+            self._trade_store = None
+
+        if self.order_store is not None:
+            self.order_store.close()
 
     # -------------------------------
     # BALANCE
@@ -29,21 +112,15 @@ class OrderManager:
     # -------------------------------
     # POSITIONS
     # -------------------------------
-    def get_open_positions(self):
-        positions = self.client.get_positions()
-        open_positions = []
-
-        for pos in positions:
-            if float(pos.get("positionAmt", 0)) != 0:
-                open_positions.append({
-                    "symbol": pos.get("symbol"),
-                    "positionAmt": float(pos.get("positionAmt", 0)),
-                    "entryPrice": float(pos.get("entryPrice", 0)),
-                    "unrealizedProfit": float(pos.get("unRealizedProfit", 0)),
-                    "leverage": pos.get("leverage", "N/A"),
-                })
-
-        return open_positions
+    def get_open_positions(self, as_array: bool = False):
+        """Open positions as PositionRecords, or one structured array with ``as_array``."""
+        engine = self.position_engine
+        if engine is not None and engine.reconciled is not None:
+            positions = positions_to_array(engine.positions())
+        else:
+            positions = positions_to_array(self.client.get_positions())
+
+        return positions if as_array else position_records(positions)
 
     # -------------------------------
     # ORDER PLACEMENT
@@ -56,86 +133,407 @@ class OrderManager:
         quantity: float,
         price: float = None,
         wait_for_fill: bool = True,
-        timeout: int = 20
+        timeout: int = 20,
+        client_order_id: str = None,
+        time_in_force: str = "GTC"
     ) -> dict:
 
-        params = {
-            "symbol": symbol,
-            "side": side,
-            "type": order_type,
-            "quantity": quantity,
-        }
+        trace = self.metrics.trace_order(symbol=symbol, side=side, type=order_type)
 
-        if order_type == "LIMIT":
-            params["price"] = price
-            params["timeInForce"] = "GTC"
+        try:
+            result = self._place_order(
+                trace, symbol, side, order_type, quantity, price, wait_for_fill, timeout,
+                client_order_id, time_in_force,
+            )
+        except Exception as e:
+            trace.finish("ERROR", error=str(e))
+            raise
+
+        trace.finish(result["status"], orderId=result["orderId"])
+        return result
+
+    def _place_order(self, trace, symbol, side, order_type, quantity, price, wait_for_fill, timeout,
+                     client_order_id=None, time_in_force="GTC") -> dict:
+        store = self.order_store
+        if store is not None and not client_order_id:
+            client_order_id = store.new_client_order_id()
+
+        with trace.span("validate") as span:
+            book = self.order_books.get(symbol) if self.order_books is not None else None
+            quantity, price = self._apply_filters(symbol, side, order_type, quantity, price, book)
 
-        response = self.client.create_order(params)
+            params = self._build_order_params(
+                symbol, side, order_type, quantity, price, client_order_id, time_in_force
+            )
+
+            if book is not None:
+                self._check_against_book(book, span, side, order_type, quantity, price)
+
+        if store is not None:
+            # Logged before sending, so a crash mid-request leaves a trace to reconcile
+            store.record_submit(params)
+
+        with trace.span("submit"):
+            try:
+                response = self.client.create_order(params)
+            except Exception as e:
+                if store is not None and getattr(e, "code", None) not in (None, *UNKNOWN_STATUS_CODES):
+                    # Refused by the exchange; other failures stay pending until reconciled
+                    store.record_rejected(client_order_id, str(e))
+                raise
 
         if not response:
             raise Exception("Empty response from Binance")
 
+        if store is not None:
+            store.record_order(response)
+
         order_id = response.get("orderId")
 
         if not order_id:
             raise Exception("Order ID missing in Binance response")
 
         status = response.get("status")
-        self.logger.info(f"Order placed: {order_id}, status: {status}")
+        trace.event("ack", orderId=order_id, status=status)
+        self.logger.info("Order placed: %s, status: %s", order_id, status)
 
-        # Poll for fill
-        if wait_for_fill:
-            start_time = time.time()
+        if wait_for_fill and status in FINAL_STATUSES:
+            result = self._order_result(order_id, response)
+        elif wait_for_fill:
+            result = self._wait_for_fill(symbol, order_id, timeout, trace)
+        else:
+            return self._order_result(order_id, response)
+
+        if result["status"] == "FILLED":
+            trace.event("fill", executedQty=result["executedQty"], avgPrice=result["avgPrice"])
+
+        return result
+
+    def _apply_filters(self, symbol, side, order_type, quantity, price, book=None) -> tuple:
+        """Quantize to the symbol's tick / step size and check notional, as the exchange would."""
+        filters = self.exchange_info.filters(symbol) if self.exchange_info else None
+        if filters is None:
+            return quantity, price
+
+        # MARKET notional is checked against the book mid when there is one
+        reference = book.mid() if book is not None and order_type == "MARKET" else None
+        return validate_order_filters(filters, side, order_type, quantity, price, reference)
+
+    def _wait_for_fill(self, symbol: str, order_id: int, timeout: int, trace=NULL_TRACE) -> dict:
+        deadline = time.time() + timeout
+
+        if self.user_stream is not None:
+            try:
+                with trace.span("stream_wait"):
+                    order_status = self.user_stream.wait_for_order(order_id, timeout)
+
+                if order_status is None:
+                    return self._timeout_result(order_id)
+
+                return self._order_result(order_id, order_status)
+
+            except StreamDisconnected:
+                self.logger.warning(
+                    f"User data stream unavailable, polling order {order_id} over REST"
+                )
 
-            while time.time() - start_time < timeout:
+        return self._poll_for_fill(symbol, order_id, deadline, trace)
+
+    def _poll_for_fill(self, symbol: str, order_id: int, deadline: float, trace=NULL_TRACE) -> dict:
+        while time.time() < deadline:
+            with trace.span("poll") as span:
                 order_status = self.client.get_order(symbol, order_id)
-                current_status = order_status.get("status")
-
-                if current_status == "FILLED":
-                    return {
-                        "orderId": order_id,
-                        "status": current_status,
-                        "executedQty": float(order_status.get("executedQty", 0)),
-                        "avgPrice": float(order_status.get("avgPrice", 0)),
-                    }
-
-                elif current_status in ["CANCELED", "REJECTED", "EXPIRED"]:
-                    return {
-                        "orderId": order_id,
-                        "status": current_status,
-                        "executedQty": float(order_status.get("executedQty", 0)),
-                        "avgPrice": float(order_status.get("avgPrice", 0)),
-                    }
-
-                time.sleep(2)
+                span.set(status=order_status.get("status"))
+
+            if self.order_store is not None:
+                self.order_store.record_order(order_status)
+
+            if order_status.get("status") in FINAL_STATUSES:
+                self.client.invalidate_cache()
+                return self._order_result(order_id, order_status)
+
+            time.sleep(min(POLL_INTERVAL, max(deadline - time.time(), 0)))
+
+        return self._timeout_result(order_id)
+
+    def cancel_order(self, symbol: str, order_id: int) -> dict:
+        response = self.client.cancel_order(symbol, order_id)
+        self.logger.info("Order cancelled: %s, status: %s", order_id, response.get("status"))
+
+        if self.order_store is not None:
+            self.order_store.record_order(response)
+
+        return self._order_result(order_id, response)
+
+    def get_order(self, symbol: str, order_id: int) -> dict:
+        """
+        An order's status, from the order store once final there, else over
+        REST; either way in the store's shape (see ``normalize_order``).
+        """
+        store = self.order_store
+        if store is not None:
+            state = store.get(order_id)
+            if state is not None and state["status"] in FINAL_STATUSES:
+                return state
+
+        order = self.client.get_order(symbol, order_id)
+        if store is not None:
+            store.record_order(order)
+        return normalize_order(order)
+
+    # -------------------------------
+    # BATCH ORDER PLACEMENT
+    # -------------------------------
+    def place_orders(
+        self,
+        orders: list,
+        wait_for_fill: bool = False,
+        timeout: int = 20,
+        max_workers: int = DEFAULT_BATCH_WORKERS,
+    ) -> list:
+        """
+        Place many orders through the multi-order batch endpoint.
+
+        ``orders`` is a list of dicts with the ``place_order`` keyword
+        arguments (symbol, side, order_type, quantity, price). Orders are
+        grouped MAX_BATCH_SIZE per request and the batches are sent
+        concurrently. One result is returned per order, in input order,
+        echoing the quantity and price sent (after the symbol filters);
+        failed orders get status "ERROR" with the exchange message.
+        Orders that break the symbol's filters fail before anything is sent.
+        """
+        if not orders:
+            return []
+
+        results = [None] * len(orders)
+        orders = self._apply_batch_filters(orders, results)
+
+        accepted = [i for i, result in enumerate(results) if result is None]
+        batches = [
+            accepted[start:start + MAX_BATCH_SIZE]
+            for start in range(0, len(accepted), MAX_BATCH_SIZE)
+        ]
+        store = self.order_store
+
+        def submit(indexes):
+            batch = [
+                self._build_batch_params(orders[i]) for i in indexes
+            ]
+
+            if store is not None:
+                for params in batch:
+                    store.record_submit(params)
+
+            try:
+                responses = self.client.create_batch_orders(batch)
+            except Exception as e:
+                responses = [{"code": getattr(e, "code", None), "msg": str(e)}] * len(indexes)
+
+            responses = list(responses) + [None] * (len(indexes) - len(responses))
+
+            for i, params, response in zip(indexes, batch, responses):
+                results[i] = self._batch_result(response)
+
+                if store is not None and response:
+                    if response.get("orderId"):
+                        store.record_order(response)
+                    elif response.get("code") not in (None, *UNKNOWN_STATUS_CODES):
+                        store.record_rejected(params["newClientOrderId"], response.get("msg"))
+
+        workers = max(1, min(max_workers, len(batches)))
+        if not batches:
+            self.logger.warning(f"Batch of {len(orders)} orders: none passed the symbol filters")
+            return self._echo_orders(orders, results)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(submit, batches))
+
+        if wait_for_fill:
+            pending = [
+                i for i, result in enumerate(results)
+                if result["status"] not in FINAL_STATUSES + ("ERROR",)
+            ]
+
+            def wait(i):
+                results[i] = self._wait_for_fill(
+                    orders[i]["symbol"], results[i]["orderId"], timeout
+                )
+
+            # Sized by the orders waited on, not the batch count: waits overlap instead of queueing
+            if pending:
+                with ThreadPoolExecutor(max_workers=min(len(pending), MAX_FILL_WAITERS)) as pool:
+                    list(pool.map(wait, pending))
+
+        self.logger.info(
+            f"Batch placed {len(orders)} orders in {len(batches)} requests, "
+            f"{sum(r['status'] == 'ERROR' for r in results)} failed"
+        )
+
+        return self._echo_orders(orders, results)
+
+    @staticmethod
+    def _echo_orders(orders: list, results: list) -> list:
+        # Quantized by the filters if they passed, as given otherwise
+        for order, result in zip(orders, results):
+            result["quantity"] = order["quantity"]
+            result["price"] = order.get("price")
+        return results
+
+    def _apply_batch_filters(self, orders: list, results: list) -> list:
+        """Quantize every order to its symbol's filters; rejected ones get their result now."""
+        table = self.exchange_info.table() if self.exchange_info else None
+        if table is None:
+            return orders
+
+        if len(orders) < VECTORIZE_MIN_ORDERS:
+            checked = []
+            for i, order in enumerate(orders):
+                try:
+                    filters = self.exchange_info.filters(order["symbol"])
+                    quantity, price = validate_order_filters(
+                        filters, order["side"], order["order_type"], order["quantity"], order.get("price")
+                    )
+                    checked.append(dict(order, quantity=quantity, price=price))
+                except ValueError as e:
+                    results[i] = self._batch_result({"code": None, "msg": str(e)})
+                    checked.append(order)
+            return checked
+
+        checked = validate_orders_batch(
+            table,
+            [order["symbol"].upper() for order in orders],
+            [order["side"] for order in orders],
+            [order["order_type"] for order in orders],
+            [order["quantity"] for order in orders],
+            [order.get("price") for order in orders],
+        )
+
+        quantized = []
+        for i, order in enumerate(orders):
+            if not checked["valid"][i]:
+                results[i] = self._batch_result({"code": None, "msg": checked["errors"][i]})
+                quantized.append(order)
+                continue
+
+            order = dict(order, quantity=float(checked["quantity"][i]))
+            if order["order_type"] == "LIMIT":
+                order["price"] = float(checked["price"][i])
+            quantized.append(order)
+
+        return quantized
+
+    def _build_batch_params(self, order: dict) -> dict:
+        params = self._build_order_params(
+            order["symbol"],
+            order["side"],
+            order["order_type"],
+            order["quantity"],
+            order.get("price"),
+            order.get("client_order_id")
+            or (self.order_store.new_client_order_id() if self.order_store is not None else None),
+            order.get("time_in_force", "GTC"),
+        )
+
+        # The batch endpoint takes every value as a string
+        return {key: str(value) for key, value in params.items()}
 
+    def _batch_result(self, response: dict) -> dict:
+        if not response or not response.get("orderId"):
             return {
-                "orderId": order_id,
-                "status": "TIMEOUT",
+                "orderId": None,
+                "status": "ERROR",
                 "executedQty": 0,
                 "avgPrice": 0,
+                "code": (response or {}).get("code"),
+                "error": (response or {}).get("msg", "Empty response from Binance"),
             }
 
+        return self._order_result(response["orderId"], response)
+
+    def _check_against_book(self, book, span, side, order_type, quantity, price):
+        mid = book.mid()
+        span.set(mid=mid)
+
+        if order_type == "LIMIT":
+            validate_price_near_market(price, mid)
+            return
+
+        estimate = book.estimate_fill(side, quantity)
+        if estimate is not None:
+            span.set(expectedPrice=estimate["avgPrice"], slippageBps=round(estimate["slippageBps"], 2))
+            self.logger.info(
+                "Expected fill %s %s %s @ %.8g (%.2f bps slippage)",
+                side, quantity, book.symbol, estimate["avgPrice"], estimate["slippageBps"],
+            )
+
+    @staticmethod
+    def _build_order_params(
+        symbol: str, side: str, order_type: str, quantity: float, price: float = None,
+        client_order_id: str = None, time_in_force: str = "GTC"
+    ) -> dict:
+        params = {
+            "symbol": symbol,
+            "side": side,
+            "type": order_type,
+            "quantity": quantity,
+        }
+
+        if order_type == "LIMIT":
+            params["price"] = price
+            # GTX = post-only: rejected instead of taking liquidity
+            params["timeInForce"] = time_in_force
+
+        if client_order_id:
+            params["newClientOrderId"] = client_order_id
+
+        return params
+
+    @staticmethod
+    def _order_result(order_id: int, order_status: dict) -> dict:
+        result = {
+            "orderId": order_id,
+            "status": order_status.get("status"),
+            "executedQty": float(order_status.get("executedQty", 0)),
+            "avgPrice": float(order_status.get("avgPrice", 0)),
+        }
+
+        if order_status.get("clientOrderId"):
+            result["clientOrderId"] = order_status["clientOrderId"]
+
+        return result
+
+    @staticmethod
+    def _timeout_result(order_id: int) -> dict:
         return {
             "orderId": order_id,
-            "status": status,
-            "executedQty": float(response.get("executedQty", 0)),
-            "avgPrice": float(response.get("avgPrice", 0)),
+            "status": "TIMEOUT",
+            "executedQty": 0,
+            "avgPrice": 0,
         }
 
-    def get_trade_history(self, symbol: str = None):
-        trades = self.client.get_trade_history(symbol)
+    # -------------------------------
+    # TRADE HISTORY
+    # -------------------------------
+    @property
+    def trade_store(self) -> TradeStore:
+        if self._trade_store is None:
+            with self._trade_store_lock:
+                if self._trade_store is None:
+                    self._trade_store = TradeStore(self.client)
+        return self._trade_store
+
+    def get_trade_history(self, symbol: str = None, start=None, end=None, sync: bool = True, as_array: bool = False):
+        """Complete trade history from the local ledger, synced incrementally first."""
+        if sync:
+            self.trade_store.sync([symbol.upper()] if symbol else None)
+
+        if as_array:
+            return self.trade_store.query_array(symbol, start, end)
 
-        formatted_trades = []
+        return self.trade_store.query(symbol, start, end)
 
-        for trade in trades:
-            formatted_trades.append({
-                "symbol": trade.get("symbol"),
-                "side": trade.get("side"),
-                "quantity": float(trade.get("qty", 0)),
-                "price": float(trade.get("price", 0)),
-                "realizedPnl": float(trade.get("realizedPnl", 0)),
-                "time": datetime.fromtimestamp(trade.get("time") / 1000),
-            })
+    def get_daily_pnl(self, symbol: str = None, start=None, end=None, sync: bool = True):
+        if sync:
+            self.trade_store.sync([symbol.upper()] if symbol else None)
 
-        return formatted_trades
\ No newline at end of file
+        return self.trade_store.realized_pnl_by_day(symbol, start, end)
@@ -0,0 +1,417 @@
+# bot/position_engine.py
+
+import asyncio
+import json
+import logging
+import threading
+import time
+
+import websockets
+
+from bot.client import market_stream_url
+from bot.market_data import MAX_RECONNECT_DELAY, RECONNECT_DELAY
+from bot.records import position_leverage
+
+RECONCILE_INTERVAL = 60.0
+# Mark prices of every symbol, one array per second
+MARK_PRICE_STREAM = "!markPrice@arr@1s"
+
+# Position fields, in order, kept per symbol
+AMOUNT, ENTRY, MARK, LEVERAGE = range(4)
+
+
+class PositionEngine:
+    """
+    Positions and PnL kept in memory from fills and mark prices.
+
+    Positions change on fills (``ORDER_TRADE_UPDATE`` / ``ACCOUNT_UPDATE``
+    from a UserDataStream passed to ``attach``, or ``apply_fill`` from a
+    local fill ledger) and are revalued on every mark price from the
+    ``!markPrice@arr@1s`` stream. Portfolio totals are maintained
+    incrementally, so ``portfolio()`` is a few float reads no matter how
+    many positions are open. ``reconcile()`` replaces the state with
+    positionRisk / balance over REST on start and every
+    ``reconcile_interval`` seconds, and logs any drift it finds.
+    """
+
+    def __init__(self, client=None, stream_url: str = None, reconcile_interval: float = RECONCILE_INTERVAL):
+        self.logger = logging.getLogger(__name__)
+        self._client = client
+        self.stream_url = (stream_url or market_stream_url()).rstrip("/")
+        self.reconcile_interval = reconcile_interval
+
+        self._lock = threading.Lock()
+        # symbol -> [amount, entry, mark, leverage]
+        self._positions = {}
+        # Leverage per symbol from the last reconciliation, for positions opened since
+        self._leverage = {}
+        self._unrealized = 0.0
+        self._exposure = 0.0
+        self._net_exposure = 0.0
+        self._margin = 0.0
+        # Stream updates applied so far, and the sequence number of each symbol's (and the wallet's) last one
+        self._seq = 0
+        self._changed = {}
+        self._wallet_changed = 0
+
+        self.wallet_balance = None
+        self.realized_pnl = 0.0
+        self.commission = 0.0
+        self.reconciled = None
+        self.last_drift = {}
+
+        self._connected = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._loop = None
+        self._task = None
+
+        self.mark_updates = 0
+        self.fills = 0
+        self.reconnects = 0
+
+    @property
+    def client(self):
+        if self._client is None:
+            from bot.client import get_client
+
+            self._client = get_client()
+        return self._client
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    def attach(self, user_stream):
+        """Track fills and position updates from a UserDataStream."""
+        user_stream.add_callback(self.handle_user_event)
+
+    # -------------------------------
+    # READS
+    # -------------------------------
+    def portfolio(self) -> dict:
+        """Portfolio PnL, exposure and margin usage from memory."""
+        with self._lock:
+            unrealized, margin = self._unrealized, self._margin
+            totals = {
+                "unrealizedPnl": unrealized,
+                "realizedPnl": self.realized_pnl,
+                "commission": self.commission,
+                "exposure": self._exposure,
+                "netExposure": self._net_exposure,
+                "initialMargin": margin,
+                "walletBalance": self.wallet_balance,
+                "positions": sum(1 for position in self._positions.values() if position[AMOUNT]),
+            }
+
+        equity = None if self.wallet_balance is None else self.wallet_balance + unrealized
+        totals["equity"] = equity
+        totals["marginUsage"] = margin / equity if equity else None
+        return totals
+
+    def unrealized_pnl(self) -> float:
+        return self._unrealized
+
+    def position(self, symbol: str):
+        with self._lock:
+            position = self._positions.get(symbol.upper())
+            return None if position is None or not position[AMOUNT] else self._describe(symbol.upper(), position)
+
+    def positions(self) -> list:
+        """Open positions in the positionRisk payload format (see records.positions_to_array)."""
+        with self._lock:
+            return [
+                self._describe(symbol, position)
+                for symbol, position in sorted(self._positions.items())
+                if position[AMOUNT]
+            ]
+
+    @staticmethod
+    def _describe(symbol: str, position: list) -> dict:
+        amount, entry, mark, leverage = position
+        return {
+            "symbol": symbol,
+            "positionAmt": amount,
+            "entryPrice": entry,
+            "markPrice": mark,
+            "unRealizedProfit": amount * (mark - entry),
+            "notional": amount * mark,
+            "leverage": leverage,
+        }
+
+    # -------------------------------
+    # UPDATES
+    # -------------------------------
+    def _contribution(self, position: list) -> tuple:
+        amount, entry, mark, leverage = position
+        notional = amount * mark
+        return amount * (mark - entry), abs(notional), notional, abs(notional) / leverage
+
+    def _update(self, symbol: str, amount=None, entry=None, mark=None, leverage=None):
+        # Swap the position's share of the totals for its new one; caller holds the lock
+        position = self._positions.get(symbol)
+
+        if position is None:
+            position = self._positions[symbol] = [0.0, 0.0, mark or entry or 0.0, self._leverage.get(symbol, 1)]
+        else:
+            old = self._contribution(position)
+            self._unrealized -= old[0]
+            self._exposure -= old[1]
+            self._net_exposure -= old[2]
+            self._margin -= old[3]
+
+        for field, value in ((AMOUNT, amount), (ENTRY, entry), (MARK, mark), (LEVERAGE, leverage)):
+            if value is not None:
+                position[field] = value
+
+        new = self._contribution(position)
+        self._unrealized += new[0]
+        self._exposure += new[1]
+        self._net_exposure += new[2]
+        self._margin += new[3]
+
+    def update_mark(self, symbol: str, mark: float):
+        with self._lock:
+            if symbol in self._positions:
+                self._update(symbol, mark=mark)
+
+    def apply_fill(self, symbol: str, side: str, quantity: float, price: float,
+                   commission: float = 0.0, realized: float = None):
+        """
+        Apply one fill (one-way position mode).
+
+        Adding to a position moves the entry to the average price; reducing
+        realizes PnL against the entry, and a fill that flips the position
+        opens the remainder at ``price``. ``realized`` (the exchange's own
+        figure) overrides the computed one when given.
+        """
+        symbol = symbol.upper()
+        signed = quantity if side.upper() == "BUY" else -quantity
+
+        with self._lock:
+            amount, entry = self._positions.get(symbol, (0.0, 0.0))[:2]
+            new_amount = amount + signed
+
+            if amount == 0 or (amount > 0) == (signed > 0):
+                # Opening or adding
+                new_entry = (amount * entry + signed * price) / new_amount
+                pnl = 0.0
+            else:
+                closed = min(abs(signed), abs(amount))
+                pnl = closed * (price - entry) * (1 if amount > 0 else -1)
+                if abs(new_amount) < 1e-12:
+                    new_amount, new_entry = 0.0, 0.0
+                elif (new_amount > 0) == (amount > 0):
+                    new_entry = entry
+                else:
+                    new_entry = price
+
+            self._update(symbol, amount=new_amount, entry=new_entry,
+                         mark=None if symbol in self._positions else price)
+            self._seq += 1
+            self._changed[symbol] = self._seq
+            self.realized_pnl += pnl if realized is None else realized
+            self.commission += commission
+            self.fills += 1
+
+    def handle_user_event(self, event: dict):
+        """UserDataStream callback: fills, and the exchange's own position / balance figures."""
+        event_type = event.get("e")
+
+        if event_type == "ORDER_TRADE_UPDATE":
+            order = event["o"]
+            if order.get("x") == "TRADE":
+                self.apply_fill(
+                    order["s"], order["S"], float(order["l"]), float(order["L"]),
+                    commission=float(order.get("n") or 0),
+                    realized=float(order["rp"]) if "rp" in order else None,
+                )
+
+        elif event_type == "ACCOUNT_UPDATE":
+            # Authoritative after the fill: overwrite amount and entry
+            account = event["a"]
+            with self._lock:
+                self._seq += 1
+                for position in account.get("P", ()):
+                    if position.get("ps", "BOTH") == "BOTH":
+                        self._update(position["s"], amount=float(position["pa"]), entry=float(position["ep"]))
+                        self._changed[position["s"]] = self._seq
+
+                for balance in account.get("B", ()):
+                    if balance["a"] == "USDT":
+                        self.wallet_balance = float(balance["wb"])
+                        self._wallet_changed = self._seq
+
+    def handle_message(self, message):
+        """Mark price stream message (single, array or combined-stream wrapped)."""
+        try:
+            payload = json.loads(message)
+        except (TypeError, ValueError):
+            self.logger.warning(f"Ignoring malformed mark price message: {message!r}")
+            return
+
+        if isinstance(payload, dict):
+            payload = payload.get("data", payload)
+        events = payload if isinstance(payload, list) else [payload]
+
+        with self._lock:
+            for event in events:
+                symbol = event.get("s")
+                if event.get("e") == "markPriceUpdate" and symbol in self._positions:
+                    self._update(symbol, mark=float(event["p"]))
+
+        self.mark_updates += 1
+
+    # -------------------------------
+    # RECONCILIATION
+    # -------------------------------
+    def reconcile(self) -> dict:
+        """
+        Replace the local state with positionRisk and balance from REST.
+
+        Returns the drift found per symbol ({symbol: (local amount, exchange amount)}).
+        Symbols (and the wallet) updated from the stream while the REST calls
+        were in flight keep the newer stream state.
+        """
+        client = self.client
+        with self._lock:
+            started = self._seq
+
+        client.invalidate_cache("positions", "balance")
+        positions = client.get_positions()
+        balances = client.get_balance()
+
+        drift = {}
+        with self._lock:
+            changed = {symbol for symbol, seq in self._changed.items() if seq > started}
+            local = {
+                symbol: position[AMOUNT] for symbol, position in self._positions.items() if symbol not in changed
+            }
+            exchange = {}
+
+            for position in positions:
+                amount = float(position.get("positionAmt", 0))
+                symbol = position["symbol"]
+                if symbol in changed:
+                    continue
+                exchange[symbol] = amount
+
+                leverage = position_leverage(position)
+                if leverage:
+                    self._leverage[symbol] = leverage
+
+                if not amount and symbol not in self._positions:
+                    continue
+
+                mark = float(position.get("markPrice") or 0) or None
+                self._update(symbol, amount=amount, entry=float(position.get("entryPrice", 0)),
+                             mark=mark, leverage=leverage)
+
+            for symbol in list(self._positions):
+                if symbol not in exchange and symbol not in changed:
+                    self._update(symbol, amount=0.0, entry=0.0)
+
+            for symbol in set(local) | {s for s, amount in exchange.items() if amount}:
+                if abs(local.get(symbol, 0.0) - exchange.get(symbol, 0.0)) > 1e-9:
+                    drift[symbol] = (local.get(symbol, 0.0), exchange.get(symbol, 0.0))
+
+            for balance in balances:
+                if balance["asset"] == "USDT" and self._wallet_changed <= started:
+                    self.wallet_balance = float(balance["balance"])
+
+            # Re-sum from scratch so float error from incremental updates cannot build up
+            self._resum()
+
+        if drift and self.reconciled is not None:
+            self.logger.warning(f"Position drift corrected by reconciliation: {drift}")
+
+        self.reconciled = time.time()
+        self.last_drift = drift
+        return drift
+
+    def _resum(self):
+        totals = [0.0, 0.0, 0.0, 0.0]
+        for position in self._positions.values():
+            for i, value in enumerate(self._contribution(position)):
+                totals[i] += value
+        self._unrealized, self._exposure, self._net_exposure, self._margin = totals
+
+    # -------------------------------
+    # LIFECYCLE
+    # -------------------------------
+    def start(self, wait: float = 10.0) -> bool:
+        if self._thread and self._thread.is_alive():
+            return self.connected
+
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run_loop, name="position-engine", daemon=True)
+        self._thread.start()
+
+        return self._connected.wait(wait)
+
+    def stop(self):
+        self._stopping = True
+
+        loop, task = self._loop, self._task
+        if loop is not None and task is not None:
+            loop.call_soon_threadsafe(task.cancel)
+
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+
+        self._connected.clear()
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+
+        self._task = self._loop.create_task(self._run())
+
+        try:
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            # Cancelled from stop()
+            pass
+        finally:
+            self._loop.close()
+            self._loop = None
+            self._task = None
+
+    async def _run(self):
+        delay = RECONNECT_DELAY
+        reconciling = asyncio.ensure_future(self._reconcile_periodically())
+
+        try:
+            while not self._stopping:
+                try:
+                    async with websockets.connect(f"{self.stream_url}/ws/{MARK_PRICE_STREAM}") as ws:
+                        self.logger.info("Mark price stream connected")
+                        self._connected.set()
+                        delay = RECONNECT_DELAY
+
+                        async for message in ws:
+                            self.handle_message(message)
+
+                except Exception as e:
+                    self.logger.warning(f"Mark price stream error: {e}")
+
+                self._connected.clear()
+
+                if self._stopping:
+                    break
+
+                self.reconnects += 1
+                self.logger.info(f"Reconnecting mark price stream in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+        finally:
+            reconciling.cancel()
+
+    async def _reconcile_periodically(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.reconcile)
+            except Exception as e:
+                self.logger.warning(f"Position reconciliation failed: {e}")
+
+            await asyncio.sleep(self.reconcile_interval)
@@ -0,0 +1,208 @@
+# bot/records.py
+
+import math
+from datetime import datetime
+from itertools import repeat
+from operator import itemgetter
+
+import numpy as np
+
+TRADE_DTYPE = np.dtype([
+    ("symbol", "U20"),
+    ("side", "U4"),
+    ("quantity", "f8"),
+    ("price", "f8"),
+    ("realizedPnl", "f8"),
+    ("time", "datetime64[ms]"),
+])
+
+POSITION_DTYPE = np.dtype([
+    ("symbol", "U20"),
+    ("positionAmt", "f8"),
+    ("entryPrice", "f8"),
+    ("unrealizedProfit", "f8"),
+    # NaN where the exchange reports neither leverage nor initial margin
+    ("leverage", "f8"),
+])
+
+
+class _Record(tuple):
+    """
+    Compact tuple-backed record that still reads like the old per-row dicts.
+
+    ``record["symbol"]`` and ``record.symbol`` both work, so callers that
+    index rows by key keep working, while a row costs a small fixed-size
+    tuple (``__slots__ = ()``, no per-instance dict) instead of a dict.
+    """
+
+    __slots__ = ()
+    _fields = ()
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        return tuple.__getitem__(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in self._fields else default
+
+    def __contains__(self, key):
+        # Key membership, as on the dicts these replace
+        return key in self._fields
+
+    def keys(self):
+        return self._fields
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self._fields}
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()})"
+
+    @classmethod
+    def from_columns(cls, *columns) -> list:
+        # tuple.__new__ straight from zipped columns: no per-row Python call
+        return list(map(tuple.__new__, repeat(cls), zip(*columns)))
+
+
+class TradeRecord(_Record):
+    __slots__ = ()
+    _fields = ("symbol", "side", "quantity", "price", "realizedPnl", "time")
+
+    def __new__(cls, symbol, side, quantity, price, realizedPnl, timestamp: int):
+        return tuple.__new__(cls, (symbol, side, quantity, price, realizedPnl, timestamp))
+
+    symbol = property(itemgetter(0))
+    side = property(itemgetter(1))
+    quantity = property(itemgetter(2))
+    price = property(itemgetter(3))
+    realizedPnl = property(itemgetter(4))
+    timestamp = property(itemgetter(5))
+
+    @property
+    def time(self) -> datetime:
+        # Built on access: datetime.fromtimestamp dominated per-row formatting
+        return datetime.fromtimestamp(self.timestamp / 1000)
+
+
+class PositionRecord(_Record):
+    __slots__ = ()
+    _fields = ("symbol", "positionAmt", "entryPrice", "unrealizedProfit", "leverage")
+
+    def __new__(cls, symbol, positionAmt, entryPrice, unrealizedProfit, leverage):
+        return tuple.__new__(cls, (symbol, positionAmt, entryPrice, unrealizedProfit, leverage))
+
+    symbol = property(itemgetter(0))
+    positionAmt = property(itemgetter(1))
+    entryPrice = property(itemgetter(2))
+    unrealizedProfit = property(itemgetter(3))
+    leverage = property(itemgetter(4))
+
+
+# -------------------------------
+# BULK DECODING
+# -------------------------------
+def _column(rows: list, key: str, dtype, default="0") -> np.ndarray:
+    # NumPy parses the exchange's numeric strings in C, one call per column
+    return np.array([row.get(key, default) for row in rows], dtype=dtype)
+
+
+def position_leverage(position: dict):
+    """A positionRisk row's leverage; v3 dropped the field, so it is derived from the initial margin."""
+    if position.get("leverage"):
+        return float(position["leverage"])
+
+    margin, notional = float(position.get("initialMargin") or 0), float(position.get("notional") or 0)
+    return abs(notional) / margin if margin else None
+
+
+def _leverage_label(leverage: float):
+    # Shown as the exchange reports it ("20"), or "N/A" when unknown
+    if math.isnan(leverage):
+        return "N/A"
+    leverage = round(leverage, 2)
+    return int(leverage) if leverage.is_integer() else leverage
+
+
+def trades_to_array(trades: list) -> np.ndarray:
+    """Decode a raw futures userTrades response into a TRADE_DTYPE array."""
+    out = np.empty(len(trades), dtype=TRADE_DTYPE)
+
+    if not trades:
+        return out
+
+    out["symbol"] = [trade.get("symbol") for trade in trades]
+    out["side"] = [trade.get("side") for trade in trades]
+    out["quantity"] = _column(trades, "qty", "f8")
+    out["price"] = _column(trades, "price", "f8")
+    out["realizedPnl"] = _column(trades, "realizedPnl", "f8")
+    out["time"] = _column(trades, "time", "i8").astype("datetime64[ms]")
+
+    return out
+
+
+def positions_to_array(positions: list, open_only: bool = True) -> np.ndarray:
+    """
+    Decode a raw positionRisk response into a POSITION_DTYPE array.
+
+    Only positionAmt is parsed for every row; the remaining columns are
+    decoded just for the open (non-zero) positions.
+    """
+    amounts = _column(positions, "positionAmt", "f8")
+
+    if open_only:
+        index = np.flatnonzero(amounts)
+        positions = [positions[i] for i in index]
+        amounts = amounts[index]
+
+    out = np.empty(len(positions), dtype=POSITION_DTYPE)
+
+    if not positions:
+        return out
+
+    out["symbol"] = [pos.get("symbol") for pos in positions]
+    out["positionAmt"] = amounts
+    out["entryPrice"] = _column(positions, "entryPrice", "f8")
+    out["unrealizedProfit"] = _column(positions, "unRealizedProfit", "f8")
+    out["leverage"] = [
+        leverage if leverage is not None else np.nan
+        for leverage in map(position_leverage, positions)
+    ]
+
+    return out
+
+
+def trades_to_records(trades: list) -> list:
+    """Decode a raw userTrades response straight into TradeRecords, column by column."""
+    return TradeRecord.from_columns(
+        [trade["symbol"] for trade in trades],
+        [trade["side"] for trade in trades],
+        [float(trade["qty"]) for trade in trades],
+        [float(trade["price"]) for trade in trades],
+        [float(trade["realizedPnl"]) for trade in trades],
+        [trade["time"] for trade in trades],
+    )
+
+
+def trade_records(array: np.ndarray) -> list:
+    return TradeRecord.from_columns(
+        array["symbol"].tolist(),
+        array["side"].tolist(),
+        array["quantity"].tolist(),
+        array["price"].tolist(),
+        array["realizedPnl"].tolist(),
+        array["time"].astype("int64").tolist(),
+    )
+
+
+def position_records(array: np.ndarray) -> list:
+    return PositionRecord.from_columns(
+        array["symbol"].tolist(),
+        array["positionAmt"].tolist(),
+        array["entryPrice"].tolist(),
+        array["unrealizedProfit"].tolist(),
+        [_leverage_label(leverage) for leverage in array["leverage"].tolist()],
+    )
@@ -0,0 +1,215 @@
+# bot/scheduler.py
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+# Priority lanes, lowest value is served first
+ORDER = 0
+ACCOUNT = 1
+BULK = 2
+LANE_NAMES = {ORDER: "order", ACCOUNT: "account", BULK: "bulk"}
+
+# USD-M futures limits per minute (per IP / per account)
+WEIGHT_LIMIT = 2400
+ORDER_LIMIT = 1200
+HEADROOM = 0.9
+# Share of the weight budget only the order lane may spend
+ORDER_RESERVE = 0.1
+
+MAX_RETRIES = 3
+BASE_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+
+
+class RequestScheduler:
+    """
+    Central admission control for exchange requests.
+
+    Every request waits for its turn in a priority queue (order create /
+    cancel ahead of account reads ahead of bulk history) and for enough
+    request weight in a token bucket. The bucket refills continuously and
+    is corrected from the X-MBX-USED-WEIGHT-1M / X-MBX-ORDER-COUNT-1M
+    response headers; 429/418 responses pause every lane for Retry-After.
+    Non-order lanes cannot spend the last ORDER_RESERVE of the budget, so
+    reads can never starve order placement.
+    """
+
+    def __init__(
+        self,
+        weight_limit: int = WEIGHT_LIMIT,
+        order_limit: int = ORDER_LIMIT,
+        headroom: float = HEADROOM,
+    ):
+        self.logger = logging.getLogger(__name__)
+
+        self.weight_limit = weight_limit
+        self.order_limit = order_limit
+        self.capacity = weight_limit * headroom
+        self.order_capacity = order_limit * headroom
+        self.reserve = self.capacity * ORDER_RESERVE
+
+        self._tokens = self.capacity
+        self._order_tokens = self.order_capacity
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+
+        self._cond = threading.Condition()
+        self._queue = []
+        self._seq = itertools.count()
+
+        self.used_weight = 0
+        self.order_count = 0
+        self.rate_limited = 0
+        self._lane_stats = {
+            lane: {"queued": 0, "admitted": 0, "throttled": 0, "wait_total_s": 0.0, "wait_max_s": 0.0}
+            for lane in LANE_NAMES
+        }
+
+    # -------------------------------
+    # ADMISSION
+    # -------------------------------
+    def _refill(self, now: float):
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.capacity / 60)
+        self._order_tokens = min(
+            self.order_capacity, self._order_tokens + elapsed * self.order_capacity / 60
+        )
+
+    def acquire(self, weight: int = 1, lane: int = ACCOUNT, orders: int = 0) -> float:
+        """Block until the request may be sent; return the seconds waited."""
+        weight = min(weight, self.capacity - self.reserve)
+        ticket = (lane, next(self._seq))
+        stats = self._lane_stats[lane]
+        started = time.monotonic()
+
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            stats["queued"] += 1
+
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                timeout = None
+
+                if self._queue[0] == ticket:
+                    floor = 0.0 if lane == ORDER else self.reserve
+
+                    if now < self._paused_until:
+                        timeout = self._paused_until - now
+                    elif self._tokens - weight < floor:
+                        timeout = (weight + floor - self._tokens) * 60 / self.capacity
+                    elif self._order_tokens < orders:
+                        timeout = (orders - self._order_tokens) * 60 / self.order_capacity
+                    else:
+                        self._tokens -= weight
+                        self._order_tokens -= orders
+                        heapq.heappop(self._queue)
+                        stats["queued"] -= 1
+                        self._cond.notify_all()
+                        break
+
+                self._cond.wait(timeout)
+
+            waited = time.monotonic() - started
+            stats["admitted"] += 1
+            stats["wait_total_s"] += waited
+            stats["wait_max_s"] = max(stats["wait_max_s"], waited)
+            if waited > 0.001:
+                stats["throttled"] += 1
+
+        return waited
+
+    def call(self, fn, weight: int = 1, lane: int = ACCOUNT, orders: int = 0, retries: int = MAX_RETRIES):
+        """Run ``fn()`` once admitted, retrying 429/418 responses after backing off."""
+        for attempt in range(retries + 1):
+            self.acquire(weight, lane, orders)
+
+            try:
+                return fn()
+
+            except Exception as e:
+                status = getattr(e, "status_code", None)
+                if status not in (418, 429) or attempt == retries:
+                    raise
+
+                response = getattr(e, "response", None)
+                headers = getattr(response, "headers", None) or {}
+                retry_after = headers.get("Retry-After")
+                delay = float(retry_after) if retry_after else min(BASE_BACKOFF * 2 ** attempt, MAX_BACKOFF)
+
+                self.logger.warning(
+                    f"Rate limited ({status}) on {LANE_NAMES[lane]} lane, pausing {delay:.1f}s"
+                )
+                self.pause(delay)
+
+    # -------------------------------
+    # FEEDBACK
+    # -------------------------------
+    def observe_headers(self, headers):
+        """Correct the buckets from the exchange's view of used weight / orders."""
+        used = headers.get("X-MBX-USED-WEIGHT-1M") or headers.get("x-mbx-used-weight-1m")
+        orders = headers.get("X-MBX-ORDER-COUNT-1M") or headers.get("x-mbx-order-count-1m")
+
+        with self._cond:
+            if used is not None:
+                self.used_weight = int(used)
+                remaining = self.capacity - self.used_weight * self.capacity / self.weight_limit
+                self._tokens = min(self._tokens, max(remaining, 0.0))
+
+            if orders is not None:
+                self.order_count = int(orders)
+                remaining = self.order_capacity - self.order_count * self.order_capacity / self.order_limit
+                self._order_tokens = min(self._order_tokens, max(remaining, 0.0))
+
+    def pause(self, seconds: float):
+        with self._cond:
+            self.rate_limited += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            self._refill(time.monotonic())
+            lanes = {}
+            for lane, stats in self._lane_stats.items():
+                admitted = stats["admitted"]
+                lanes[LANE_NAMES[lane]] = dict(
+                    stats, wait_avg_s=stats["wait_total_s"] / admitted if admitted else 0.0
+                )
+
+            return {
+                "queueDepth": len(self._queue),
+                "tokens": self._tokens,
+                "orderTokens": self._order_tokens,
+                "usedWeight1m": self.used_weight,
+                "orderCount1m": self.order_count,
+                "rateLimited": self.rate_limited,
+                "pausedFor": max(self._paused_until - time.monotonic(), 0.0),
+                "lanes": lanes,
+            }
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(base_url: str = None) -> RequestScheduler:
+    """
+    Process-wide scheduler for one venue, shared by every client of it.
+
+    Venues have separate rate-limit budgets, so each base URL gets its own
+    (None is the testnet the bot's client trades on by default).
+    """
+    key = base_url.rstrip("/") if base_url else None
+    scheduler = _schedulers.get(key)
+
+    if scheduler is None:
+        with _schedulers_lock:
+            scheduler = _schedulers.setdefault(key, RequestScheduler())
+
+    return scheduler
@@ -0,0 +1,378 @@
+# bot/strategy.py
+
+import asyncio
+import functools
+import logging
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bot.market_data import DEFAULT_CAPACITY, MarketDataService
+from bot.metrics import Histogram
+from bot.user_stream import FINAL_STATUSES
+
+DEFAULT_ORDER_WORKERS = 8
+
+
+class Strategy:
+    """
+    Base class for strategies run by a StrategyRunner.
+
+    Set ``subscriptions`` to the (symbol, interval) pairs to receive
+    closed bars for and override the callbacks needed. Callbacks run on
+    the runner's event loop, so they must not block: place orders with
+    ``ctx.submit`` (it returns at once) and leave I/O to coroutines,
+    which a callback may return to have them scheduled on the loop.
+    """
+
+    name = None
+    subscriptions = ()
+
+    def __init__(self, name: str = None, subscriptions=None):
+        if name is not None:
+            self.name = name
+        if subscriptions is not None:
+            self.subscriptions = subscriptions
+
+        self.name = self.name or type(self).__name__
+        self.subscriptions = [(symbol.upper(), interval) for symbol, interval in self.subscriptions]
+
+    def on_start(self, ctx):
+        pass
+
+    def on_bar(self, ctx, symbol: str, interval: str, bar: tuple):
+        """A closed bar, as a BAR_DTYPE-ordered tuple."""
+
+    def on_order(self, ctx, result: dict):
+        """The exchange ack (or "ERROR" result) for an order from ``ctx.submit``."""
+
+    def on_fill(self, ctx, fill: dict):
+        """A (partial) fill of one of this strategy's orders, from the user-data stream."""
+
+    def on_stop(self, ctx):
+        pass
+
+
+class StrategyContext:
+    """What a strategy sees of the runner: market data, orders and its own stats."""
+
+    def __init__(self, runner: "StrategyRunner", strategy: Strategy, prefix: str):
+        self.runner = runner
+        self.strategy = strategy
+        self.prefix = prefix
+
+        self.bars = 0
+        self.orders = 0
+        self.fills = 0
+        self.errors = 0
+        self.calls = 0
+        self.cpu_time = 0.0
+        self.decision_latency = Histogram()
+
+        self._order_seq = 0
+
+    def latest(self, symbol: str, interval: str, n: int = None):
+        """The last ``n`` closed bars from the shared feed (read-only view)."""
+        return self.runner.market_data.latest(symbol, interval, n)
+
+    def position(self, symbol: str):
+        """The in-memory position for ``symbol`` when the manager has a PositionEngine."""
+        engine = self.runner.manager.position_engine
+        return engine.position(symbol) if engine is not None else None
+
+    def submit(self, symbol: str, side: str, order_type: str, quantity: float, price: float = None) -> str:
+        """
+        Queue an order through OrderManager.place_order and return its client order id.
+
+        The result arrives later through ``on_order`` and fills through ``on_fill``.
+        """
+        self._order_seq += 1
+        self.orders += 1
+        client_order_id = f"{self.prefix}-{self._order_seq}"
+
+        return self.runner._submit(self, client_order_id, symbol, side, order_type, quantity, price)
+
+    def stats(self) -> dict:
+        latency = self.decision_latency
+        return {
+            "bars": self.bars,
+            "orders": self.orders,
+            "fills": self.fills,
+            "errors": self.errors,
+            "cpuMs": round(self.cpu_time * 1000, 3),
+            "cpuUsPerCall": round(self.cpu_time / self.calls * 1e6, 2) if self.calls else 0.0,
+            "decisionToAckMs": {
+                "count": latency.count,
+                "avg": round(latency.sum / latency.count * 1000, 3) if latency.count else 0.0,
+                "p50": latency.quantile(0.5) * 1000,
+                "p99": latency.quantile(0.99) * 1000,
+            },
+        }
+
+
+class StrategyRunner:
+    """
+    Many strategies in one process, on one shared asyncio event loop.
+
+    The union of every strategy's subscriptions is served by a single
+    MarketDataService (one combined websocket) running on the runner's
+    loop, and each closed bar is dispatched to the strategies subscribed
+    to it. Orders go through the manager's ``place_order`` (validation,
+    order book checks, rate limiting, tracing) on a small thread pool so
+    a slow request never stalls the loop; each is tagged with a client
+    order id so user-stream fills are routed back to the strategy that
+    placed it. Every callback's CPU time and each order's decision-to-ack
+    latency are recorded per strategy, see ``stats()``. A strategy that
+    raises is logged and counted, never stops the others.
+    """
+
+    def __init__(self, strategies: list, manager=None, market_data=None,
+                 capacity: int = DEFAULT_CAPACITY, source: str = "kline", use_store: bool = False,
+                 order_workers: int = DEFAULT_ORDER_WORKERS):
+        self.logger = logging.getLogger(__name__)
+
+        names = [strategy.name for strategy in strategies]
+        if len(set(names)) != len(names):
+            raise ValueError("Strategy names must be unique")
+
+        if manager is None:
+            from bot.orders import OrderManager
+
+            manager = OrderManager(use_user_stream=True)
+
+        self.manager = manager
+        self.metrics = manager.metrics
+
+        # Short per-run prefix keeps client order ids unique across restarts and under 36 chars
+        run_id = secrets.token_hex(3)
+        self._contexts = [
+            StrategyContext(self, strategy, f"{run_id}s{i}") for i, strategy in enumerate(strategies)
+        ]
+        self._by_prefix = {ctx.prefix: ctx for ctx in self._contexts}
+
+        subscriptions = {}
+        for ctx in self._contexts:
+            for key in ctx.strategy.subscriptions:
+                subscriptions.setdefault(key, []).append(ctx)
+        self._subscribers = subscriptions
+
+        # A feed passed in is started and stopped by the caller; one built here runs on the runner's loop
+        self._owns_feed = market_data is None and bool(subscriptions)
+        if self._owns_feed:
+            market_data = MarketDataService(
+                list(subscriptions), capacity=capacity, source=source, use_store=use_store
+            )
+        self.market_data = market_data
+        if market_data is not None:
+            market_data.add_callback(self._on_bar)
+
+        if manager.user_stream is not None:
+            manager.user_stream.add_callback(self._on_stream_event)
+
+        self._executor = ThreadPoolExecutor(max_workers=order_workers, thread_name_prefix="strategy-orders")
+        self._loop = None
+        self._loop_thread_id = None
+        self._stop_event = None
+        self._started = threading.Event()
+        self._thread = None
+
+    @property
+    def contexts(self) -> list:
+        return list(self._contexts)
+
+    # -------------------------------
+    # LIFECYCLE
+    # -------------------------------
+    def start(self, wait: float = 10.0) -> bool:
+        """Run on a background thread; True once the market data feed is connected."""
+        if self._thread and self._thread.is_alive():
+            return self._feed_connected()
+
+        self._started.clear()
+        self._thread = threading.Thread(target=self._run_loop, name="strategy-runner", daemon=True)
+        self._thread.start()
+
+        deadline = time.monotonic() + wait
+        if not self._started.wait(wait):
+            return False
+
+        while not self._feed_connected() and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        return self._feed_connected()
+
+    def stop(self):
+        loop, stop_event = self._loop, self._stop_event
+        if loop is not None and stop_event is not None:
+            loop.call_soon_threadsafe(stop_event.set)
+
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+
+        self._executor.shutdown(wait=False)
+
+    def _feed_connected(self) -> bool:
+        return self.market_data is None or self.market_data.connected
+
+    def _run_loop(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+        try:
+            loop.run_until_complete(self.run())
+        finally:
+            loop.close()
+
+    async def run(self):
+        """Run every strategy until ``stop()``; usable directly on an existing loop."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stop_event = asyncio.Event()
+
+        for ctx in self._contexts:
+            self._invoke(ctx, "on_start")
+
+        feed = asyncio.ensure_future(self.market_data.run()) if self._owns_feed else None
+        self._started.set()
+        self.logger.info(
+            f"Strategy runner started: {len(self._contexts)} strategies, "
+            f"{len(self._subscribers)} bar subscriptions"
+        )
+
+        try:
+            await self._stop_event.wait()
+        finally:
+            if feed is not None:
+                # Cancels the feed task and flushes the bars when they are stored
+                await asyncio.to_thread(self.market_data.stop)
+                await asyncio.gather(feed, return_exceptions=True)
+
+            for ctx in self._contexts:
+                self._invoke(ctx, "on_stop")
+
+            self._loop = None
+            self._stop_event = None
+            self.logger.info("Strategy runner stopped")
+
+    # -------------------------------
+    # DISPATCH
+    # -------------------------------
+    def _invoke(self, ctx: StrategyContext, method: str, *args):
+        started = time.thread_time()
+
+        try:
+            result = getattr(ctx.strategy, method)(ctx, *args)
+            if asyncio.iscoroutine(result):
+                self._loop.create_task(self._guard(ctx, method, result))
+        except Exception:
+            ctx.errors += 1
+            self.logger.exception(f"Strategy {ctx.strategy.name} failed in {method}")
+        finally:
+            ctx.cpu_time += time.thread_time() - started
+            ctx.calls += 1
+
+    async def _guard(self, ctx: StrategyContext, method: str, coroutine):
+        try:
+            await coroutine
+        except Exception:
+            ctx.errors += 1
+            self.logger.exception(f"Strategy {ctx.strategy.name} failed in {method}")
+
+    def _on_bar(self, symbol: str, interval: str, bar: tuple):
+        subscribers = self._subscribers.get((symbol, interval))
+        if not subscribers:
+            return
+
+        if threading.get_ident() != self._loop_thread_id:
+            # A feed started on its own thread: hand the bar over to the strategy loop
+            loop = self._loop
+            if loop is not None:
+                loop.call_soon_threadsafe(self._on_bar, symbol, interval, bar)
+            return
+
+        for ctx in subscribers:
+            ctx.bars += 1
+            self._invoke(ctx, "on_bar", symbol, interval, bar)
+
+    def _on_stream_event(self, event: dict):
+        # Called on the user-stream thread
+        if event.get("e") != "ORDER_TRADE_UPDATE":
+            return
+
+        order = event["o"]
+        if order.get("x") != "TRADE":
+            return
+
+        ctx = self._by_prefix.get(order.get("c", "").rsplit("-", 1)[0])
+        loop = self._loop
+        if ctx is None or loop is None:
+            return
+
+        fill = {
+            "clientOrderId": order["c"],
+            "orderId": order.get("i"),
+            "symbol": order.get("s"),
+            "side": order.get("S"),
+            "status": order.get("X"),
+            "quantity": float(order.get("l", 0)),
+            "price": float(order.get("L", 0)),
+            "filledQty": float(order.get("z", 0)),
+            "commission": float(order.get("n", 0)),
+            "realizedPnl": float(order.get("rp", 0)),
+            "final": order.get("X") in FINAL_STATUSES,
+        }
+        loop.call_soon_threadsafe(self._on_fill, ctx, fill)
+
+    def _on_fill(self, ctx: StrategyContext, fill: dict):
+        ctx.fills += 1
+        self._invoke(ctx, "on_fill", fill)
+
+    # -------------------------------
+    # ORDERS
+    # -------------------------------
+    def _submit(self, ctx: StrategyContext, client_order_id: str, symbol, side, order_type, quantity, price) -> str:
+        decided = time.perf_counter()
+
+        place = functools.partial(
+            self.manager.place_order, symbol, side, order_type, quantity, price,
+            wait_for_fill=False, client_order_id=client_order_id,
+        )
+        future = self._loop.run_in_executor(self._executor, place)
+        future.add_done_callback(
+            lambda done: self._on_ack(ctx, client_order_id, decided, done)
+        )
+
+        return client_order_id
+
+    def _on_ack(self, ctx: StrategyContext, client_order_id: str, decided: float, done):
+        latency = time.perf_counter() - decided
+        ctx.decision_latency.observe(latency)
+        if self.metrics.enabled:
+            self.metrics.observe("bot_strategy_decision_seconds", latency, strategy=ctx.strategy.name)
+
+        try:
+            result = done.result()
+        except Exception as e:
+            self.logger.warning(f"Strategy {ctx.strategy.name} order {client_order_id} failed: {e}")
+            result = {
+                "orderId": None,
+                "status": "ERROR",
+                "executedQty": 0,
+                "avgPrice": 0,
+                "error": str(e),
+            }
+
+        result["clientOrderId"] = client_order_id
+        self._invoke(ctx, "on_order", result)
+
+    # -------------------------------
+    # STATS
+    # -------------------------------
+    def stats(self) -> dict:
+        """Per-strategy counters, CPU time and decision-to-ack latency."""
+        return {
+            "strategies": {ctx.strategy.name: ctx.stats() for ctx in self._contexts},
+            "marketData": self.market_data.stats() if self.market_data is not None else None,
+        }
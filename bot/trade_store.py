@@ -0,0 +1,324 @@
+# bot/trade_store.py
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from itertools import repeat
+
+import numpy as np
+
+from bot.client import base_url_path
+from bot.records import TRADE_DTYPE, TradeRecord
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DB_PATH = os.path.join(BASE_DIR, "data", "trade_history.db")
+
+PAGE_LIMIT = 1000
+DEFAULT_SYNC_INTERVAL = 30.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    symbol TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    order_id INTEGER,
+    side TEXT,
+    position_side TEXT,
+    qty REAL,
+    price REAL,
+    quote_qty REAL,
+    realized_pnl REAL,
+    commission REAL,
+    commission_asset TEXT,
+    maker INTEGER,
+    time INTEGER NOT NULL,
+    PRIMARY KEY (symbol, id)
+);
+CREATE INDEX IF NOT EXISTS idx_trades_symbol_time ON trades (symbol, time);
+CREATE INDEX IF NOT EXISTS idx_trades_time ON trades (time);
+CREATE TABLE IF NOT EXISTS sync_state (
+    symbol TEXT PRIMARY KEY,
+    synced_at REAL NOT NULL,
+    next_id INTEGER
+);
+CREATE TABLE IF NOT EXISTS cursors (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL,
+    updated_at REAL
+);
+"""
+
+
+def _epoch_ms(value):
+    if value is None or isinstance(value, int):
+        return value
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1000)
+    return int(value)
+
+
+class TradeStore:
+    """
+    Local SQLite ledger of futures account trades.
+
+    ``sync`` backfills each symbol from ``fromId=0`` once, then pulls only
+    trades past the stored cursor, so the full history is downloaded once
+    and every later query is answered locally from indexed tables.
+    """
+
+    def __init__(self, client, db_path: str = None, sync_interval: float = DEFAULT_SYNC_INTERVAL):
+        self.logger = logging.getLogger(__name__)
+        self.client = client
+        self.sync_interval = sync_interval
+
+        if db_path is None:
+            # One ledger per exchange: simulator trades never land in the testnet one
+            db_path = base_url_path(DEFAULT_DB_PATH, getattr(client, "base_url", None))
+
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(sync_state)")}
+        if "next_id" not in columns:
+            # Ledgers from before the cursor: every symbol is backfilled again from fromId=0
+            with self._db:
+                self._db.execute("ALTER TABLE sync_state ADD COLUMN next_id INTEGER")
+
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(cursors)")}
+        if "updated_at" not in columns:
+            with self._db:
+                self._db.execute("ALTER TABLE cursors ADD COLUMN updated_at REAL")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    # -------------------------------
+    # SYNC
+    # -------------------------------
+    def symbols(self) -> list:
+        with self._lock:
+            rows = self._db.execute("SELECT DISTINCT symbol FROM trades ORDER BY symbol").fetchall()
+        return [row[0] for row in rows]
+
+    def last_trade_id(self, symbol: str):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT MAX(id) FROM trades WHERE symbol = ?", (symbol,)
+            ).fetchone()
+        return row[0]
+
+    def sync(self, symbols: list = None, force: bool = False) -> int:
+        """
+        Fetch new trades for ``symbols`` and return how many were added.
+
+        Without symbols, syncs every known symbol plus any that appear in
+        the income history since the last sync (every listed symbol if
+        income history is unavailable). Symbols synced, and income history
+        scanned, within ``sync_interval`` seconds are skipped unless
+        ``force`` is set.
+        """
+        discovered, income_cursor = set(), None
+        if symbols is None:
+            # Income history weighs 30: between scans only stored symbols are synced
+            if force or self._discovery_due():
+                discovered, income_cursor = self._discover_symbols()
+            symbols = set(self.symbols()) | discovered
+
+        added = 0
+        for symbol in sorted(symbols):
+            # Newly discovered symbols are synced now: the income cursor moves past them
+            if force or symbol in discovered or self._is_stale(symbol):
+                added += self._sync_symbol(symbol)
+
+        if income_cursor is not None:
+            # Only moved on once the symbols it found are synced
+            with self._lock, self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO cursors (name, value, updated_at) VALUES ('income', ?, ?)",
+                    (income_cursor, time.time()),
+                )
+
+        return added
+
+    def _discover_symbols(self) -> tuple:
+        """(symbols with income since the last sync, new income cursor)."""
+        with self._lock:
+            row = self._db.execute("SELECT value FROM cursors WHERE name = 'income'").fetchone()
+        start_time = row[0] if row else 0
+        symbols = set()
+
+        try:
+            while True:
+                page = self.client.get_income_history(start_time, PAGE_LIMIT)
+                symbols.update(item["symbol"] for item in page if item.get("symbol"))
+
+                if len(page) < PAGE_LIMIT:
+                    return symbols, max((item["time"] + 1 for item in page), default=start_time)
+
+                # Rows sharing the last millisecond may continue on the next page
+                last_time = max(item["time"] for item in page)
+                start_time = last_time if last_time > start_time else start_time + 1
+
+        except Exception as e:
+            if row is not None:
+                # Stored symbols are still synced; new ones are picked up once income history answers
+                self.logger.warning(f"Trade store: income history unavailable ({e})")
+                return set(), None
+
+            # First sync only: scan every listed symbol, then rely on stored ones
+            self.logger.warning(f"Trade store: income history unavailable ({e}), scanning every listed symbol")
+            info = self.client.get_exchange_info()
+            return {item["symbol"] for item in info.get("symbols", [])}, 0
+
+    def _discovery_due(self) -> bool:
+        with self._lock:
+            row = self._db.execute("SELECT updated_at FROM cursors WHERE name = 'income'").fetchone()
+        return row is None or row[0] is None or time.time() - row[0] >= self.sync_interval
+
+    def _is_stale(self, symbol: str) -> bool:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT synced_at FROM sync_state WHERE symbol = ?", (symbol,)
+            ).fetchone()
+        return row is None or time.time() - row[0] >= self.sync_interval
+
+    def _sync_symbol(self, symbol: str) -> int:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT next_id FROM sync_state WHERE symbol = ?", (symbol,)
+            ).fetchone()
+
+        # No cursor yet: backfill from the first trade, whatever is already stored
+        from_id = row[0] if row and row[0] is not None else 0
+        added = 0
+
+        while True:
+            page = self.client.get_trades_since(symbol, from_id, PAGE_LIMIT)
+            added += self._store(page)
+
+            if page:
+                from_id = max(trade["id"] for trade in page) + 1
+            if len(page) < PAGE_LIMIT:
+                break
+
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sync_state (symbol, synced_at, next_id) VALUES (?, ?, ?)",
+                (symbol, time.time(), from_id),
+            )
+
+        if added:
+            self.logger.info(f"Trade store: +{added} trades for {symbol}")
+
+        return added
+
+    def _store(self, trades: list) -> int:
+        rows = [
+            (
+                trade["symbol"],
+                trade["id"],
+                trade.get("orderId"),
+                trade.get("side"),
+                trade.get("positionSide"),
+                float(trade.get("qty", 0)),
+                float(trade.get("price", 0)),
+                float(trade.get("quoteQty", 0)),
+                float(trade.get("realizedPnl", 0)),
+                float(trade.get("commission", 0)),
+                trade.get("commissionAsset"),
+                int(bool(trade.get("maker"))),
+                trade["time"],
+            )
+            for trade in trades
+        ]
+
+        with self._lock, self._db:
+            before = self._db.total_changes
+            self._db.executemany(
+                "INSERT OR IGNORE INTO trades VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            return self._db.total_changes - before
+
+    # -------------------------------
+    # QUERIES
+    # -------------------------------
+    @staticmethod
+    def _filters(symbol=None, start=None, end=None, side=None) -> tuple:
+        clauses, params = [], []
+
+        if symbol:
+            clauses.append("symbol = ?")
+            params.append(symbol.upper())
+        if start is not None:
+            clauses.append("time >= ?")
+            params.append(_epoch_ms(start))
+        if end is not None:
+            clauses.append("time <= ?")
+            params.append(_epoch_ms(end))
+        if side:
+            clauses.append("side = ?")
+            params.append(side.upper())
+
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def _select(self, symbol=None, start=None, end=None, side=None, limit=None, offset=0) -> list:
+        where, params = self._filters(symbol, start, end, side)
+        sql = f"SELECT symbol, side, qty, price, realized_pnl, time FROM trades{where}"
+
+        if limit:
+            # Most recent ``limit`` trades (after skipping the ``offset`` newest), still returned oldest first
+            sql += " ORDER BY time DESC, id DESC LIMIT ? OFFSET ?"
+            params.extend((limit, offset))
+        else:
+            sql += " ORDER BY time, id"
+
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+
+        if limit:
+            rows.reverse()
+
+        return rows
+
+    def query(self, symbol: str = None, start=None, end=None, side: str = None,
+              limit: int = None, offset: int = 0) -> list:
+        """TradeRecords in the OrderManager.get_trade_history format, oldest first."""
+        rows = self._select(symbol, start, end, side, limit, offset)
+        return list(map(tuple.__new__, repeat(TradeRecord), rows))
+
+    def query_array(self, symbol: str = None, start=None, end=None, side: str = None, limit: int = None) -> np.ndarray:
+        """Same rows as ``query`` as one TRADE_DTYPE structured array."""
+        rows = self._select(symbol, start, end, side, limit)
+        row_dtype = [(name, "i8" if name == "time" else TRADE_DTYPE[name]) for name in TRADE_DTYPE.names]
+
+        return np.array(rows, dtype=row_dtype).astype(TRADE_DTYPE)
+
+    def realized_pnl_by_day(self, symbol: str = None, start=None, end=None) -> list:
+        where, params = self._filters(symbol, start, end)
+        sql = (
+            "SELECT date(time / 1000, 'unixepoch', 'localtime') AS day,"
+            " SUM(realized_pnl), SUM(commission), COUNT(*)"
+            f" FROM trades{where} GROUP BY day ORDER BY day"
+        )
+
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+
+        return [
+            {"day": day, "realizedPnl": pnl, "commission": commission, "trades": count}
+            for day, pnl, commission, count in rows
+        ]
+
+    def count(self, symbol: str = None) -> int:
+        where, params = self._filters(symbol)
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM trades{where}", params).fetchone()[0]
@@ -0,0 +1,272 @@
+# bot/user_stream.py
+
+import asyncio
+import json
+import logging
+import threading
+from collections import OrderedDict
+
+import websockets
+
+TESTNET_STREAM_URL = "wss://stream.binancefuture.com/ws"
+
+FINAL_STATUSES = ("FILLED", "CANCELED", "REJECTED", "EXPIRED")
+
+KEEPALIVE_INTERVAL = 30 * 60
+RECONNECT_DELAY = 1.0
+MAX_RECONNECT_DELAY = 30.0
+MAX_TRACKED_ORDERS = 10_000
+
+
+class StreamDisconnected(Exception):
+    """Raised to waiters when the user-data stream is not connected."""
+
+
+class UserDataStream:
+    """
+    One shared futures user-data stream connection.
+
+    A background thread keeps the websocket open and turns
+    ORDER_TRADE_UPDATE events into order states, so any number of
+    in-flight orders can wait on fills without polling REST.
+    """
+
+    def __init__(self, client=None, base_url: str = TESTNET_STREAM_URL):
+        self.logger = logging.getLogger(__name__)
+        self.client = client
+        self.base_url = base_url.rstrip("/")
+
+        self._lock = threading.Lock()
+        self._states = OrderedDict()
+        self._waiters = {}
+        self._callbacks = []
+
+        self._connected = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._loop = None
+        self._task = None
+        self._listen_key = None
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    # -------------------------------
+    # LIFECYCLE
+    # -------------------------------
+    def start(self, wait: float = 5.0) -> bool:
+        if self._thread and self._thread.is_alive():
+            return self.connected
+
+        self._stopping = False
+        self._thread = threading.Thread(
+            target=self._run_loop, name="user-data-stream", daemon=True
+        )
+        self._thread.start()
+
+        return self._connected.wait(wait)
+
+    def stop(self):
+        self._stopping = True
+
+        loop, task = self._loop, self._task
+        if loop is not None and task is not None:
+            loop.call_soon_threadsafe(task.cancel)
+
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+        self._mark_disconnected()
+
+        if self.client is not None and self._listen_key:
+            try:
+                self.client.close_user_stream(self._listen_key)
+            except Exception:
+                self.logger.warning("Failed to close listen key", exc_info=True)
+
+        self._listen_key = None
+
+    def add_callback(self, callback):
+        """Register ``callback(event)`` for every raw stream event."""
+        self._callbacks.append(callback)
+
+    # -------------------------------
+    # ORDER TRACKING
+    # -------------------------------
+    def get_order_state(self, order_id: int):
+        with self._lock:
+            return self._states.get(order_id)
+
+    def wait_for_order(self, order_id: int, timeout: float):
+        """
+        Block until ``order_id`` reaches a final status.
+
+        Returns the final order state, or None on timeout. Raises
+        StreamDisconnected if the stream is (or goes) down, so the
+        caller can fall back to REST.
+        """
+        with self._lock:
+            state = self._states.get(order_id)
+            if state and state["status"] in FINAL_STATUSES:
+                return state
+
+            if not self.connected:
+                raise StreamDisconnected("User data stream is not connected")
+
+            event = self._waiters.setdefault(order_id, threading.Event())
+
+        event.wait(timeout)
+
+        with self._lock:
+            self._waiters.pop(order_id, None)
+            state = self._states.get(order_id)
+
+        if state and state["status"] in FINAL_STATUSES:
+            return state
+
+        if not self.connected:
+            raise StreamDisconnected("User data stream lost while waiting")
+
+        return None
+
+    def handle_message(self, message):
+        try:
+            event = json.loads(message)
+        except (TypeError, ValueError):
+            self.logger.warning(f"Ignoring malformed stream message: {message!r}")
+            return
+
+        event_type = event.get("e")
+
+        if event_type == "ORDER_TRADE_UPDATE":
+            self._on_order_update(event.get("o", {}), event.get("T"))
+        elif event_type == "listenKeyExpired":
+            self.logger.warning("Listen key expired, reconnecting")
+            self._listen_key = None
+            # No more events arrive on this socket: waiters fall back to REST until reconnected
+            self._mark_disconnected()
+
+        for callback in self._callbacks:
+            try:
+                callback(event)
+            except Exception:
+                self.logger.exception("User stream callback failed")
+
+    def _on_order_update(self, order: dict, event_time):
+        order_id = order.get("i")
+        if order_id is None:
+            return
+
+        state = {
+            "orderId": order_id,
+            "clientOrderId": order.get("c"),
+            "symbol": order.get("s"),
+            "status": order.get("X"),
+            "executedQty": float(order.get("z", 0)),
+            "avgPrice": float(order.get("ap", 0)),
+            "updateTime": event_time,
+        }
+
+        with self._lock:
+            self._states[order_id] = state
+            self._states.move_to_end(order_id)
+
+            while len(self._states) > MAX_TRACKED_ORDERS:
+                self._states.popitem(last=False)
+
+            event = self._waiters.get(order_id)
+
+        if event is not None and state["status"] in FINAL_STATUSES:
+            event.set()
+
+    def _mark_disconnected(self):
+        self._connected.clear()
+
+        # Wake every waiter so it can fall back to REST polling
+        with self._lock:
+            waiters = list(self._waiters.values())
+
+        for event in waiters:
+            event.set()
+
+    # -------------------------------
+    # CONNECTION
+    # -------------------------------
+    def _stream_url(self) -> str:
+        if self.client is None:
+            return self.base_url
+
+        if not self._listen_key:
+            self._listen_key = self.client.start_user_stream()
+
+        return f"{self.base_url}/{self._listen_key}"
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+
+        self._task = self._loop.create_task(self._run())
+
+        try:
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            # Cancelled from stop()
+            pass
+        finally:
+            self._loop.close()
+            self._loop = None
+            self._task = None
+
+    async def _run(self):
+        delay = RECONNECT_DELAY
+
+        while not self._stopping:
+            try:
+                url = await asyncio.to_thread(self._stream_url)
+
+                async with websockets.connect(url) as ws:
+                    self.logger.info("User data stream connected")
+                    self._connected.set()
+                    delay = RECONNECT_DELAY
+
+                    keepalive = asyncio.ensure_future(self._keepalive())
+                    try:
+                        async for message in ws:
+                            self.handle_message(message)
+
+                            if self.client is not None and self._listen_key is None:
+                                # listenKeyExpired: reconnect with a new listen key
+                                await ws.close()
+                                break
+                    finally:
+                        keepalive.cancel()
+
+            except Exception as e:
+                self.logger.warning(f"User data stream error: {e}")
+
+            self._mark_disconnected()
+
+            if self._stopping:
+                break
+
+            self.logger.info(f"Reconnecting user data stream in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    async def _keepalive(self):
+        if self.client is None:
+            return
+
+        while True:
+            await asyncio.sleep(KEEPALIVE_INTERVAL)
+            if self._listen_key is None:
+                continue
+
+            try:
+                await asyncio.to_thread(
+                    self.client.keepalive_user_stream, self._listen_key
+                )
+            except Exception:
+                self.logger.warning("Listen key keepalive failed", exc_info=True)
+
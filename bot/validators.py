@@ -1,5 +1,8 @@
 # bot/validators.py
 
+import math
+
+
 def validate_symbol(symbol: str) -> str:
     if not symbol or not symbol.endswith("USDT"):
         raise ValueError("Symbol must be a valid USDT pair (e.g., BTCUSDT)")
@@ -30,4 +33,163 @@ def validate_price(price: float, order_type: str):
     if order_type == "LIMIT":
         if price is None or price <= 0:
             raise ValueError("Price is required and must be > 0 for LIMIT orders")
-    return price
\ No newline at end of file
+    return price
+
+
+# LIMIT prices further than this from the order book mid are rejected as typos
+MAX_PRICE_DEVIATION = 0.05
+
+
+def validate_price_near_market(price: float, reference: float, max_deviation: float = MAX_PRICE_DEVIATION):
+    if price is not None and reference and abs(price - reference) / reference > max_deviation:
+        raise ValueError(
+            f"Price {price} is more than {max_deviation:.0%} away from the market price {reference:.8g}"
+        )
+    return price
+
+
+# -------------------------------
+# EXCHANGE FILTERS
+# -------------------------------
+def step_decimals(step: float) -> int:
+    """Decimal places of a tick / step size (0.001 -> 3)."""
+    fraction = f"{step:.10f}".rstrip("0").partition(".")[2]
+    return len(fraction)
+
+
+def round_step(value: float, step: float, up: bool = False) -> float:
+    """Round ``value`` down (or up) to a multiple of ``step``."""
+    steps = math.ceil(value / step - 1e-9) if up else math.floor(value / step + 1e-9)
+    return round(steps * step, step_decimals(step))
+
+
+def quantize_quantity(quantity: float, filters, order_type: str = "LIMIT") -> float:
+    """Round a quantity down to the symbol's step size and check its LOT_SIZE bounds."""
+    if order_type == "MARKET":
+        step, min_qty, max_qty = filters.market_step_size, filters.market_min_qty, filters.market_max_qty
+    else:
+        step, min_qty, max_qty = filters.step_size, filters.min_qty, filters.max_qty
+
+    rounded = round_step(quantity, step)
+    if rounded < min_qty:
+        raise ValueError(f"Quantity {quantity} is below the {filters.symbol} minimum of {min_qty:g} (step {step:g})")
+    if max_qty and rounded > max_qty:
+        raise ValueError(f"Quantity {quantity} is above the {filters.symbol} {order_type} maximum of {max_qty:g}")
+    return rounded
+
+
+def quantize_price(price: float, filters, side: str) -> float:
+    """
+    Round a price to the symbol's tick size and check its PRICE_FILTER bounds.
+
+    BUY prices round down and SELL prices up, so the order is never more
+    aggressive than asked.
+    """
+    rounded = round_step(price, filters.tick_size, up=side == "SELL")
+    if rounded < filters.min_price or (filters.max_price and rounded > filters.max_price):
+        raise ValueError(
+            f"Price {price} is outside the {filters.symbol} range {filters.min_price:g} - {filters.max_price:g}"
+        )
+    return rounded
+
+
+def validate_notional(quantity: float, price: float, filters):
+    if price and quantity * price < filters.min_notional - 1e-9:
+        raise ValueError(
+            f"Order value {quantity * price:.8g} is below the {filters.symbol} minimum notional of {filters.min_notional:g}"
+        )
+
+
+def validate_order_filters(filters, side: str, order_type: str, quantity: float, price: float = None,
+                           reference_price: float = None) -> tuple:
+    """
+    Quantize an order to the symbol's exchange filters and check its notional.
+
+    MARKET orders are checked against ``reference_price`` (e.g. the book
+    mid) when one is given. Returns the (quantity, price) to send.
+    """
+    quantity = quantize_quantity(quantity, filters, order_type)
+
+    if order_type == "LIMIT":
+        if price is None:
+            raise ValueError("Price is required for LIMIT orders")
+        price = quantize_price(price, filters, side)
+        validate_notional(quantity, price, filters)
+    else:
+        validate_notional(quantity, reference_price, filters)
+
+    return quantity, price
+
+
+def validate_orders_batch(filters: dict, symbols, sides, order_types, quantities, prices=None,
+                          reference_prices=None) -> dict:
+    """
+    ``validate_order_filters`` for many orders at once, vectorized with numpy.
+
+    ``filters`` maps symbol -> SymbolFilters; the other arguments are
+    equal-length sequences (price None / NaN for MARKET orders). Returns
+    the quantized "quantity" and "price" arrays, a boolean "valid" array
+    and "errors", one message per order (None where valid).
+    """
+    import numpy as np
+
+    symbols = np.asarray(symbols, dtype=str)
+    count = len(symbols)
+    names, index = np.unique(symbols, return_inverse=True)
+    known = np.array([name in filters for name in names], dtype=bool)[index]
+    trading = np.array([name in filters and filters[name].status == "TRADING" for name in names], dtype=bool)[index]
+
+    def column(attr):
+        return np.array([getattr(filters[name], attr) if name in filters else np.nan for name in names])[index]
+
+    market = np.asarray(order_types, dtype=str) == "MARKET"
+    sell = np.asarray(sides, dtype=str) == "SELL"
+    quantity = np.asarray(quantities, dtype=float)
+    price = np.full(count, np.nan) if prices is None else np.array(
+        [np.nan if p is None else p for p in prices], dtype=float
+    )
+    reference = np.full(count, np.nan) if reference_prices is None else np.array(
+        [np.nan if p is None else p for p in reference_prices], dtype=float
+    )
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        step = np.where(market, column("market_step_size"), column("step_size"))
+        min_qty = np.where(market, column("market_min_qty"), column("min_qty"))
+        max_qty = np.where(market, column("market_max_qty"), column("max_qty"))
+        quantity = np.round(np.floor(quantity / step + 1e-9) * step, 8)
+
+        tick = column("tick_size")
+        ticks = np.where(sell, np.ceil(price / tick - 1e-9), np.floor(price / tick + 1e-9))
+        price = np.where(market, np.nan, np.round(ticks * tick, 8))
+
+        max_price = column("max_price")
+        notional = quantity * np.where(market, reference, price)
+
+        valid = (
+            trading
+            & (quantity >= min_qty)
+            & ((max_qty == 0) | (quantity <= max_qty))
+            & (market | ((price >= column("min_price")) & ((max_price == 0) | (price <= max_price))))
+            & ~(notional < column("min_notional") - 1e-9)
+        )
+
+    errors = [None] * count
+    for i in np.flatnonzero(~valid):
+        # Only rejected orders take the scalar path, for the same message
+        if not known[i]:
+            errors[i] = f"Unknown symbol {symbols[i]}"
+            continue
+        if not trading[i]:
+            errors[i] = f"{symbols[i]} is not trading (status {filters[symbols[i]].status})"
+            continue
+        try:
+            validate_order_filters(
+                filters[symbols[i]], sides[i], order_types[i], quantities[i],
+                None if market[i] or prices is None else prices[i],
+                None if reference_prices is None else reference_prices[i],
+            )
+            errors[i] = "Invalid quantity or price"
+        except ValueError as e:
+            errors[i] = str(e)
+
+    return {"quantity": quantity, "price": price, "valid": valid, "errors": errors}
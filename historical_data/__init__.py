@@ -0,0 +1 @@
+# historical_data/__init__.py
@@ -0,0 +1,182 @@
+# historical_data/downloader.py
+
+import json
+import logging
+import os
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from bot.client import SIMULATOR_URL_ENV
+from bot.scheduler import BULK, get_scheduler
+from historical_data.kline_store import KLINE_COLUMNS, raw_klines_to_frame
+
+FUTURES_URL = "https://fapi.binance.com"
+KLINES_PATH = "/fapi/v1/klines"
+
+PAGE_LIMIT = 1500
+DEFAULT_MAX_WORKERS = 8
+MAX_RETRIES = 5
+
+
+def klines_request_weight(limit: int) -> int:
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+class KlineDownloader:
+    """
+    Parallel, time-range-sharded futures kline downloader.
+
+    Each requested range is split into PAGE_LIMIT-candle shards that are
+    fetched concurrently from the public klines endpoint, then reordered
+    and de-duplicated. Requests go through the process-wide
+    RequestScheduler of ``base_url`` on its bulk lane, so history downloads
+    share that venue's weight budget with (and yield to) its order and
+    account traffic, and never throttle another venue's.
+    """
+
+    def __init__(
+        self,
+        base_url: str = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        page_limit: int = PAGE_LIMIT,
+        timeout: float = 10,
+        scheduler=None,
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.base_url = (base_url or os.getenv(SIMULATOR_URL_ENV) or FUTURES_URL).rstrip("/")
+        self.page_limit = page_limit
+        self.timeout = timeout
+        self.request_weight = klines_request_weight(page_limit)
+        self.scheduler = scheduler or get_scheduler(self.base_url)
+
+        # More workers than the budget can feed per second would only queue
+        per_second = max(1, int(self.scheduler.capacity) // (60 * self.request_weight))
+        self.max_workers = max(1, min(max_workers, per_second * 2))
+
+        self.last_stats = {}
+
+    # -------------------------------
+    # PUBLIC API
+    # -------------------------------
+    def download(self, symbol: str, interval: str, start_ms: int, end_ms: int) -> pd.DataFrame:
+        return self.download_many([(symbol, interval, start_ms, end_ms)])[(symbol, interval)]
+
+    def download_many(self, jobs: list) -> dict:
+        """
+        Download every (symbol, interval, start_ms, end_ms) job over one pool.
+
+        Returns {(symbol, interval): DataFrame} in the kline store schema.
+        """
+        shards = []
+        for symbol, interval, start_ms, end_ms in jobs:
+            shards.extend(self._shards(symbol, interval, start_ms, end_ms))
+
+        started = time.perf_counter()
+        self._waited = 0.0
+        self._waited_lock = threading.Lock()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            pages = list(pool.map(self._fetch_shard, shards))
+
+        by_key = {(symbol, interval): [] for symbol, interval, _, _ in jobs}
+        for (symbol, interval, _, _), rows in zip(shards, pages):
+            by_key[(symbol, interval)].extend(rows)
+
+        frames = {}
+        for key, rows in by_key.items():
+            df = raw_klines_to_frame(rows) if rows else pd.DataFrame(columns=KLINE_COLUMNS)
+            frames[key] = (
+                df.drop_duplicates(subset="open_time")
+                .sort_values("open_time")
+                .reset_index(drop=True)
+            )
+
+        elapsed = time.perf_counter() - started
+        total_rows = sum(len(df) for df in frames.values())
+
+        self.last_stats = {
+            "jobs": len(jobs),
+            "requests": len(shards),
+            "rows": total_rows,
+            "elapsed_s": elapsed,
+            "rows_per_s": total_rows / elapsed if elapsed else 0.0,
+            "requests_per_s": len(shards) / elapsed if elapsed else 0.0,
+            "rate_limit_wait_s": self._waited,
+            "workers": self.max_workers,
+        }
+
+        self.logger.info(
+            f"Downloaded {total_rows} klines in {len(shards)} requests "
+            f"over {elapsed:.2f}s ({self.last_stats['rows_per_s']:.0f} rows/s)"
+        )
+
+        return frames
+
+    # -------------------------------
+    # SHARDING / FETCHING
+    # -------------------------------
+    def _shards(self, symbol: str, interval: str, start_ms: int, end_ms: int) -> list:
+        from binance.helpers import interval_to_milliseconds
+
+        span = interval_to_milliseconds(interval) * self.page_limit
+        shards = []
+
+        shard_start = start_ms
+        while shard_start <= end_ms:
+            shard_end = min(shard_start + span - 1, end_ms)
+            shards.append((symbol, interval, shard_start, shard_end))
+            shard_start = shard_end + 1
+
+        return shards
+
+    def _fetch_shard(self, shard) -> list:
+        symbol, interval, start_ms, end_ms = shard
+        query = urllib.parse.urlencode({
+            "symbol": symbol,
+            "interval": interval,
+            "startTime": start_ms,
+            "endTime": end_ms,
+            "limit": self.page_limit,
+        })
+        url = f"{self.base_url}{KLINES_PATH}?{query}"
+
+        for attempt in range(MAX_RETRIES):
+            waited = self.scheduler.acquire(self.request_weight, BULK)
+            with self._waited_lock:
+                self._waited += waited
+
+            try:
+                with urllib.request.urlopen(url, timeout=self.timeout) as response:
+                    self.scheduler.observe_headers(response.headers)
+                    return json.loads(response.read())
+
+            except urllib.error.HTTPError as e:
+                if e.code in (418, 429):
+                    retry_after = float(e.headers.get("Retry-After") or 2 ** attempt)
+                    self.logger.warning(f"Rate limited ({e.code}), backing off {retry_after}s")
+                    self.scheduler.pause(retry_after)
+                    continue
+
+                if e.code < 500:
+                    raise
+
+                self.logger.warning(f"Klines request failed ({e.code}), retrying")
+
+            except (urllib.error.URLError, TimeoutError) as e:
+                self.logger.warning(f"Klines request error: {e}, retrying")
+
+            time.sleep(min(2 ** attempt * 0.5, 10))
+
+        raise RuntimeError(f"Klines download failed after {MAX_RETRIES} attempts: {shard}")
@@ -1,11 +1,14 @@
 # get_futures_historical.py
 
 import logging
+import threading
+import time
 import pandas as pd
-from binance.client import Client
-from binance.exceptions import BinanceAPIException
 import os
 from dotenv import load_dotenv
+from bot.client import SIMULATOR_URL_ENV
+from historical_data.downloader import KlineDownloader
+from historical_data.kline_store import KlineStore, raw_klines_to_frame, to_output_frame
 
 load_dotenv()
 
@@ -21,72 +24,134 @@ os.makedirs(HISTORICAL_DATA_DIR, exist_ok=True)
 
 # Fetching process logging info
 log_file_path = os.path.join(HISTORICAL_DATA_DIR, "futures_historical.log")
-logging.basicConfig(
-    filename=log_file_path,
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
 
-# Now fetch keys
-api_key = os.getenv("BINANCE_API_KEY")
-secret_key = os.getenv("BINANCE_SECRET_KEY")
+# The log file and the Binance client (slow python-binance import) are
+# only set up on first use, so importing this module stays cheap.
+_client = None
+_client_lock = threading.Lock()
 
-if not api_key or not secret_key:
-    raise ValueError("API keys not found. Check your .env file.")
 
-client = Client(api_key, secret_key)
+def setup_logging():
+    # No-op if the application already configured the root logger
+    logging.basicConfig(
+        filename=log_file_path,
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s"
+    )
 
 
-def get_futures_klines(symbol: str, interval: str, start_str: str):
-    try:
-        logging.info(f"Fetching FUTURES data: {symbol}, {interval}, {start_str}")
+def get_client():
+    global _client
 
-        klines = client.futures_historical_klines(
-            symbol=symbol,
-            interval=interval,
-            start_str=start_str
-        )
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from binance.client import Client
 
-        if not klines:
-            raise ValueError("No data returned from Binance.")
+                api_key = os.getenv("BINANCE_API_KEY")
+                secret_key = os.getenv("BINANCE_SECRET_KEY")
+                simulator_url = os.getenv(SIMULATOR_URL_ENV, "").rstrip("/")
 
-        ALL_COLUMNS = [
-            "open_time", "open", "high", "low", "close", "volume",
-            "close_time", "quote_asset_volume", "num_trades",
-            "taker_buy_base_asset_volume", "taker_buy_quote_asset_volume",
-            "ignore"
-        ]
+                if simulator_url:
+                    # Klines are public; the simulator ignores keys anyway
+                    api_key = api_key or "simulator"
+                    secret_key = secret_key or "simulator"
 
-        REQUIRED_COLUMNS = [
-            "open_time","open","high","low","close","volume","close_time" 
-        ]
+                if not api_key or not secret_key:
+                    raise ValueError("API keys not found. Check your .env file.")
 
+                client = Client(api_key, secret_key, ping=False)
+                if simulator_url:
+                    client.FUTURES_URL = f"{simulator_url}/fapi"
+                _client = client
 
-        df = pd.DataFrame(klines, columns=ALL_COLUMNS)
-        df = df[REQUIRED_COLUMNS]
+    return _client
 
-        df["open_time"] = pd.to_datetime(df["open_time"], unit='ms')
-        df["close_time"] = pd.to_datetime(df["close_time"], unit='ms')
 
-        numeric_cols = ["open", "high", "low", "close", "volume"]
-        df[numeric_cols] = df[numeric_cols].astype(float)
+def _fetch_klines(symbol: str, interval: str, start_ms: int, end_ms: int, parallel: bool = False) -> pd.DataFrame:
+    if parallel:
+        return KlineDownloader().download(symbol, interval, start_ms, end_ms)
+
+    klines = get_client().futures_historical_klines(
+        symbol=symbol,
+        interval=interval,
+        start_str=start_ms,
+        end_str=end_ms
+    )
+    return raw_klines_to_frame(klines)
 
-        logging.info("Futures data fetched successfully")
-        return df
 
-    except BinanceAPIException as e:
-        logging.error(f"Binance API Error: {e.message}")
-        print("API Error:", e.message)
+def get_futures_klines(
+    symbol: str,
+    interval: str,
+    start_str: str,
+    end_str: str = None,
+    use_cache: bool = True,
+    store: KlineStore = None,
+    parallel: bool = False,
+):
+    setup_logging()
+
+    try:
+        from binance.helpers import date_to_milliseconds, interval_to_milliseconds
+
+        logging.info(f"Fetching FUTURES data: {symbol}, {interval}, {start_str}")
+
+        now_ms = int(time.time() * 1000)
+        interval_ms = interval_to_milliseconds(interval)
+        start_ms = date_to_milliseconds(start_str)
+        end_ms = date_to_milliseconds(end_str) if end_str else now_ms
+
+        if not use_cache or interval_ms is None:
+            df = _fetch_klines(symbol, interval, start_ms, end_ms, parallel)
+        else:
+            store = store or KlineStore()
+            # Only closed candles are cached; the open one is always refetched
+            last_closed_ms = min(end_ms, (now_ms // interval_ms) * interval_ms - 1)
+            fetched = []
+
+            for gap_start, gap_end in store.missing_ranges(symbol, interval, start_ms, end_ms):
+                logging.info(f"Kline cache miss: {symbol} {interval} [{gap_start}, {gap_end}]")
+                rows = _fetch_klines(symbol, interval, gap_start, gap_end, parallel)
+                fetched.append(rows)
+
+                closed = rows[rows["close_time"] <= last_closed_ms]
+                if gap_start <= last_closed_ms:
+                    store.merge(symbol, interval, closed, gap_start, min(gap_end, last_closed_ms))
+
+            df = store.load(symbol, interval, start_ms, end_ms)
+
+            # Append the still-open candle(s), which are not persisted
+            fresh = [rows[rows["close_time"] > last_closed_ms] for rows in fetched]
+            fresh = [rows for rows in fresh if not rows.empty]
+            if fresh:
+                df = pd.concat([df] + fresh, ignore_index=True).drop_duplicates(
+                    subset="open_time", keep="last"
+                )
+
+        if df.empty:
+            raise ValueError("No data returned from Binance.")
+
+        df = to_output_frame(df)
+
+        logging.info(f"Futures data ready: {len(df)} rows")
+        return df
 
     except Exception as e:
-        logging.error(f"Error: {str(e)}")
-        print("Error:", str(e))
+        from binance.exceptions import BinanceAPIException
+
+        if isinstance(e, BinanceAPIException):
+            logging.error(f"Binance API Error: {e.message}")
+            print("API Error:", e.message)
+        else:
+            logging.error(f"Error: {str(e)}")
+            print("Error:", str(e))
 
 
 if __name__ == "__main__":
     df = get_futures_klines(
         symbol="BTCUSDT",
-        interval=Client.KLINE_INTERVAL_1DAY,
+        interval="1d",
         start_str="1 Jan, 2025"
     )
 
@@ -0,0 +1,174 @@
+# historical_data/kline_format.py
+
+"""
+Columnar binary kline file (``.klines``).
+
+Layout, all little-endian::
+
+    header (64 bytes): magic b"KLNS", version u16, column count u16,
+                       row count u64, symbol (16s), interval (8s), padding
+    open_time  int64[rows]   epoch ms
+    open       float64[rows]
+    high       float64[rows]
+    low        float64[rows]
+    close      float64[rows]
+    volume     float64[rows]
+    close_time int64[rows]   epoch ms
+
+Every column is a contiguous 8-byte aligned block, so ``numpy.memmap``
+exposes each one without copying and a time slice only touches the
+pages it needs.
+
+Convert an existing CSV export with:
+
+    python -m historical_data.kline_format historical_data/btc_futures_data.csv out.klines
+"""
+
+import os
+import struct
+import sys
+
+import numpy as np
+import pandas as pd
+
+KLINE_COLUMNS = [
+    "open_time", "open", "high", "low", "close", "volume", "close_time"
+]
+NUMERIC_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+MAGIC = b"KLNS"
+VERSION = 1
+HEADER_SIZE = 64
+HEADER_STRUCT = struct.Struct("<4sHHQ16s8s")
+
+COLUMN_DTYPES = {
+    "open_time": np.dtype("<i8"),
+    "open": np.dtype("<f8"),
+    "high": np.dtype("<f8"),
+    "low": np.dtype("<f8"),
+    "close": np.dtype("<f8"),
+    "volume": np.dtype("<f8"),
+    "close_time": np.dtype("<i8"),
+}
+
+
+def _epoch_ms(values) -> np.ndarray:
+    series = pd.Series(values)
+
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.as_unit("ms").astype("int64").to_numpy()
+
+    if series.dtype == object:
+        return pd.to_datetime(series).dt.as_unit("ms").astype("int64").to_numpy()
+
+    return series.to_numpy(dtype="int64")
+
+
+def write_klines(path: str, df: pd.DataFrame, symbol: str = "", interval: str = ""):
+    """Write a kline frame (epoch-ms or datetime times) to ``path`` atomically."""
+    rows = len(df)
+    columns = {
+        "open_time": _epoch_ms(df["open_time"]),
+        "close_time": _epoch_ms(df["close_time"]),
+    }
+    for name in NUMERIC_COLUMNS:
+        columns[name] = df[name].to_numpy(dtype="float64")
+
+    header = HEADER_STRUCT.pack(
+        MAGIC,
+        VERSION,
+        len(KLINE_COLUMNS),
+        rows,
+        symbol.upper().encode()[:16],
+        interval.encode()[:8],
+    ).ljust(HEADER_SIZE, b"\0")
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(header)
+        for name in KLINE_COLUMNS:
+            f.write(np.ascontiguousarray(columns[name], dtype=COLUMN_DTYPES[name]).tobytes())
+
+    os.replace(tmp, path)
+
+
+class KlineFile:
+    """Read-only memory-mapped view over a ``.klines`` file."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+        with open(path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+
+        if len(header) < HEADER_SIZE:
+            raise ValueError(f"Truncated kline file: {path}")
+
+        magic, version, ncols, rows, symbol, interval = HEADER_STRUCT.unpack_from(header)
+
+        if magic != MAGIC:
+            raise ValueError(f"Not a kline file: {path}")
+        if version != VERSION or ncols != len(KLINE_COLUMNS):
+            raise ValueError(f"Unsupported kline file version {version}: {path}")
+
+        self.rows = rows
+        self.symbol = symbol.rstrip(b"\0").decode()
+        self.interval = interval.rstrip(b"\0").decode()
+        self.columns = {}
+
+        offset = HEADER_SIZE
+        for name in KLINE_COLUMNS:
+            dtype = COLUMN_DTYPES[name]
+            if rows:
+                self.columns[name] = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(rows,))
+            else:
+                self.columns[name] = np.empty(0, dtype=dtype)
+            offset += rows * dtype.itemsize
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def index_range(self, start_ms: int = None, end_ms: int = None) -> tuple:
+        """Row bounds [lo, hi) with start_ms <= open_time <= end_ms (binary search)."""
+        open_time = self.columns["open_time"]
+        lo = 0 if start_ms is None else int(np.searchsorted(open_time, start_ms, side="left"))
+        hi = self.rows if end_ms is None else int(np.searchsorted(open_time, end_ms, side="right"))
+        return lo, max(lo, hi)
+
+    def slice(self, start_ms: int = None, end_ms: int = None) -> dict:
+        """Zero-copy column views for the given open_time window."""
+        lo, hi = self.index_range(start_ms, end_ms)
+        return {name: column[lo:hi] for name, column in self.columns.items()}
+
+    def to_frame(self, start_ms: int = None, end_ms: int = None) -> pd.DataFrame:
+        """Copy a window into a DataFrame with epoch-ms times (kline store schema)."""
+        return pd.DataFrame({
+            name: np.array(column)
+            for name, column in self.slice(start_ms, end_ms).items()
+        }, columns=KLINE_COLUMNS)
+
+
+def csv_to_klines(csv_path: str, out_path: str, symbol: str = "", interval: str = ""):
+    """Convert a get_futures_klines CSV export (datetime strings) to ``.klines``."""
+    df = pd.read_csv(csv_path, parse_dates=["open_time", "close_time"])
+    write_klines(out_path, df, symbol, interval)
+    return out_path
+
+
+def klines_to_csv(path: str, csv_path: str):
+    from historical_data.kline_store import to_output_frame
+
+    to_output_frame(KlineFile(path).to_frame()).to_csv(csv_path, index=False)
+    return csv_path
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python -m historical_data.kline_format <input.csv> <output.klines> [SYMBOL] [INTERVAL]")
+        sys.exit(1)
+
+    csv_to_klines(*sys.argv[1:5])
+    print(f"Wrote {len(KlineFile(sys.argv[2]))} rows to {sys.argv[2]}")
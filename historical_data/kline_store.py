@@ -0,0 +1,160 @@
+# historical_data/kline_store.py
+
+import json
+import logging
+import os
+
+import pandas as pd
+
+from historical_data.kline_format import KLINE_COLUMNS, NUMERIC_COLUMNS, KlineFile, write_klines
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = os.path.join(BASE_DIR, "cache")
+
+
+class KlineStore:
+    """
+    Persistent kline cache keyed by (symbol, interval).
+
+    Each key keeps its closed candles in a columnar ``.klines`` file
+    (see kline_format) plus a small JSON sidecar recording the contiguous [start, end] range
+    already downloaded, so callers only fetch the missing head or tail.
+    """
+
+    def __init__(self, root: str = DEFAULT_CACHE_DIR):
+        self.logger = logging.getLogger(__name__)
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, symbol: str, interval: str, ext: str) -> str:
+        return os.path.join(self.root, f"{symbol.upper()}_{interval}.{ext}")
+
+    def _klines_path(self, symbol: str, interval: str) -> str:
+        """Path of the ``.klines`` file, converting a CSV cache written before the columnar format."""
+        path = self._path(symbol, interval, "klines")
+        legacy = self._path(symbol, interval, "csv")
+
+        if not os.path.exists(path) and os.path.exists(legacy):
+            df = pd.read_csv(legacy, dtype={"open_time": "int64", "close_time": "int64"})
+            write_klines(path, df, symbol, interval)
+            os.remove(legacy)
+            self.logger.info(f"Kline cache {symbol} {interval}: migrated {len(df)} rows from CSV")
+
+        return path
+
+    # -------------------------------
+    # COVERAGE
+    # -------------------------------
+    def coverage(self, symbol: str, interval: str):
+        path = self._path(symbol, interval, "json")
+
+        # A range only counts as covered while its candles are still on disk
+        if not os.path.exists(path) or not os.path.exists(self._klines_path(symbol, interval)):
+            return None
+
+        with open(path) as f:
+            meta = json.load(f)
+
+        return meta["start"], meta["end"]
+
+    def missing_ranges(self, symbol: str, interval: str, start_ms: int, end_ms: int) -> list:
+        """Return the (start, end) ranges not yet covered, head first."""
+        covered = self.coverage(symbol, interval)
+
+        if covered is None:
+            return [(start_ms, end_ms)]
+
+        cov_start, cov_end = covered
+        gaps = []
+
+        # Gaps are always extended up to the covered range so it stays contiguous
+        if start_ms < cov_start:
+            gaps.append((start_ms, cov_start - 1))
+
+        if end_ms > cov_end:
+            gaps.append((cov_end + 1, end_ms))
+
+        return gaps
+
+    # -------------------------------
+    # READ / WRITE
+    # -------------------------------
+    def open(self, symbol: str, interval: str):
+        """Memory-mapped KlineFile for zero-copy access, or None if not cached."""
+        path = self._klines_path(symbol, interval)
+
+        if not os.path.exists(path):
+            return None
+
+        return KlineFile(path)
+
+    def load(self, symbol: str, interval: str, start_ms: int = None, end_ms: int = None) -> pd.DataFrame:
+        klines = self.open(symbol, interval)
+
+        if klines is None:
+            return pd.DataFrame(columns=KLINE_COLUMNS)
+
+        return klines.to_frame(start_ms, end_ms)
+
+    def merge(self, symbol: str, interval: str, new_rows: pd.DataFrame, start_ms: int, end_ms: int):
+        """Merge closed candles covering [start_ms, end_ms] into the store."""
+        existing = self.load(symbol, interval)
+        covered = self.coverage(symbol, interval)
+
+        if not new_rows.empty:
+            frames = [f for f in (existing, new_rows[KLINE_COLUMNS]) if not f.empty]
+            merged = (
+                pd.concat(frames, ignore_index=True)
+                .drop_duplicates(subset="open_time", keep="last")
+                .sort_values("open_time")
+                .reset_index(drop=True)
+            )
+        else:
+            merged = existing
+
+        if covered is not None:
+            start_ms = min(start_ms, covered[0])
+            end_ms = max(end_ms, covered[1])
+
+        write_klines(self._klines_path(symbol, interval), merged, symbol, interval)
+        self._atomic_write(
+            self._path(symbol, interval, "json"),
+            lambda tmp: self._write_json(tmp, {"start": int(start_ms), "end": int(end_ms)}),
+        )
+
+        self.logger.info(
+            f"Kline cache {symbol} {interval}: +{len(new_rows)} rows, {len(merged)} total"
+        )
+
+    @staticmethod
+    def _write_json(path: str, data: dict):
+        with open(path, "w") as f:
+            json.dump(data, f)
+
+    @staticmethod
+    def _atomic_write(path: str, write):
+        tmp = path + ".tmp"
+        write(tmp)
+        os.replace(tmp, path)
+
+
+def raw_klines_to_frame(klines: list) -> pd.DataFrame:
+    """Raw exchange kline rows -> store frame (epoch-ms times, float OHLCV)."""
+    df = pd.DataFrame([row[:7] for row in klines], columns=KLINE_COLUMNS)
+
+    df["open_time"] = df["open_time"].astype("int64")
+    df["close_time"] = df["close_time"].astype("int64")
+    df[NUMERIC_COLUMNS] = df[NUMERIC_COLUMNS].astype(float)
+
+    return df
+
+
+def to_output_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Store frame -> the get_futures_klines schema (datetime open/close times)."""
+    df = df[KLINE_COLUMNS].copy()
+
+    df["open_time"] = pd.to_datetime(df["open_time"], unit="ms")
+    df["close_time"] = pd.to_datetime(df["close_time"], unit="ms")
+    df[NUMERIC_COLUMNS] = df[NUMERIC_COLUMNS].astype(float)
+
+    return df.reset_index(drop=True)
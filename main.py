@@ -5,21 +5,40 @@ import logging
 from rich.console import Console
 from rich.table import Table
 from bot.logging_config import setup_logging
-from bot.orders import OrderManager
 from bot.validators import (
     validate_symbol,
     validate_side,
     validate_order_type,
-    
     validate_quantity,
     validate_price,
 )
-from binance.exceptions import BinanceAPIException, BinanceRequestException
+
+# bot.orders pulls in python-binance (slow to import), so it is only
+# imported by commands that talk to the exchange, not for --help or
+# input that fails validation.
 
 app = typer.Typer(help="🚀 Binance Futures Testnet Trading Bot")
 console = Console()
 
 
+def get_manager(**kwargs):
+    from bot.orders import OrderManager
+
+    return OrderManager(**kwargs)
+
+
+def get_order_store(read_only: bool = False):
+    from bot.client import get_client
+    from bot.order_store import OrderStore, OrderStoreLocked
+
+    try:
+        return OrderStore(base_url=get_client().base_url, read_only=read_only)
+    except OrderStoreLocked as e:
+        # Orders placed now could not be logged
+        console.print(f"[bold red]Order log unavailable: {e}[/bold red]")
+        raise typer.Exit(1)
+
+
 # -------------------------------
 # BALANCE COMMAND
 # -------------------------------
@@ -27,7 +46,7 @@ console = Console()
 def balance():
     """Show Futures USDT balance"""
     setup_logging()
-    manager = OrderManager()
+    manager = get_manager()
 
     try:
         data = manager.get_account_balance()
@@ -56,7 +75,7 @@ def balance():
 def positions():
     """Show open futures positions"""
     setup_logging()
-    manager = OrderManager()
+    manager = get_manager()
 
     try:
         positions = manager.get_open_positions()
@@ -94,7 +113,7 @@ def positions():
 def history(symbol: str = typer.Option(None, help="Filter by symbol")):
     """Show trade history"""
     setup_logging()
-    manager = OrderManager()
+    manager = get_manager()
 
     try:
         trades = manager.get_trade_history(symbol)
@@ -125,9 +144,381 @@ def history(symbol: str = typer.Option(None, help="Filter by symbol")):
         console.print(f"[bold red]Error: {e}[/bold red]")
 
 
+# -------------------------------
+# DAILY PNL COMMAND
+# -------------------------------
+@app.command()
+def pnl(symbol: str = typer.Option(None, help="Filter by symbol")):
+    """Show realized PnL by day from the local trade ledger"""
+    setup_logging()
+    manager = get_manager()
+
+    try:
+        days = manager.get_daily_pnl(symbol)
+
+        if not days:
+            console.print("[bold yellow]No trades found.[/bold yellow]")
+            return
+
+        table = Table(title="Realized PnL by Day")
+        table.add_column("Day", style="cyan")
+        table.add_column("Trades", style="white")
+        table.add_column("Realized PnL", style="green")
+        table.add_column("Commission", style="yellow")
+
+        for day in days:
+            table.add_row(
+                day["day"],
+                str(day["trades"]),
+                str(round(day["realizedPnl"], 8)),
+                str(round(day["commission"], 8)),
+            )
+
+        console.print(table)
+
+    except Exception as e:
+        console.print(f"[bold red]Error: {e}[/bold red]")
+
+
+# -------------------------------
+# ORDER BOOK COMMAND
+# -------------------------------
+@app.command()
+def book(
+    symbol: str = typer.Option(..., help="Trading symbol e.g. BTCUSDT"),
+    levels: int = typer.Option(10, help="Price levels per side"),
+    quantity: float = typer.Option(None, help="Estimate a MARKET fill of this size"),
+):
+    """Show the order book top levels, spread and fill estimates"""
+    setup_logging()
+
+    try:
+        symbol = validate_symbol(symbol)
+    except ValueError as e:
+        console.print(f"[bold red]Validation Error: {e}[/bold red]")
+        return
+
+    from bot.client import get_client
+    from bot.order_book import OrderBook
+
+    try:
+        snapshot = get_client().get_order_book(symbol, limit=1000)
+        order_book = OrderBook.from_snapshot(symbol, snapshot)
+
+        table = Table(title=f"{symbol} Order Book")
+        table.add_column("Bid Qty", style="green")
+        table.add_column("Bid", style="green")
+        table.add_column("Ask", style="red")
+        table.add_column("Ask Qty", style="red")
+
+        bids, asks = order_book.levels("SELL", levels), order_book.levels("BUY", levels)
+        for i in range(max(len(bids), len(asks))):
+            bid = bids[i] if i < len(bids) else ["", ""]
+            ask = asks[i] if i < len(asks) else ["", ""]
+            table.add_row(str(bid[1]), str(bid[0]), str(ask[0]), str(ask[1]))
+
+        console.print(table)
+
+        mid = order_book.mid()
+        if mid is None:
+            return
+
+        console.print(f"Mid: {mid:.8g}  Spread: {order_book.spread():.8g} ({order_book.spread_bps():.2f} bps)")
+
+        if quantity:
+            for side in ("BUY", "SELL"):
+                estimate = order_book.estimate_fill(side, quantity)
+                console.print(
+                    f"MARKET {side} {quantity}: avg {estimate['avgPrice']:.8g}, "
+                    f"worst {estimate['worstPrice']:.8g}, slippage {estimate['slippageBps']:.2f} bps"
+                    + ("" if estimate["filledQty"] >= quantity else f" (book holds only {estimate['filledQty']:.8g})")
+                )
+
+    except Exception as e:
+        console.print(f"[bold red]Error: {e}[/bold red]")
+
+
+# -------------------------------
+# ORDERS COMMAND
+# -------------------------------
+@app.command()
+def orders(
+    symbol: str = typer.Option(None, help="Filter by symbol"),
+    reconcile: bool = typer.Option(True, help="Sync open orders with the exchange first"),
+):
+    """Show open orders from the local order store"""
+    setup_logging()
+
+    from bot.client import get_client
+
+    # Read-only (reconciled in memory) while another process owns the log
+    store = get_order_store(read_only=None)
+
+    try:
+        if store.read_only:
+            console.print("[yellow]Order log in use by another process: reconciliation is not saved.[/yellow]")
+
+        if reconcile:
+            summary = store.reconcile(get_client())
+            console.print(
+                f"Reconciled: {summary['open']} open on the exchange, "
+                f"{summary['resolved']} closed while down, {summary['unknown']} unknown"
+            )
+
+        open_orders = store.open_orders(symbol)
+        stats = store.stats()
+        console.print(f"Loaded {stats['orders']} orders from {stats['logRecords']} log records in {stats['loadMs']:.1f}ms")
+
+        if not open_orders:
+            console.print("[bold yellow]No open orders.[/bold yellow]")
+            return
+
+        table = Table(title="Open Orders")
+        for column in ("Client Order ID", "Order ID", "Symbol", "Side", "Type", "Price", "Qty", "Filled", "Status"):
+            table.add_column(column)
+
+        for order in sorted(open_orders, key=lambda order: order.get("updateTime", 0)):
+            table.add_row(
+                order["clientOrderId"], str(order.get("orderId", "")), order["symbol"], order["side"],
+                order["type"], f"{order.get('price', 0):g}", f"{order.get('origQty', 0):g}",
+                f"{order.get('executedQty', 0):g}", order["status"],
+            )
+
+        console.print(table)
+
+    except Exception as e:
+        console.print(f"[bold red]Error: {e}[/bold red]")
+
+    finally:
+        store.close()
+
+
+# -------------------------------
+# STRATEGIES COMMAND
+# -------------------------------
+def load_strategy(spec: str):
+    import importlib
+
+    module_name, _, class_name = spec.partition(":")
+    if not class_name:
+        raise ValueError(f"Strategy must be given as module:Class, got {spec!r}")
+
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+def print_strategy_stats(stats: dict):
+    table = Table(title="Strategies")
+    for column in ("Strategy", "Bars", "Orders", "Fills", "Errors", "CPU ms", "CPU us/call", "Ack p50 ms", "Ack p99 ms"):
+        table.add_column(column)
+
+    for name, row in stats["strategies"].items():
+        latency = row["decisionToAckMs"]
+        table.add_row(
+            name, str(row["bars"]), str(row["orders"]), str(row["fills"]), str(row["errors"]),
+            f"{row['cpuMs']:.2f}", f"{row['cpuUsPerCall']:.1f}", f"{latency['p50']:g}", f"{latency['p99']:g}",
+        )
+
+    console.print(table)
+
+
+@app.command()
+def strategies(
+    strategy: list[str] = typer.Option(..., help="Strategy class as module:Class (repeatable)"),
+    stats_interval: float = typer.Option(60, help="Seconds between stats tables"),
+):
+    """Run strategies together on one event loop until Ctrl+C"""
+    import time
+
+    setup_logging()
+
+    try:
+        instances = [load_strategy(spec) for spec in strategy]
+    except (ImportError, AttributeError, ValueError) as e:
+        console.print(f"[bold red]Error loading strategy: {e}[/bold red]")
+        return
+
+    from bot.strategy import StrategyRunner
+
+    manager = get_manager(use_user_stream=True, order_store=get_order_store())
+    runner = StrategyRunner(instances, manager=manager)
+
+    try:
+        if not runner.start():
+            console.print("[bold yellow]Market data not connected yet, retrying in the background[/bold yellow]")
+
+        console.print(f"[bold blue]Running {len(instances)} strategies, Ctrl+C to stop[/bold blue]")
+        while True:
+            time.sleep(stats_interval)
+            print_strategy_stats(runner.stats())
+
+    except KeyboardInterrupt:
+        pass
+
+    finally:
+        runner.stop()
+        print_strategy_stats(runner.stats())
+        manager.close()
+
+
+# -------------------------------
+# EXECUTE COMMAND
+# -------------------------------
+@app.command()
+def execute(
+    algo: str = typer.Option(..., help="TWAP, ICEBERG or CHASE"),
+    symbol: str = typer.Option(..., help="Trading symbol e.g. BTCUSDT"),
+    side: str = typer.Option(..., help="BUY or SELL"),
+    quantity: float = typer.Option(..., help="Total (parent) quantity"),
+    duration: float = typer.Option(60, help="TWAP: seconds to spread the order over"),
+    slices: int = typer.Option(10, help="TWAP: number of child orders"),
+    price: float = typer.Option(None, help="ICEBERG: limit price; TWAP: optional limit"),
+    display_quantity: float = typer.Option(None, help="ICEBERG / CHASE: visible child size"),
+    reprice_interval: float = typer.Option(1.0, help="CHASE: seconds between reprices"),
+    max_duration: float = typer.Option(None, help="CHASE: send the rest as MARKET after this many seconds"),
+):
+    """Work a large order as child orders (TWAP, iceberg, post-only chase)"""
+    setup_logging()
+    algo = algo.upper()
+
+    try:
+        symbol = validate_symbol(symbol)
+        side = validate_side(side)
+        quantity = validate_quantity(quantity)
+
+        if algo not in ("TWAP", "ICEBERG", "CHASE"):
+            raise ValueError("Algo must be TWAP, ICEBERG or CHASE")
+        if algo == "ICEBERG" and (price is None or display_quantity is None):
+            raise ValueError("ICEBERG needs --price and --display-quantity")
+
+    except ValueError as e:
+        console.print(f"[bold red]Validation Error: {e}[/bold red]")
+        return
+
+    from bot.execution import ExecutionEngine
+
+    manager = get_manager(use_user_stream=True, order_store=get_order_store())
+    engine = ExecutionEngine(manager).start()
+
+    try:
+        if algo == "TWAP":
+            parent = engine.twap(symbol, side, quantity, duration, slices, limit_price=price)
+        elif algo == "ICEBERG":
+            parent = engine.iceberg(symbol, side, quantity, price, display_quantity)
+        else:
+            parent = engine.chase(symbol, side, quantity, display_quantity, reprice_interval, max_duration)
+
+        while not parent.wait(1):
+            status = parent.to_dict()
+            console.print(
+                f"{status['status']}: {status['filledQty']:g}/{quantity:g} ({status['progress']:.0%}), "
+                f"avg {status['avgPrice']:.8g}, {status['workingChildren']} working"
+            )
+
+        status = parent.to_dict()
+        table = Table(title=f"{algo} {side} {quantity:g} {symbol}")
+        table.add_column("Field", style="cyan")
+        table.add_column("Value", style="green")
+
+        for field in ("status", "filledQty", "avgPrice", "arrivalPrice", "slippageBps", "childOrders", "elapsedS", "error"):
+            table.add_row(field, str(status[field]))
+
+        console.print(table)
+
+    except KeyboardInterrupt:
+        console.print("[bold yellow]Cancelling working child orders...[/bold yellow]")
+
+    except ValueError as e:
+        console.print(f"[bold red]Validation Error: {e}[/bold red]")
+
+    except Exception:
+        logging.getLogger(__name__).exception("Execution failed")
+        console.print("[bold red]Unexpected error occurred. Check logs.[/bold red]")
+
+    finally:
+        engine.stop(cancel=True)
+        manager.close()
+
+
+# -------------------------------
+# BULK ORDERS COMMAND
+# -------------------------------
+@app.command()
+def bulk(
+    file: str = typer.Option(..., help="Orders as CSV (with header) or JSONL: symbol, side, type, quantity, price"),
+    output: str = typer.Option(None, help="Per-order results, JSONL or .csv (default: <file>.results.jsonl)"),
+    concurrency: int = typer.Option(8, help="Batch requests in flight at once"),
+):
+    """Place every order in a file through one client, streaming results"""
+    import os
+
+    setup_logging()
+
+    if not os.path.isfile(file):
+        console.print(f"[bold red]File not found: {file}[/bold red]")
+        return
+
+    output = output or f"{os.path.splitext(file)[0]}.results.jsonl"
+
+    from bot.bulk_orders import BulkOrderSubmitter
+
+    def progress(stats):
+        console.print(
+            f"{stats['rows']} rows: {stats['accepted']} accepted, {stats['failed']} failed, "
+            f"{stats['invalid']} invalid ({stats['ordersPerS']:.1f} orders/s)"
+        )
+
+    manager = get_manager(order_store=get_order_store())
+    submitter = BulkOrderSubmitter(manager, concurrency=concurrency, on_progress=progress)
+
+    try:
+        console.print(f"[bold blue]Submitting orders from {file}...[/bold blue]")
+        stats = submitter.run(file, output)
+
+        table = Table(title="Bulk Orders")
+        table.add_column("Field", style="cyan")
+        table.add_column("Value", style="green")
+
+        for field in ("rows", "accepted", "failed", "invalid"):
+            table.add_row(field, str(stats[field]))
+        table.add_row("elapsed", f"{stats['elapsedS']:.2f}s")
+        table.add_row("throughput", f"{stats['ordersPerS']:.1f} orders/s")
+        table.add_row("results", output)
+
+        console.print(table)
+
+    except KeyboardInterrupt:
+        console.print(f"[bold yellow]Stopped; results so far are in {output}[/bold yellow]")
+
+    except Exception:
+        logging.getLogger(__name__).exception("Bulk submission failed")
+        console.print("[bold red]Unexpected error occurred. Check logs.[/bold red]")
+
+    finally:
+        manager.close()
+
+
 # -------------------------------
 # TRADE COMMAND
 # -------------------------------
+def print_trace(order_trace: dict):
+    table = Table(title=f"Order Trace ({order_trace['total_ms']:.1f} ms)")
+    table.add_column("Phase", style="cyan")
+    table.add_column("Start (ms)", style="white")
+    table.add_column("Duration (ms)", style="green")
+    table.add_column("Details", style="yellow")
+
+    for span in order_trace["spans"]:
+        details = {k: v for k, v in span.items() if k not in ("name", "offset_ms", "duration_ms")}
+        table.add_row(
+            span["name"],
+            f"{span['offset_ms']:.1f}",
+            f"{span['duration_ms']:.1f}",
+            ", ".join(f"{k}={v}" for k, v in details.items()),
+        )
+
+    console.print(table)
+
+
 @app.command()
 def trade(
     symbol: str = typer.Option(..., help="Trading symbol e.g. BTCUSDT"),
@@ -135,12 +526,13 @@ def trade(
     type: str = typer.Option(..., help="MARKET or LIMIT"),
     quantity: float = typer.Option(..., help="Order quantity"),
     price: float = typer.Option(None, help="Required for LIMIT orders"),
+    user_stream: bool = typer.Option(False, help="Track the fill via the user-data stream"),
+    trace: bool = typer.Option(False, help="Show the order's latency trace"),
 ):
     """Place a trade order"""
 
     setup_logging()
     logger = logging.getLogger(__name__)
-    manager = OrderManager()
 
     try:
         # Validation
@@ -150,6 +542,16 @@ def trade(
         quantity = validate_quantity(quantity)
         price = validate_price(price, order_type)
 
+    except ValueError as e:
+        logger.error(f"Validation Error: {str(e)}")
+        console.print(f"[bold red]Validation Error: {e}[/bold red]")
+        return
+
+    from binance.exceptions import BinanceAPIException, BinanceRequestException
+
+    manager = get_manager(use_user_stream=user_stream, order_store=get_order_store())
+
+    try:
         console.print("\n[bold blue]Placing Order...[/bold blue]")
 
         result = manager.place_order(
@@ -172,6 +574,9 @@ def trade(
 
         console.print(table)
 
+        if trace and manager.metrics.traces:
+            print_trace(manager.metrics.traces[-1])
+
         if result["status"] == "FILLED":
             console.print("[bold green]✅ Order executed successfully![/bold green]")
         elif result["status"] == "TIMEOUT":
@@ -179,10 +584,6 @@ def trade(
         else:
             console.print(f"[bold red]Final Status: {result['status']}[/bold red]")
 
-    except ValueError as e:
-        logger.error(f"Validation Error: {str(e)}")
-        console.print(f"[bold red]Validation Error: {e}[/bold red]")
-
     except BinanceAPIException as e:
         logger.error(f"Binance API Error: {e.message}")
         console.print(f"[bold red]Binance API Error: {e.message}[/bold red]")
@@ -190,10 +591,18 @@ def trade(
     except BinanceRequestException:
         console.print("[bold red]Network Error. Check connection.[/bold red]")
 
+    except ValueError as e:
+        # Symbol filters (tick / step size, min notional), checked before sending
+        logger.error(f"Validation Error: {str(e)}")
+        console.print(f"[bold red]Validation Error: {e}[/bold red]")
+
     except Exception:
         logger.exception("Unexpected error occurred")
         console.print("[bold red]Unexpected error occurred. Check logs.[/bold red]")
 
+    finally:
+        manager.close()
+
 
 if __name__ == "__main__":
     app()
\ No newline at end of file
@@ -0,0 +1,4 @@
+# simulator/__init__.py
+
+from simulator.exchange import ExchangeError, PriceFeed, SimulatedExchange
+from simulator.server import SimulatorServer, stream_url_for
@@ -0,0 +1,64 @@
+# simulator/__main__.py
+
+"""
+Run the simulated futures exchange on localhost.
+
+Point the bot at it with BINANCE_SIMULATOR_URL=http://127.0.0.1:8900
+(no API keys needed).
+
+Run: python -m simulator --port 8900 --latency-ms 50 --error-rate 0.01
+"""
+
+import argparse
+import logging
+import time
+
+from simulator.exchange import (
+    DEFAULT_BALANCE,
+    DEFAULT_FILL_DELAY,
+    PRICE_INTERVAL,
+    REPLAY_CSV,
+    PriceFeed,
+    SimulatedExchange,
+)
+from simulator.server import DEFAULT_HOST, DEFAULT_PORT, WEIGHT_LIMIT, SimulatorServer
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests failed with a 503")
+    parser.add_argument("--weight-limit", type=int, default=WEIGHT_LIMIT, help="request weight per minute")
+    parser.add_argument("--replay", default=REPLAY_CSV, help="kline CSV whose closes drive BTCUSDT")
+    parser.add_argument("--price-interval", type=float, default=PRICE_INTERVAL, help="seconds per replayed price")
+    parser.add_argument("--fill-delay", type=float, default=DEFAULT_FILL_DELAY, help="seconds until MARKET orders fill")
+    parser.add_argument("--balance", type=float, default=DEFAULT_BALANCE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    exchange = SimulatedExchange(
+        prices=PriceFeed(args.replay),
+        initial_balance=args.balance,
+        fill_delay=args.fill_delay,
+        price_interval=args.price_interval,
+    )
+    server = SimulatorServer(
+        exchange,
+        host=args.host,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        weight_limit=args.weight_limit,
+    )
+
+    with server:
+        print(f"Simulator running: BINANCE_SIMULATOR_URL={server.url}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
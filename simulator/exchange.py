@@ -0,0 +1,893 @@
+# simulator/exchange.py
+
+import csv
+import logging
+import math
+import os
+import random
+import secrets
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPLAY_CSV = os.path.join(BASE_DIR, "historical_data", "btc_futures_data.csv")
+
+DEFAULT_SYMBOL = "BTCUSDT"
+DEFAULT_PRICE = 100.0
+DEFAULT_BALANCE = 10_000.0
+DEFAULT_LEVERAGE = 20
+DEFAULT_FEE_RATE = 0.0004
+DEFAULT_SLIPPAGE_BPS = 1.0
+
+# A MARKET order is acknowledged as NEW and filled this many seconds later,
+# so the fill tracking paths (stream and REST polling) get exercised
+DEFAULT_FILL_DELAY = 0.2
+TICK_INTERVAL = 0.05
+PRICE_INTERVAL = 1.0
+
+INTERVAL_UNITS_MS = {
+    "m": 60_000,
+    "h": 3_600_000,
+    "d": 86_400_000,
+    "w": 604_800_000,
+}
+
+FINAL_STATUSES = ("FILLED", "CANCELED", "REJECTED", "EXPIRED")
+
+# Price levels per side of the synthetic order books
+DEPTH_LEVELS = 200
+
+# Symbols listed in exchangeInfo; orders for any other symbol are rejected
+LISTED_SYMBOLS = (
+    "BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT", "XRPUSDT",
+    "ADAUSDT", "DOGEUSDT", "LTCUSDT", "LINKUSDT", "AVAXUSDT",
+)
+# Trading rules of every listed symbol; the tick size follows its price (see tick_size)
+STEP_SIZE = 0.001
+MAX_QTY = 10_000.0
+MARKET_MAX_QTY = 1_000.0
+MIN_NOTIONAL = 5.0
+
+
+class ExchangeError(Exception):
+    """A Binance-style API error: JSON body {"code", "msg"} with an HTTP status."""
+
+    def __init__(self, code: int, msg: str, status: int = 400):
+        super().__init__(msg)
+        self.code = code
+        self.msg = msg
+        self.status = status
+
+
+def interval_ms(interval: str) -> int:
+    try:
+        return int(interval[:-1]) * INTERVAL_UNITS_MS[interval[-1]]
+    except (KeyError, ValueError, IndexError):
+        raise ExchangeError(-1120, "Invalid interval.") from None
+
+
+def _num(value) -> str:
+    # The exchange sends every decimal as a string
+    return f"{value:.8f}".rstrip("0").rstrip(".") if value else "0"
+
+
+def _param(params: dict, name: str, cast=str, default=None, required=False):
+    value = params.get(name)
+
+    if value is None or value == "":
+        if required:
+            raise ExchangeError(
+                -1102,
+                f"Mandatory parameter '{name}' was not sent, was empty/null, or malformed.",
+            )
+        return default
+
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        raise ExchangeError(-1102, f"Parameter '{name}' was malformed.") from None
+
+
+# -------------------------------
+# PRICES
+# -------------------------------
+class PriceFeed:
+    """
+    Mark price per symbol.
+
+    The replay symbol walks through the close prices of a kline CSV (the
+    repo's ``btc_futures_data.csv`` by default) one row per ``step``,
+    wrapping at the end; any other symbol follows a seeded random walk.
+    """
+
+    def __init__(self, replay: str = REPLAY_CSV, replay_symbol: str = DEFAULT_SYMBOL,
+                 volatility: float = 0.001, seed: int = 7):
+        self.replay_symbol = replay_symbol
+        self.volatility = volatility
+        self._rng = random.Random(seed)
+
+        self.replay_rows = _read_kline_csv(replay) if replay else []
+        self.replay_interval = "1d"
+        self._replay_index = 0
+
+        self._prices = {}
+        if self.replay_rows:
+            self._prices[replay_symbol] = self.replay_rows[0][4]
+
+    def price(self, symbol: str) -> float:
+        if symbol not in self._prices:
+            self._prices[symbol] = DEFAULT_PRICE
+        return self._prices[symbol]
+
+    def set_price(self, symbol: str, price: float):
+        self._prices[symbol] = float(price)
+
+    def snapshot(self) -> dict:
+        return dict(self._prices)
+
+    def step(self):
+        if self.replay_rows:
+            self._replay_index = (self._replay_index + 1) % len(self.replay_rows)
+
+        for symbol, price in self._prices.items():
+            if symbol == self.replay_symbol and self.replay_rows:
+                self._prices[symbol] = self.replay_rows[self._replay_index][4]
+            else:
+                self._prices[symbol] = price * math.exp(self._rng.gauss(0, self.volatility))
+
+
+class SyntheticBook:
+    """
+    Order book around a symbol's mark price, for the depth endpoint and stream.
+
+    Levels sit one tick apart on each side of the mark price. Quantities
+    are a fixed function of the level, except near the top where they
+    change every step, so each ``step`` yields a realistic diff: levels
+    the moving price uncovers or passes over, plus the busy top of book.
+    """
+
+    def __init__(self, symbol: str, price: float, levels: int = DEPTH_LEVELS, tick: float = None):
+        self.symbol = symbol
+        self.levels = levels
+        self.tick = tick or tick_size(price)
+        self.update_id = 1
+        self._version = 0
+        self.bids, self.asks = self._levels(price)
+
+    def _qty(self, level: int, near_top: bool) -> float:
+        qty = 0.001 * (1 + (level * 2654435761) % 997)
+        if near_top:
+            qty *= 1 + (level + self._version) % 4 * 0.25
+        return round(qty, 3)
+
+    def _levels(self, price: float) -> tuple:
+        mid = int(round(price / self.tick))
+        bids = {k: self._qty(k, mid - k <= 5) for k in range(mid - self.levels, mid)}
+        asks = {k: self._qty(k, k - mid <= 5) for k in range(mid + 1, mid + self.levels + 1)}
+        return bids, asks
+
+    def _price(self, level: int) -> str:
+        return _num(round(level * self.tick, 8))
+
+    def snapshot(self, limit: int) -> dict:
+        now = int(time.time() * 1000)
+        return {
+            "lastUpdateId": self.update_id,
+            "E": now,
+            "T": now,
+            "bids": [[self._price(k), _num(self.bids[k])] for k in sorted(self.bids, reverse=True)[:limit]],
+            "asks": [[self._price(k), _num(self.asks[k])] for k in sorted(self.asks)[:limit]],
+        }
+
+    def step(self, price: float, now: int) -> dict:
+        """Move the book to ``price``; return the depthUpdate event."""
+        self._version += 1
+        bids, asks = self._levels(price)
+
+        def diff(old, new):
+            changes = [(k, q) for k, q in new.items() if old.get(k) != q]
+            changes += [(k, 0.0) for k in old if k not in new]
+            return [[self._price(k), _num(q)] for k, q in sorted(changes)]
+
+        event = {
+            "e": "depthUpdate",
+            "E": now,
+            "T": now,
+            "s": self.symbol,
+            "U": self.update_id + 1,
+            "u": self.update_id + 1 + self._version % 3,
+            "pu": self.update_id,
+            "b": diff(self.bids, bids),
+            "a": diff(self.asks, asks),
+        }
+
+        self.update_id = event["u"]
+        self.bids, self.asks = bids, asks
+        return event
+
+
+def tick_size(price: float) -> float:
+    """Tick size for a symbol trading around ``price``: about 5 significant digits."""
+    return 10.0 ** (math.floor(math.log10(price)) - 4)
+
+
+def _on_step(value: float, step: float) -> bool:
+    return abs(value / step - round(value / step)) < 1e-6
+
+
+def _read_kline_csv(path: str) -> list:
+    """Rows of [open_ms, open, high, low, close, volume, close_ms] from a kline CSV."""
+    rows = []
+
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            opened = datetime.fromisoformat(row["open_time"]).replace(tzinfo=timezone.utc)
+            closed = datetime.fromisoformat(row["close_time"]).replace(tzinfo=timezone.utc)
+            rows.append([
+                int(opened.timestamp() * 1000),
+                float(row["open"]),
+                float(row["high"]),
+                float(row["low"]),
+                float(row["close"]),
+                float(row["volume"]),
+                int(closed.timestamp() * 1000),
+            ])
+
+    return rows
+
+
+def synthetic_klines(symbol: str, step_ms: int, start_ms: int, end_ms: int, limit: int, base: float) -> list:
+    """
+    Deterministic candles for any symbol and interval.
+
+    Prices are a pure function of (symbol, open time), so overlapping or
+    sharded range requests always agree with each other.
+    """
+    first = -(-start_ms // step_ms) * step_ms
+    opens = np.arange(first, end_ms + 1, step_ms, dtype=np.int64)[:limit]
+    seed = zlib.crc32(symbol.encode())
+
+    def mid(t):
+        days = t / 86_400_000
+        return base * (1 + 0.05 * np.sin(days / 7 + seed % 7) + 0.01 * np.sin(days * 3 + seed % 3))
+
+    noise = ((opens // step_ms * 2654435761 + seed) % 2**32) / 2**32
+    open_ = mid(opens)
+    close = mid(opens + step_ms)
+    high = np.maximum(open_, close) * (1 + 0.002 * noise)
+    low = np.minimum(open_, close) * (1 - 0.002 * (1 - noise))
+    volume = 100 + 1000 * noise
+
+    return [
+        [int(t), _num(o), _num(h), _num(lo), _num(c), _num(v), int(t) + step_ms - 1,
+         _num(v * c), 100, _num(v / 2), _num(v * c / 2), "0"]
+        for t, o, h, lo, c, v in zip(opens.tolist(), open_.tolist(), high.tolist(),
+                                     low.tolist(), close.tolist(), volume.tolist())
+    ]
+
+
+# -------------------------------
+# EXCHANGE
+# -------------------------------
+class SimulatedExchange:
+    """
+    In-memory USD-M futures account with a simple matching engine.
+
+    One-way position mode, one USDT wallet, cross margin. MARKET orders
+    fill ``fill_delay`` seconds after acknowledgement at the mark price
+    plus slippage; LIMIT orders rest until the mark price crosses them.
+    Every order and balance change is also published as a user-data
+    stream event to the registered listeners.
+    """
+
+    def __init__(
+        self,
+        prices: PriceFeed = None,
+        initial_balance: float = DEFAULT_BALANCE,
+        leverage: int = DEFAULT_LEVERAGE,
+        fee_rate: float = DEFAULT_FEE_RATE,
+        slippage_bps: float = DEFAULT_SLIPPAGE_BPS,
+        fill_delay: float = DEFAULT_FILL_DELAY,
+        price_interval: float = PRICE_INTERVAL,
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.prices = prices or PriceFeed()
+        self.leverage = leverage
+        self.fee_rate = fee_rate
+        self.slippage = slippage_bps / 10_000
+        self.fill_delay = fill_delay
+        self.price_interval = price_interval
+
+        self._lock = threading.RLock()
+        self._listeners = []
+        self._tick_listeners = []
+        self._listen_keys = set()
+        self._books = {}
+        # symbol -> tick size, fixed at the price the symbol is first seen at
+        self._ticks = {}
+
+        self.wallet = initial_balance
+        self.positions = {}
+        self.orders = {}
+        self.trades = []
+        self._open_orders = []
+        self._order_ids = 0
+        self._trade_ids = 0
+
+        self._thread = None
+        self._stopping = threading.Event()
+
+    # -------------------------------
+    # LIFECYCLE
+    # -------------------------------
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="sim-matching", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _run(self):
+        next_price = time.monotonic() + self.price_interval
+
+        while not self._stopping.wait(TICK_INTERVAL):
+            if self.price_interval and time.monotonic() >= next_price:
+                now = int(time.time() * 1000)
+                with self._lock:
+                    self.prices.step()
+                    prices = self.prices.snapshot()
+                    depth = {
+                        symbol: book.step(prices[symbol], now)
+                        for symbol, book in self._books.items()
+                    }
+                next_price += self.price_interval
+
+                for callback in list(self._tick_listeners):
+                    try:
+                        callback(prices, now, depth)
+                    except Exception:
+                        self.logger.exception("Simulator tick listener failed")
+
+            self.match()
+
+    def add_listener(self, callback):
+        """Register ``callback(event)`` for user-data stream events."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def add_tick_listener(self, callback):
+        """Register ``callback(prices, time_ms, depth_updates)`` for every mark price step (market streams)."""
+        self._tick_listeners.append(callback)
+
+    def remove_tick_listener(self, callback):
+        if callback in self._tick_listeners:
+            self._tick_listeners.remove(callback)
+
+    def _publish(self, events: list):
+        for event in events:
+            for callback in list(self._listeners):
+                try:
+                    callback(event)
+                except Exception:
+                    self.logger.exception("Simulator event listener failed")
+
+    # -------------------------------
+    # ORDERS
+    # -------------------------------
+    def new_order(self, params: dict) -> dict:
+        symbol = _param(params, "symbol", required=True).upper()
+        side = _param(params, "side", required=True).upper()
+        order_type = _param(params, "type", required=True).upper()
+        quantity = _param(params, "quantity", float, required=True)
+
+        if symbol not in LISTED_SYMBOLS:
+            raise ExchangeError(-1121, "Invalid symbol.")
+        if side not in ("BUY", "SELL"):
+            raise ExchangeError(-1117, "Invalid side.")
+        if order_type not in ("MARKET", "LIMIT"):
+            raise ExchangeError(-1116, "Invalid orderType.")
+        if quantity <= 0:
+            raise ExchangeError(-4003, "Quantity less than or equal to zero.")
+
+        price = 0.0
+        if order_type == "LIMIT":
+            price = _param(params, "price", float, required=True)
+            time_in_force = _param(params, "timeInForce", required=True)
+            if price <= 0:
+                raise ExchangeError(-4001, "Price less than or equal to zero.")
+
+        now = int(time.time() * 1000)
+
+        with self._lock:
+            mark = self.prices.price(symbol)
+            if order_type == "LIMIT" and time_in_force == "GTX" and (price >= mark if side == "BUY" else price <= mark):
+                raise ExchangeError(
+                    -5022, "Due to the order could not be executed as maker, the Post Only order will be rejected."
+                )
+
+            self._check_filters(symbol, order_type, quantity, price, mark)
+            self._check_margin(symbol, side, quantity, price or mark)
+
+            self._order_ids += 1
+            order = {
+                "orderId": self._order_ids,
+                "symbol": symbol,
+                "status": "NEW",
+                "clientOrderId": params.get("newClientOrderId") or f"sim_{self._order_ids}",
+                "price": _num(price),
+                "avgPrice": "0",
+                "origQty": _num(quantity),
+                "executedQty": "0",
+                "cumQuote": "0",
+                "timeInForce": params.get("timeInForce", "GTC"),
+                "type": order_type,
+                "origType": order_type,
+                "side": side,
+                "positionSide": "BOTH",
+                "reduceOnly": False,
+                "updateTime": now,
+            }
+            self.orders[order["orderId"]] = order
+            self._open_orders.append((order["orderId"], time.monotonic() + self.fill_delay))
+            events = [self._order_event(order, "NEW")]
+
+            if order_type == "MARKET" and self.fill_delay <= 0:
+                events += self._match_locked(time.monotonic())
+
+            response = dict(order)
+
+        self._publish(events)
+        return response
+
+    def batch_orders(self, orders: list) -> list:
+        results = []
+
+        for params in orders:
+            try:
+                results.append(self.new_order(params))
+            except ExchangeError as e:
+                results.append({"code": e.code, "msg": e.msg})
+
+        return results
+
+    def get_order(self, params: dict) -> dict:
+        order_id = _param(params, "orderId", int)
+        client_order_id = params.get("origClientOrderId")
+        if order_id is None and not client_order_id:
+            raise ExchangeError(-1102, "Either orderId or origClientOrderId must be sent.")
+
+        with self._lock:
+            order = self.orders.get(order_id) if order_id is not None else next(
+                (o for o in self.orders.values() if o["clientOrderId"] == client_order_id), None
+            )
+            if order is None or order["symbol"] != params.get("symbol", order["symbol"]).upper():
+                raise ExchangeError(-2013, "Order does not exist.")
+            return dict(order)
+
+    def open_orders(self, params: dict) -> list:
+        symbol = (params.get("symbol") or "").upper()
+
+        with self._lock:
+            return [
+                dict(self.orders[order_id]) for order_id, _ in self._open_orders
+                if not symbol or self.orders[order_id]["symbol"] == symbol
+            ]
+
+    def cancel_order(self, params: dict) -> dict:
+        order_id = _param(params, "orderId", int)
+        client_order_id = params.get("origClientOrderId")
+
+        with self._lock:
+            order = self.orders.get(order_id) if order_id is not None else next(
+                (o for o in self.orders.values() if o["clientOrderId"] == client_order_id), None
+            )
+            if order is None or order["status"] in FINAL_STATUSES:
+                raise ExchangeError(-2011, "Unknown order sent.")
+
+            order.update(status="CANCELED", updateTime=int(time.time() * 1000))
+            self._open_orders = [(i, fill_at) for i, fill_at in self._open_orders if i != order["orderId"]]
+            events = [self._order_event(order, "CANCELED")]
+            response = dict(order)
+
+        self._publish(events)
+        return response
+
+    def _check_filters(self, symbol: str, order_type: str, quantity: float, price: float, mark: float):
+        if price and not _on_step(price, self.tick_size(symbol)):
+            raise ExchangeError(-4014, "Price not increased by tick size.")
+        if not _on_step(quantity, STEP_SIZE):
+            raise ExchangeError(-1111, "Precision is over the maximum defined for this asset.")
+        if quantity < STEP_SIZE:
+            raise ExchangeError(-4004, "Quantity less than min quantity.")
+        if quantity > (MARKET_MAX_QTY if order_type == "MARKET" else MAX_QTY):
+            raise ExchangeError(-4005, "Quantity greater than max quantity.")
+        if quantity * (price or mark) < MIN_NOTIONAL:
+            raise ExchangeError(
+                -4164, f"Order's notional must be no smaller than {MIN_NOTIONAL:g} (unless you choose reduce only)."
+            )
+
+    def _check_margin(self, symbol: str, side: str, quantity: float, price: float):
+        amount = self.positions.get(symbol, (0.0, 0.0))[0]
+        signed = quantity if side == "BUY" else -quantity
+
+        # Reducing orders never need extra margin
+        if amount and (amount > 0) != (signed > 0) and abs(signed) <= abs(amount):
+            return
+
+        if quantity * price / self.leverage > self._available():
+            raise ExchangeError(-2019, "Margin is insufficient.")
+
+    # -------------------------------
+    # MATCHING
+    # -------------------------------
+    def match(self):
+        with self._lock:
+            events = self._match_locked(time.monotonic())
+        self._publish(events)
+
+    def _match_locked(self, now: float) -> list:
+        events = []
+        still_open = []
+
+        for order_id, fill_at in self._open_orders:
+            order = self.orders[order_id]
+            mark = self.prices.price(order["symbol"])
+            buy = order["side"] == "BUY"
+
+            if order["type"] == "MARKET":
+                fill_price = mark * (1 + self.slippage if buy else 1 - self.slippage) if now >= fill_at else None
+            else:
+                limit = float(order["price"])
+                fill_price = limit if (mark <= limit if buy else mark >= limit) else None
+
+            if fill_price is None:
+                still_open.append((order_id, fill_at))
+                continue
+
+            events += self._fill(order, fill_price)
+
+        self._open_orders = still_open
+        return events
+
+    def _fill(self, order: dict, price: float) -> list:
+        symbol = order["symbol"]
+        quantity = float(order["origQty"])
+        signed = quantity if order["side"] == "BUY" else -quantity
+        now = int(time.time() * 1000)
+
+        amount, entry = self.positions.get(symbol, (0.0, 0.0))
+        realized = 0.0
+
+        if amount == 0 or (amount > 0) == (signed > 0):
+            new_amount = amount + signed
+            entry = (amount * entry + signed * price) / new_amount
+        else:
+            closed = min(abs(signed), abs(amount))
+            realized = closed * (price - entry) * (1 if amount > 0 else -1)
+            new_amount = amount + signed
+
+            if abs(new_amount) < 1e-12:
+                new_amount, entry = 0.0, 0.0
+            elif (new_amount > 0) != (amount > 0):
+                # Flipped through zero: the remainder opens at the fill price
+                entry = price
+
+        commission = quantity * price * self.fee_rate
+        self.wallet += realized - commission
+        self.positions[symbol] = (new_amount, entry)
+
+        self._trade_ids += 1
+        self.trades.append({
+            "symbol": symbol,
+            "id": self._trade_ids,
+            "orderId": order["orderId"],
+            "side": order["side"],
+            "price": _num(price),
+            "qty": order["origQty"],
+            "realizedPnl": _num(realized),
+            "marginAsset": "USDT",
+            "quoteQty": _num(quantity * price),
+            "commission": _num(commission),
+            "commissionAsset": "USDT",
+            "time": now,
+            "positionSide": "BOTH",
+            "buyer": order["side"] == "BUY",
+            "maker": order["type"] == "LIMIT",
+        })
+
+        order.update(
+            status="FILLED",
+            avgPrice=_num(price),
+            executedQty=order["origQty"],
+            cumQuote=_num(quantity * price),
+            updateTime=now,
+        )
+
+        return [
+            self._order_event(order, "TRADE", price, commission, realized),
+            self._account_event(symbol),
+        ]
+
+    # -------------------------------
+    # ACCOUNT
+    # -------------------------------
+    def _unrealized(self, symbol: str) -> float:
+        amount, entry = self.positions.get(symbol, (0.0, 0.0))
+        return amount * (self.prices.price(symbol) - entry)
+
+    def _initial_margin(self) -> float:
+        return sum(
+            abs(amount) * self.prices.price(symbol) / self.leverage
+            for symbol, (amount, _) in self.positions.items()
+        )
+
+    def _available(self) -> float:
+        unrealized = sum(self._unrealized(symbol) for symbol in self.positions)
+        return self.wallet + unrealized - self._initial_margin()
+
+    def balance(self) -> list:
+        with self._lock:
+            unrealized = sum(self._unrealized(symbol) for symbol in self.positions)
+            available = self._available()
+
+            return [{
+                "accountAlias": "SIM",
+                "asset": "USDT",
+                "balance": _num(self.wallet),
+                "crossWalletBalance": _num(self.wallet),
+                "crossUnPnl": _num(unrealized),
+                "availableBalance": _num(available),
+                "maxWithdrawAmount": _num(max(available, 0.0)),
+                "marginAvailable": True,
+                "updateTime": int(time.time() * 1000),
+            }]
+
+    def position_risk(self, params: dict) -> list:
+        symbol = params.get("symbol")
+
+        with self._lock:
+            symbols = set(self.positions) | {self.prices.replay_symbol}
+            if symbol:
+                symbols = {symbol.upper()}
+
+            return [self._position(s) for s in sorted(symbols)]
+
+    def _position(self, symbol: str) -> dict:
+        amount, entry = self.positions.get(symbol, (0.0, 0.0))
+        mark = self.prices.price(symbol)
+
+        return {
+            "symbol": symbol,
+            "positionSide": "BOTH",
+            "positionAmt": _num(amount),
+            "entryPrice": _num(entry),
+            "breakEvenPrice": _num(entry),
+            "markPrice": _num(mark),
+            "unRealizedProfit": _num(self._unrealized(symbol)),
+            "liquidationPrice": "0",
+            "leverage": str(self.leverage),
+            "marginAsset": "USDT",
+            "notional": _num(amount * mark),
+            "initialMargin": _num(abs(amount) * mark / self.leverage),
+            "isolatedMargin": "0",
+            "updateTime": int(time.time() * 1000),
+        }
+
+    def user_trades(self, params: dict) -> list:
+        symbol = params.get("symbol")
+        from_id = _param(params, "fromId", int)
+        start = _param(params, "startTime", int)
+        end = _param(params, "endTime", int)
+        limit = min(_param(params, "limit", int, 500), 1000)
+
+        with self._lock:
+            trades = [
+                trade for trade in self.trades
+                if (not symbol or trade["symbol"] == symbol.upper())
+                and (start is None or trade["time"] >= start)
+                and (end is None or trade["time"] <= end)
+            ]
+
+        if from_id is not None:
+            return [trade for trade in trades if trade["id"] >= from_id][:limit]
+
+        return trades[-limit:]
+
+    def income(self, params: dict) -> list:
+        symbol = params.get("symbol")
+        income_type = params.get("incomeType")
+        start = _param(params, "startTime", int)
+        end = _param(params, "endTime", int)
+        limit = min(_param(params, "limit", int, 100), 1000)
+
+        with self._lock:
+            trades = [
+                trade for trade in self.trades
+                if (not symbol or trade["symbol"] == symbol.upper())
+                and (start is None or trade["time"] >= start)
+                and (end is None or trade["time"] <= end)
+            ]
+
+        rows = []
+        for trade in trades:
+            for kind, field in (("REALIZED_PNL", "realizedPnl"), ("COMMISSION", "commission")):
+                if (income_type and kind != income_type) or float(trade[field]) == 0:
+                    continue
+                rows.append({
+                    "symbol": trade["symbol"],
+                    "incomeType": kind,
+                    "income": trade[field] if kind == "REALIZED_PNL" else _num(-float(trade[field])),
+                    "asset": "USDT",
+                    "info": kind,
+                    "time": trade["time"],
+                    "tranId": trade["id"] * 2 + (kind == "COMMISSION"),
+                    "tradeId": str(trade["id"]),
+                })
+
+        return rows[:limit]
+
+    # -------------------------------
+    # MARKET DATA
+    # -------------------------------
+    def klines(self, params: dict) -> list:
+        symbol = _param(params, "symbol", required=True).upper()
+        interval = _param(params, "interval", required=True)
+        step = interval_ms(interval)
+        limit = min(_param(params, "limit", int, 500), 1500)
+
+        end = _param(params, "endTime", int, int(time.time() * 1000))
+        start = _param(params, "startTime", int)
+        if start is None:
+            start = end - step * limit
+
+        prices = self.prices
+        if symbol == prices.replay_symbol and interval == prices.replay_interval and prices.replay_rows:
+            return [
+                [row[0], _num(row[1]), _num(row[2]), _num(row[3]), _num(row[4]),
+                 _num(row[5]), row[6], "0", 0, "0", "0", "0"]
+                for row in prices.replay_rows
+                if start <= row[0] <= end
+            ][:limit]
+
+        with self._lock:
+            base = prices.price(symbol)
+
+        return synthetic_klines(symbol, step, start, end, limit, base)
+
+    def book(self, symbol: str) -> SyntheticBook:
+        """The symbol's order book; depth updates are published from the first call on."""
+        with self._lock:
+            if symbol not in self._books:
+                self._books[symbol] = SyntheticBook(symbol, self.prices.price(symbol), tick=self.tick_size(symbol))
+            return self._books[symbol]
+
+    def tick_size(self, symbol: str) -> float:
+        with self._lock:
+            if symbol not in self._ticks:
+                self._ticks[symbol] = tick_size(self.prices.price(symbol))
+            return self._ticks[symbol]
+
+    def exchange_info(self) -> dict:
+        symbols = []
+
+        for symbol in LISTED_SYMBOLS:
+            tick = self.tick_size(symbol)
+            symbols.append({
+                "symbol": symbol,
+                "pair": symbol,
+                "contractType": "PERPETUAL",
+                "status": "TRADING",
+                "baseAsset": symbol[:-4],
+                "quoteAsset": "USDT",
+                "marginAsset": "USDT",
+                "pricePrecision": max(0, -math.floor(math.log10(tick))),
+                "quantityPrecision": 3,
+                "orderTypes": ["LIMIT", "MARKET"],
+                "timeInForce": ["GTC", "IOC", "FOK", "GTX"],
+                "filters": [
+                    {"filterType": "PRICE_FILTER", "minPrice": _num(tick), "maxPrice": "1000000", "tickSize": _num(tick)},
+                    {"filterType": "LOT_SIZE", "minQty": _num(STEP_SIZE), "maxQty": _num(MAX_QTY), "stepSize": _num(STEP_SIZE)},
+                    {"filterType": "MARKET_LOT_SIZE", "minQty": _num(STEP_SIZE), "maxQty": _num(MARKET_MAX_QTY),
+                     "stepSize": _num(STEP_SIZE)},
+                    {"filterType": "MIN_NOTIONAL", "notional": _num(MIN_NOTIONAL)},
+                ],
+            })
+
+        return {"timezone": "UTC", "serverTime": int(time.time() * 1000), "symbols": symbols}
+
+    def depth(self, params: dict) -> dict:
+        symbol = _param(params, "symbol", required=True).upper()
+        limit = _param(params, "limit", int, 500)
+
+        if limit not in (5, 10, 20, 50, 100, 500, 1000):
+            raise ExchangeError(-1100, "Illegal characters found in parameter 'limit'.")
+
+        book = self.book(symbol)
+        with self._lock:
+            return book.snapshot(limit)
+
+    # -------------------------------
+    # USER DATA STREAM
+    # -------------------------------
+    def new_listen_key(self) -> dict:
+        key = secrets.token_hex(32)
+        self._listen_keys.add(key)
+        return {"listenKey": key}
+
+    def keepalive_listen_key(self, params: dict) -> dict:
+        key = params.get("listenKey")
+        if key not in self._listen_keys:
+            raise ExchangeError(-1125, "This listenKey does not exist.")
+        return {"listenKey": key}
+
+    def close_listen_key(self, params: dict) -> dict:
+        self._listen_keys.discard(params.get("listenKey"))
+        return {}
+
+    def is_listen_key(self, key: str) -> bool:
+        return key in self._listen_keys
+
+    def _order_event(self, order: dict, execution: str, price: float = 0.0,
+                     commission: float = 0.0, realized: float = 0.0) -> dict:
+        now = int(time.time() * 1000)
+        return {
+            "e": "ORDER_TRADE_UPDATE",
+            "E": now,
+            "T": now,
+            "o": {
+                "s": order["symbol"],
+                "c": order["clientOrderId"],
+                "S": order["side"],
+                "o": order["type"],
+                "f": order["timeInForce"],
+                "q": order["origQty"],
+                "p": order["price"],
+                "ap": order["avgPrice"],
+                "x": execution,
+                "X": order["status"],
+                "i": order["orderId"],
+                "l": order["executedQty"] if execution == "TRADE" else "0",
+                "z": order["executedQty"],
+                "L": _num(price),
+                "n": _num(commission),
+                "N": "USDT",
+                "T": now,
+                "t": self._trade_ids if execution == "TRADE" else 0,
+                "rp": _num(realized),
+                "ps": "BOTH",
+            },
+        }
+
+    def _account_event(self, symbol: str) -> dict:
+        amount, entry = self.positions.get(symbol, (0.0, 0.0))
+        now = int(time.time() * 1000)
+        return {
+            "e": "ACCOUNT_UPDATE",
+            "E": now,
+            "T": now,
+            "a": {
+                "m": "ORDER",
+                "B": [{"a": "USDT", "wb": _num(self.wallet), "cw": _num(self.wallet), "bc": "0"}],
+                "P": [{
+                    "s": symbol,
+                    "pa": _num(amount),
+                    "ep": _num(entry),
+                    "up": _num(self._unrealized(symbol)),
+                    "mt": "cross",
+                    "ps": "BOTH",
+                }],
+            },
+        }
@@ -0,0 +1,556 @@
+# simulator/server.py
+
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, parse_qsl, unquote, urlsplit
+
+from bot.client import STREAM_PORT_OFFSET, stream_url_for
+from simulator.exchange import ExchangeError, SimulatedExchange, _num, interval_ms
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8900
+WEIGHT_LIMIT = 2400
+ORDER_LIMIT = 1200
+
+# Request weight per (method, path), as on the real USD-M futures API
+PATH_WEIGHTS = {
+    ("GET", "/fapi/v1/ping"): 1,
+    ("GET", "/fapi/v1/time"): 1,
+    ("GET", "/fapi/v1/exchangeInfo"): 1,
+    ("GET", "/fapi/v1/klines"): None,
+    ("GET", "/fapi/v1/depth"): None,
+    ("POST", "/fapi/v1/order"): 1,
+    ("GET", "/fapi/v1/order"): 1,
+    ("DELETE", "/fapi/v1/order"): 1,
+    ("GET", "/fapi/v1/openOrders"): None,
+    ("POST", "/fapi/v1/batchOrders"): 5,
+    ("GET", "/fapi/v2/balance"): 5,
+    ("GET", "/fapi/v3/balance"): 5,
+    ("GET", "/fapi/v2/positionRisk"): 5,
+    ("GET", "/fapi/v3/positionRisk"): 5,
+    ("GET", "/fapi/v1/userTrades"): 5,
+    ("GET", "/fapi/v1/income"): 30,
+    ("POST", "/fapi/v1/listenKey"): 1,
+    ("PUT", "/fapi/v1/listenKey"): 1,
+    ("DELETE", "/fapi/v1/listenKey"): 1,
+}
+
+
+def depth_weight(limit: int) -> int:
+    if limit <= 50:
+        return 2
+    if limit <= 100:
+        return 5
+    if limit <= 500:
+        return 10
+    return 20
+
+
+def klines_weight(limit: int) -> int:
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+class SimulatorServer:
+    """
+    Localhost stand-in for the Binance USD-M futures REST API and user-data stream.
+
+    Serves the endpoints this project calls (order create / query /
+    cancel, open orders, batch orders, balance, positionRisk, userTrades,
+    exchangeInfo, klines, depth, listenKey) from a SimulatedExchange, plus the
+    user-data and market (aggTrade / kline / diff depth / mark price)
+    websockets on the next port.
+    ``latency_ms`` / ``jitter_ms`` delay every response, ``error_rate``
+    fails that share of requests with a 503, and requests beyond
+    ``weight_limit`` per minute get a 429 with Retry-After, exactly like
+    the real API. All knobs may be changed while the server runs.
+    """
+
+    def __init__(
+        self,
+        exchange: SimulatedExchange = None,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        weight_limit: int = WEIGHT_LIMIT,
+        order_limit: int = ORDER_LIMIT,
+        seed: int = None,
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.exchange = exchange or SimulatedExchange()
+        self.host = host
+        self.port = port
+
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.weight_limit = weight_limit
+        self.order_limit = order_limit
+        self._rng = random.Random(seed)
+
+        self._limit_lock = threading.Lock()
+        self._window = 0
+        self._used_weight = 0
+        self._order_count = 0
+
+        self.requests = 0
+        self.rate_limited = 0
+        self.injected_errors = 0
+
+        self._http = None
+        self._http_thread = None
+        self._ws_loop = None
+        self._ws_thread = None
+        self._ws_ready = threading.Event()
+        self._ws_stop = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def stream_url(self) -> str:
+        return stream_url_for(self.url)
+
+    # -------------------------------
+    # LIFECYCLE
+    # -------------------------------
+    def start(self) -> "SimulatorServer":
+        self._http = _bind_http(self)
+        self.port = self._http.server_address[1]
+
+        self._http_thread = threading.Thread(
+            target=self._http.serve_forever, name="sim-http", daemon=True
+        )
+        self._http_thread.start()
+
+        self._ws_thread = threading.Thread(target=self._run_stream, name="sim-stream", daemon=True)
+        self._ws_thread.start()
+        self._ws_ready.wait(5)
+
+        self.exchange.start()
+        self.logger.info(f"Simulator listening on {self.url} (stream {self.stream_url})")
+        return self
+
+    def stop(self):
+        self.exchange.stop()
+
+        if self._ws_loop is not None and self._ws_stop is not None:
+            self._ws_loop.call_soon_threadsafe(self._ws_stop.set)
+            self._ws_thread.join(timeout=5)
+
+        if self._http is not None:
+            self._http.shutdown()
+            self._http.server_close()
+            self._http = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self) -> dict:
+        with self._limit_lock:
+            return {
+                "requests": self.requests,
+                "rateLimited": self.rate_limited,
+                "injectedErrors": self.injected_errors,
+                "usedWeight1m": self._used_weight,
+                "orderCount1m": self._order_count,
+            }
+
+    # -------------------------------
+    # REQUEST HANDLING
+    # -------------------------------
+    def _admit(self, method: str, path: str, params: dict) -> tuple:
+        """Charge the request's weight; return (status, retry_after, headers)."""
+        weight = PATH_WEIGHTS.get((method, path), 1)
+        if path == "/fapi/v1/openOrders":
+            # 1 for one symbol, 40 for all of them
+            weight = 1 if params.get("symbol") else 40
+        elif weight is None:
+            weight_for = depth_weight if path == "/fapi/v1/depth" else klines_weight
+            weight = weight_for(int(params.get("limit") or 500))
+
+        orders = 0
+        if (method, path) == ("POST", "/fapi/v1/order"):
+            orders = 1
+        elif (method, path) == ("POST", "/fapi/v1/batchOrders"):
+            orders = len(json.loads(params.get("batchOrders") or "[]"))
+
+        now = time.time()
+        window = int(now // 60)
+
+        with self._limit_lock:
+            self.requests += 1
+
+            if window != self._window:
+                self._window, self._used_weight, self._order_count = window, 0, 0
+
+            self._used_weight += weight
+            self._order_count += orders
+            headers = {
+                "X-MBX-USED-WEIGHT-1M": str(self._used_weight),
+                "X-MBX-ORDER-COUNT-1M": str(self._order_count),
+            }
+
+            if self._used_weight > self.weight_limit or self._order_count > self.order_limit:
+                self.rate_limited += 1
+                return 429, int((window + 1) * 60 - now) + 1, headers
+
+            if self.error_rate and self._rng.random() < self.error_rate:
+                self.injected_errors += 1
+                return 503, None, headers
+
+        return 200, None, headers
+
+    def _delay(self):
+        delay = self.latency_ms + (self._rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def handle(self, method: str, path: str, params: dict) -> tuple:
+        """Return (status, body, headers) for one REST request."""
+        self._delay()
+        status, retry_after, headers = self._admit(method, path, params)
+
+        if status == 429:
+            headers["Retry-After"] = str(retry_after)
+            return 429, {"code": -1003, "msg": "Too many requests; current limit is exceeded."}, headers
+
+        if status == 503:
+            return 503, {
+                "code": -1001,
+                "msg": "Internal error; unable to process your request. Please try again.",
+            }, headers
+
+        try:
+            return 200, self._route(method, path, params), headers
+        except ExchangeError as e:
+            return e.status, {"code": e.code, "msg": e.msg}, headers
+
+    def _route(self, method: str, path: str, params: dict):
+        exchange = self.exchange
+        route = (method, path.replace("/fapi/v2/", "/fapi/v3/"))
+
+        if route == ("GET", "/fapi/v1/ping"):
+            return {}
+        if route == ("GET", "/fapi/v1/time"):
+            return {"serverTime": int(time.time() * 1000)}
+        if route == ("GET", "/fapi/v1/exchangeInfo"):
+            return exchange.exchange_info()
+        if route == ("GET", "/fapi/v1/klines"):
+            return exchange.klines(params)
+        if route == ("GET", "/fapi/v1/depth"):
+            return exchange.depth(params)
+        if route == ("POST", "/fapi/v1/order"):
+            return exchange.new_order(params)
+        if route == ("GET", "/fapi/v1/order"):
+            return exchange.get_order(params)
+        if route == ("DELETE", "/fapi/v1/order"):
+            return exchange.cancel_order(params)
+        if route == ("GET", "/fapi/v1/openOrders"):
+            return exchange.open_orders(params)
+        if route == ("POST", "/fapi/v1/batchOrders"):
+            return exchange.batch_orders(json.loads(params.get("batchOrders") or "[]"))
+        if route == ("GET", "/fapi/v3/balance"):
+            return exchange.balance()
+        if route == ("GET", "/fapi/v3/positionRisk"):
+            return exchange.position_risk(params)
+        if route == ("GET", "/fapi/v1/userTrades"):
+            return exchange.user_trades(params)
+        if route == ("GET", "/fapi/v1/income"):
+            return exchange.income(params)
+        if route == ("POST", "/fapi/v1/listenKey"):
+            return exchange.new_listen_key()
+        if route == ("PUT", "/fapi/v1/listenKey"):
+            return exchange.keepalive_listen_key(params)
+        if route == ("DELETE", "/fapi/v1/listenKey"):
+            return exchange.close_listen_key(params)
+
+        raise ExchangeError(-5000, f"Path {path} is not supported by the simulator.", status=404)
+
+    # -------------------------------
+    # USER DATA AND MARKET STREAMS
+    # -------------------------------
+    def _run_stream(self):
+        self._ws_loop = asyncio.new_event_loop()
+        try:
+            self._ws_loop.run_until_complete(self._serve_stream())
+        finally:
+            self._ws_loop.close()
+            self._ws_loop = None
+
+    async def _serve_stream(self):
+        from websockets.asyncio.server import serve
+
+        self._ws_stop = asyncio.Event()
+
+        async with serve(self._stream_handler, self.host, self.port + STREAM_PORT_OFFSET):
+            self._ws_ready.set()
+            await self._ws_stop.wait()
+
+    async def _stream_handler(self, ws):
+        parts = urlsplit(ws.request.path)
+
+        if parts.path.rstrip("/") == "/stream":
+            streams = parse_qs(parts.query).get("streams", [""])[0].split("/")
+            await self._market_stream(ws, [stream for stream in streams if stream], combined=True)
+            return
+
+        listen_key = unquote(parts.path.rstrip("/").rsplit("/", 1)[-1])
+        if "@" in listen_key:
+            await self._market_stream(ws, [listen_key], combined=False)
+            return
+
+        if not self.exchange.is_listen_key(listen_key):
+            await ws.close(code=1008, reason="Invalid listenKey")
+            return
+
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+
+        def forward(event):
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+        self.exchange.add_listener(forward)
+        try:
+            while True:
+                event = await queue.get()
+                await ws.send(json.dumps(event))
+        except Exception:
+            # Client went away
+            pass
+        finally:
+            self.exchange.remove_listener(forward)
+
+    async def _market_stream(self, ws, streams: list, combined: bool):
+        try:
+            feed = _MarketFeed(streams)
+        except (ExchangeError, ValueError):
+            await ws.close(code=1008, reason="Invalid stream name")
+            return
+
+        # Make sure every subscribed symbol has a moving mark price
+        with self.exchange._lock:
+            for symbol in feed.symbols:
+                self.exchange.prices.price(symbol)
+
+        for symbol in feed.depth_symbols:
+            self.exchange.book(symbol)
+
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+
+        def forward(prices, now, depth):
+            loop.call_soon_threadsafe(queue.put_nowait, (prices, now, depth))
+
+        self.exchange.add_tick_listener(forward)
+        try:
+            while True:
+                prices, now, depth = await queue.get()
+                for stream, data in feed.events(prices, now, depth):
+                    await ws.send(json.dumps({"stream": stream, "data": data} if combined else data))
+        except Exception:
+            # Client went away
+            pass
+        finally:
+            self.exchange.remove_tick_listener(forward)
+
+
+class _MarketFeed:
+    """Turns mark price steps into aggTrade, kline, depth and mark price events for one connection."""
+
+    def __init__(self, streams: list):
+        self.trades = []
+        self.klines = []
+        self.depths = []
+        self.marks = []
+        # Stream name of the all-symbols mark price array, if subscribed
+        self.all_marks = None
+        self._bars = {}
+        self._trade_id = 0
+
+        for stream in streams:
+            symbol, kind = stream.split("@", 1)
+            symbol = symbol.upper()
+
+            if symbol == "!MARKPRICE" and kind in ("arr", "arr@1s"):
+                self.all_marks = stream
+            elif kind in ("markPrice", "markPrice@1s"):
+                self.marks.append((stream, symbol))
+            elif kind == "aggTrade":
+                self.trades.append((stream, symbol))
+            elif kind.startswith("kline_"):
+                interval = kind[len("kline_"):]
+                self.klines.append((stream, symbol, interval, interval_ms(interval)))
+            elif kind in ("depth", "depth@100ms", "depth@250ms", "depth@500ms"):
+                # Every speed gets one diff per price step
+                self.depths.append((stream, symbol))
+            else:
+                raise ValueError(stream)
+
+        self.depth_symbols = {symbol for _, symbol in self.depths}
+        self.symbols = (
+            {symbol for _, symbol in self.trades} | {kline[1] for kline in self.klines}
+            | {symbol for _, symbol in self.marks} | self.depth_symbols
+        )
+
+    def events(self, prices: dict, now: int, depth: dict) -> list:
+        events = []
+
+        for stream, symbol in self.marks:
+            events.append((stream, self._mark(symbol, prices[symbol], now)))
+
+        if self.all_marks:
+            events.append((self.all_marks, [self._mark(symbol, price, now) for symbol, price in sorted(prices.items())]))
+
+        for stream, symbol in self.depths:
+            if symbol in depth:
+                events.append((stream, depth[symbol]))
+
+        for stream, symbol in self.trades:
+            self._trade_id += 1
+            quantity = 0.001 * (1 + self._trade_id % 10)
+            events.append((stream, {
+                "e": "aggTrade",
+                "E": now,
+                "s": symbol,
+                "a": self._trade_id,
+                "p": _num(prices[symbol]),
+                "q": _num(quantity),
+                "f": self._trade_id,
+                "l": self._trade_id,
+                "T": now,
+                "m": self._trade_id % 2 == 0,
+            }))
+
+        for stream, symbol, interval, step in self.klines:
+            price = prices[symbol]
+            open_time = now // step * step
+            bar = self._bars.get(stream)
+
+            if bar is not None and bar[0] != open_time:
+                # First tick of a new interval closes the previous bar
+                events.append((stream, self._kline(symbol, interval, bar, now, closed=True)))
+                bar = None
+
+            if bar is None:
+                bar = [open_time, price, price, price, price, 0.0, open_time + step - 1]
+                self._bars[stream] = bar
+
+            bar[2], bar[3], bar[4] = max(bar[2], price), min(bar[3], price), price
+            bar[5] += 0.001
+            events.append((stream, self._kline(symbol, interval, bar, now, closed=False)))
+
+        return events
+
+    @staticmethod
+    def _mark(symbol: str, price: float, now: int) -> dict:
+        return {
+            "e": "markPriceUpdate",
+            "E": now,
+            "s": symbol,
+            "p": _num(price),
+            "i": _num(price),
+            "P": _num(price),
+            "r": "0.0001",
+            "T": now - now % 28_800_000 + 28_800_000,
+        }
+
+    @staticmethod
+    def _kline(symbol: str, interval: str, bar: list, now: int, closed: bool) -> dict:
+        return {
+            "e": "kline",
+            "E": now,
+            "s": symbol,
+            "k": {
+                "t": bar[0],
+                "T": bar[6],
+                "s": symbol,
+                "i": interval,
+                "o": _num(bar[1]),
+                "c": _num(bar[4]),
+                "h": _num(bar[2]),
+                "l": _num(bar[3]),
+                "v": _num(bar[5]),
+                "x": closed,
+            },
+        }
+
+
+def _bind_http(server: SimulatorServer) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes; Nagle would hold the body back
+        disable_nagle_algorithm = True
+
+        def _dispatch(self, method: str):
+            parts = urlsplit(self.path)
+            params = dict(parse_qsl(parts.query))
+
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                params.update(parse_qsl(self.rfile.read(length).decode()))
+
+            status, body, headers = server.handle(method, parts.path, params)
+            payload = json.dumps(body).encode()
+
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def do_PUT(self):
+            self._dispatch("PUT")
+
+        def do_DELETE(self):
+            self._dispatch("DELETE")
+
+        def log_message(self, format, *args):
+            server.logger.debug(format % args)
+
+    # Port 0 picks a free port; the stream port next to it must be free too
+    for _ in range(20):
+        http = ThreadingHTTPServer((server.host, server.port), Handler)
+        http.daemon_threads = True
+
+        if server.port or _port_free(server.host, http.server_address[1] + STREAM_PORT_OFFSET):
+            return http
+
+        http.server_close()
+
+    raise OSError("No free port pair for the simulator")
+
+
+def _port_free(host: str, port: int) -> bool:
+    import socket
+
+    with socket.socket() as sock:
+        try:
+            sock.bind((host, port))
+            return True
+        except OSError:
+            return False